@@ -32,6 +32,8 @@ if [ ! -f "$APP_DIR/.env" ]; then
     SECRET=$(python3 -c "import secrets; print(secrets.token_hex(32))")
     sed -i "s/change-me-to-a-random-string/$SECRET/" "$APP_DIR/.env"
 fi
+# nginx serves item photos (see the /_photos/ location in menuvi.nginx)
+grep -q '^PHOTOS_ACCEL_PREFIX=' "$APP_DIR/.env" || echo "PHOTOS_ACCEL_PREFIX=/_photos/" >> "$APP_DIR/.env"
 
 echo "==> Ensuring instance directory exists"
 mkdir -p "$APP_DIR/instance"
@@ -41,12 +43,29 @@ echo "==> Seeding database"
 cd "$APP_DIR"
 sudo -u "$APP_USER" FLASK_APP=menuvi "$APP_DIR/.venv/bin/flask" seed
 
+echo "==> Building static assets"
+mkdir -p "$APP_DIR/menuvi/static/dist"
+chown "$APP_USER:$APP_USER" "$APP_DIR/menuvi/static/dist"
+sudo -u "$APP_USER" FLASK_APP=menuvi "$APP_DIR/.venv/bin/flask" build-assets
+
 echo "==> Installing systemd service"
 cp "$APP_DIR/deploy/menuvi.service" /etc/systemd/system/menuvi.service
 systemctl daemon-reload
 systemctl enable menuvi
 systemctl restart menuvi
 
+echo "==> Installing notify service"
+cp "$APP_DIR/deploy/menuvi-notify.service" /etc/systemd/system/menuvi-notify.service
+systemctl daemon-reload
+systemctl enable menuvi-notify
+systemctl restart menuvi-notify
+
+echo "==> Installing worker service"
+cp "$APP_DIR/deploy/menuvi-worker.service" /etc/systemd/system/menuvi-worker.service
+systemctl daemon-reload
+systemctl enable menuvi-worker
+systemctl restart menuvi-worker
+
 echo "==> Installing nginx config"
 cp "$APP_DIR/deploy/menuvi.nginx" /etc/nginx/sites-available/menuvi
 ln -sf /etc/nginx/sites-available/menuvi /etc/nginx/sites-enabled/menuvi
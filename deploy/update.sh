@@ -20,10 +20,22 @@ git pull
 echo "==> Installing dependencies"
 .venv/bin/pip install --quiet -r requirements.txt
 
+echo "==> Building static assets"
+FLASK_APP=menuvi .venv/bin/flask build-assets
+
 echo "==> Restoring ownership to $APP_USER"
 sudo chown -R "$APP_USER:$APP_USER" "$APP_DIR"
 
+echo "==> Migrating database"
+sudo -u "$APP_USER" FLASK_APP=menuvi .venv/bin/flask db-upgrade
+
+echo "==> Installing notify and worker services"
+sudo cp deploy/menuvi-notify.service /etc/systemd/system/menuvi-notify.service
+sudo cp deploy/menuvi-worker.service /etc/systemd/system/menuvi-worker.service
+sudo systemctl daemon-reload
+sudo systemctl enable --quiet menuvi-notify menuvi-worker
+
 echo "==> Restarting menuvi"
-sudo systemctl restart menuvi
+sudo systemctl restart menuvi menuvi-notify menuvi-worker
 
 echo "==> Done!"
@@ -22,6 +22,25 @@ def create_app(config_class=Config):
 
     db.init_app(app)
 
+    from . import (
+        assets, compression, http_cache, i18n, menu_cache, photos, picks, querycount,
+        schedule, sitemap, sqlite_profile, tenants,
+    )
+
+    sqlite_profile.init_app(app, db)
+    tenants.init_app(app)
+    picks.init_app(app)
+    menu_cache.init_app(app)
+    querycount.init_app(app, db)
+    assets.init_app(app)
+    photos.init_app(app)
+    schedule.init_app(app)
+    i18n.init_app(app)
+    # after_request hooks run in reverse: compress after validators are set
+    compression.init_app(app)
+    http_cache.init_app(app)
+    sitemap.init_app(app)
+
     # Flask-Login setup
     login_manager.init_app(app)
     login_manager.login_view = None  # handled per-blueprint
@@ -40,9 +59,12 @@ def create_app(config_class=Config):
             return redirect(url_for("admin.login", slug=slug, next=request.url))
         return redirect(url_for("superadmin.login", next=request.url))
 
-    # Create tables on first request
+    # Create tables on first request (importing search and tags registers
+    # the FTS and category tag mask hooks)
+    from . import migrations, search, tags  # noqa: F401
+
     with app.app_context():
-        db.create_all()
+        migrations.init_schema(app)
 
     # Register blueprints
     from .blueprints.public import public_bp
@@ -79,9 +101,11 @@ def create_app(config_class=Config):
     def inject_branding():
         restaurant = getattr(g, "restaurant", None)
         if restaurant:
+            # Public pages show the name and tagline in the visitor's language
+            text = g.get("menu") or restaurant
             return {
-                "restaurant_name": restaurant.name,
-                "restaurant_tagline": restaurant.tagline,
+                "restaurant_name": text.name,
+                "restaurant_tagline": text.tagline,
                 "brand_color": restaurant.brand_color,
                 "brand_color_dim": restaurant.brand_color_dim,
                 "restaurant_slug": restaurant.slug,
@@ -0,0 +1,169 @@
+"""Fingerprinted static assets and critical CSS.
+
+``flask build-assets`` minifies every ``.css``/``.js`` file under the
+static folder and writes it to ``static/dist/`` with a content hash in the
+name (``css/style.3f9a1c2e.css``), next to a gzipped copy for nginx's
+``gzip_static``. ``dist/manifest.json`` maps source paths to the hashed
+ones; ``asset_url()`` in templates resolves through it and falls back to the
+plain file when no build exists, so development needs no build step.
+
+A hashed file never changes, so it is served with a one-year
+``immutable`` Cache-Control. Files from the previous build are kept, as
+cached or baked HTML may still reference them.
+
+The build also extracts the above-the-fold rules for the landing and menu
+pages (whole sections of ``style.css``, by their ``/* ── name ── */``
+headers) into the manifest; ``base.html`` inlines them and loads the full
+stylesheet without blocking first paint.
+"""
+
+import gzip
+import hashlib
+import json
+import re
+from pathlib import Path
+
+from flask import current_app, request, url_for
+from markupsafe import Markup
+
+DIST = "dist"
+MANIFEST = "manifest.json"
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+# Sections of css/style.css needed to paint each page's first screen
+CRITICAL_SECTIONS = {
+    "landing": ("reset & base", "layout", "landing page"),
+    "menu": (
+        "reset & base", "layout", "top bar", "category cards on menu page",
+        "search", "tag filter", "bottom nav",
+    ),
+}
+CRITICAL_SOURCE = "css/style.css"
+
+_SECTION = re.compile(r"/\*\s*──\s*(.+?)\s*─+\s*\*/")
+_HASHED = re.compile(r"\.[0-9a-f]{8}\.(css|js)$")
+
+
+# ── minification ────────────────────────────────────────────────────────────
+def minify_css(source):
+    css = re.sub(r"/\*.*?\*/", "", source, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    # Property colons only: a space before ":" in a selector is significant
+    css = re.sub(r"([{;])([\w-]+):\s+", r"\1\2:", css)
+    return css.replace(";}", "}").strip()
+
+
+def minify_js(source):
+    # Conservative: indentation, blank lines and whole-line comments only
+    lines = (line.strip() for line in source.splitlines())
+    return "\n".join(line for line in lines if line and not line.startswith("//")) + "\n"
+
+
+MINIFIERS = {".css": minify_css, ".js": minify_js}
+
+
+def css_sections(source):
+    """Split a stylesheet on its ``/* ── name ── */`` headers."""
+    parts = _SECTION.split(source)
+    return {parts[i]: parts[i + 1] for i in range(1, len(parts) - 1, 2)}
+
+
+def critical_css(source, sections):
+    available = css_sections(source)
+    missing = [name for name in sections if name not in available]
+    if missing:
+        raise ValueError(f"{CRITICAL_SOURCE} has no section(s): {', '.join(missing)}")
+    return minify_css("".join(available[name] for name in sections))
+
+
+# ── build ───────────────────────────────────────────────────────────────────
+def _write(target, data):
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(target.name + ".tmp")
+    tmp.write_bytes(data)
+    tmp.replace(target)
+
+
+def build(static_folder):
+    """Minify and fingerprint assets under *static_folder*. Returns the manifest."""
+    static = Path(static_folder)
+    dist = static / DIST
+    previous = load_manifest(static)
+    files = {}
+    for path in sorted(static.rglob("*")):
+        if path.suffix not in MINIFIERS or dist in path.parents:
+            continue
+        name = path.relative_to(static).as_posix()
+        data = MINIFIERS[path.suffix](path.read_text(encoding="utf-8")).encode()
+        digest = hashlib.sha256(data).hexdigest()[:8]
+        hashed = f"{DIST}/{Path(name).with_suffix(f'.{digest}{path.suffix}').as_posix()}"
+        target = static / hashed
+        if not target.exists():
+            _write(target, data)
+            _write(target.with_name(target.name + ".gz"), gzip.compress(data, 9, mtime=0))
+        files[name] = hashed
+
+    critical = {}
+    if (static / CRITICAL_SOURCE).exists():
+        source = (static / CRITICAL_SOURCE).read_text(encoding="utf-8")
+        critical = {page: critical_css(source, sections)
+                    for page, sections in CRITICAL_SECTIONS.items()}
+
+    manifest = {"files": files, "critical": critical}
+    _prune(dist, set(files.values()) | set(previous.get("files", {}).values()))
+    _write(dist / MANIFEST, json.dumps(manifest, indent=2, sort_keys=True).encode())
+    return manifest
+
+
+def _prune(dist, keep):
+    """Delete hashed files that neither this build nor the last one uses."""
+    for path in dist.rglob("*"):
+        name = path.relative_to(dist.parent).as_posix()
+        if _HASHED.search(name.removesuffix(".gz")) and name.removesuffix(".gz") not in keep:
+            path.unlink()
+
+
+def load_manifest(static_folder):
+    path = Path(static_folder) / DIST / MANIFEST
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+# ── app integration ─────────────────────────────────────────────────────────
+def manifest_version(manifest):
+    """Short digest of *manifest*, so page ETags change with every build."""
+    if not manifest:
+        return ""
+    return hashlib.sha1(json.dumps(manifest, sort_keys=True).encode()).hexdigest()[:8]
+
+
+def use_manifest(app, manifest):
+    app.extensions["assets"] = manifest
+
+
+def asset_url(filename):
+    hashed = current_app.extensions["assets"].get("files", {}).get(filename)
+    return url_for("static", filename=hashed or filename)
+
+
+def critical_style(page):
+    """Inline CSS for *page*, or an empty string when there is no build."""
+    css = current_app.extensions["assets"].get("critical", {}).get(page, "")
+    return Markup(css.replace("</", "<\\/"))
+
+
+def init_app(app):
+    # Read once per worker; deploys run `flask build-assets` before restarting
+    use_manifest(app, load_manifest(app.static_folder))
+    app.jinja_env.globals.update(asset_url=asset_url, critical_style=critical_style)
+
+    @app.after_request
+    def cache_fingerprinted(response):
+        filename = (request.view_args or {}).get("filename", "")
+        if (request.endpoint == "static" and response.status_code in (200, 304)
+                and filename.startswith(f"{DIST}/") and _HASHED.search(filename)):
+            response.headers["Cache-Control"] = IMMUTABLE
+            response.expires = None
+        return response
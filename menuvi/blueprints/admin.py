@@ -3,26 +3,34 @@ import io
 
 from flask import (
     Blueprint, render_template, request, redirect, url_for, flash,
-    send_file, g, abort,
+    send_file, g, abort, current_app, Response, stream_with_context, jsonify,
 )
 from flask_login import login_user, logout_user, login_required, current_user
-from ..models import db, Category, MenuItem, Restaurant, User
+from sqlalchemy import func
+
+from ..i18n import language_name, restaurant_locales, save_translations, translations_for
+from ..jobs import enqueue
+from ..menu_cache import bump_menu_version, get_menu
+from ..menu_io import FORMATS, MenuImportError, import_menu, iter_export, read_rows
+from ..notify import events_url
+from ..photos import PhotoError, render_variants_later, store_photo
+from ..qr import build_sheet, build_zip, qr_png, render_tables, table_codes, tables_ready
+from ..models import db, Category, MenuItem, Restaurant, Tag, User
+from ..ready import acknowledge, open_signals, payload
+from ..schedule import ScheduleError, apply_form, apply_schedule, open_now
+from ..static_pages import refresh_all, refresh_menu
+from ..tags import TagError, add_tag, count_tagged, delete_tag, form_mask, rename_tag, restaurant_tags
+from ..tenants import load_restaurant
 
 admin_bp = Blueprint("admin", __name__)
 
 
 # ── helpers ─────────────────────────────────────────────────────────────────
-def _load_restaurant(slug):
-    restaurant = Restaurant.query.filter_by(slug=slug).first_or_404()
-    g.restaurant = restaurant
-    return restaurant
-
-
 def admin_required(view):
     @functools.wraps(view)
     @login_required
     def wrapped(slug, **kwargs):
-        restaurant = _load_restaurant(slug)
+        restaurant = load_restaurant(slug)
         # User must own this restaurant or be superadmin
         if not current_user.is_superadmin and current_user.restaurant_id != restaurant.id:
             abort(403)
@@ -33,7 +41,7 @@ def admin_required(view):
 # ── auth ─────────────────────────────────────────────────────────────────────
 @admin_bp.route("/<slug>/admin/login", methods=["GET", "POST"])
 def login(slug):
-    restaurant = _load_restaurant(slug)
+    restaurant = load_restaurant(slug)
     if request.method == "POST":
         email = request.form.get("email", "").strip()
         pw = request.form.get("password", "")
@@ -64,7 +72,31 @@ def dashboard(slug):
         .order_by(Category.sort_order)
         .all()
     )
-    return render_template("admin/dashboard.html", categories=categories)
+    item_counts = dict(
+        db.session.query(MenuItem.category_id, func.count(MenuItem.id))
+        .join(Category)
+        .filter(Category.restaurant_id == g.restaurant.id)
+        .group_by(MenuItem.category_id)
+        .all()
+    )
+    signals = open_signals(g.restaurant.id)
+    # Item names for the signals' picks; skip loading the menu when none are waiting
+    menu = get_menu(g.restaurant) if signals else None
+    return render_template(
+        "admin/dashboard.html", categories=categories, item_counts=item_counts,
+        ready_signals=[payload(s, menu) for s in signals],
+        events_url=events_url(g.restaurant),
+    )
+
+
+@admin_bp.route("/<slug>/admin/ready/<int:signal_id>/ack", methods=["POST"])
+@admin_required
+def ready_ack(slug, signal_id):
+    if not acknowledge(g.restaurant.id, signal_id):
+        abort(404)
+    if request.headers.get("X-Requested-With") == "XMLHttpRequest":
+        return jsonify(ok=True)
+    return redirect(url_for("admin.dashboard", slug=slug))
 
 
 # ── category CRUD ────────────────────────────────────────────────────────────
@@ -85,7 +117,9 @@ def category_new(slug):
             sort_order=sort_order,
         )
         db.session.add(cat)
+        bump_menu_version(g.restaurant.id)
         db.session.commit()
+        refresh_menu(slug, category_ids=[cat.id])
         flash(f"Category '{name}' created.", "success")
         return redirect(url_for("admin.dashboard", slug=slug))
     return render_template("admin/category_form.html", cat=None)
@@ -101,7 +135,9 @@ def category_edit(slug, cat_id):
         cat.name = request.form["name"].strip()
         cat.menu_type = request.form.get("menu_type", cat.menu_type)
         cat.sort_order = int(request.form.get("sort_order", cat.sort_order))
+        bump_menu_version(g.restaurant.id)
         db.session.commit()
+        refresh_menu(slug, category_ids=[cat.id], item_ids=[i.id for i in cat.items])
         flash(f"Category '{cat.name}' updated.", "success")
         return redirect(url_for("admin.dashboard", slug=slug))
     return render_template("admin/category_form.html", cat=cat)
@@ -114,8 +150,11 @@ def category_delete(slug, cat_id):
     if cat.restaurant_id != g.restaurant.id:
         abort(404)
     name = cat.name
+    item_ids = [i.id for i in cat.items]
     db.session.delete(cat)
+    bump_menu_version(g.restaurant.id)
     db.session.commit()
+    refresh_menu(slug, category_ids=[cat_id], item_ids=item_ids)
     flash(f"Category '{name}' and all its items deleted.", "success")
     return redirect(url_for("admin.dashboard", slug=slug))
 
@@ -146,9 +185,10 @@ def item_new(slug, cat_id):
 
         price_cents = _parse_price(price_str)
 
+        tags = restaurant_tags(g.restaurant.id)
         if not name:
             flash("Name is required.", "error")
-            return render_template("admin/item_form.html", category=cat, item=None)
+            return render_template("admin/item_form.html", category=cat, item=None, tags=tags)
 
         item = MenuItem(
             category_id=cat.id,
@@ -157,12 +197,29 @@ def item_new(slug, cat_id):
             price_cents=price_cents,
             sort_order=sort_order,
             available=available,
+            tags=form_mask(request.form, tags),
         )
+        try:
+            apply_form(item, request.form)
+            new_photo = _apply_photo(item)
+        except (PhotoError, ScheduleError) as e:
+            flash(str(e), "error")
+            return render_template("admin/item_form.html", category=cat, item=None, tags=tags)
+        if item.scheduled:
+            item.available = available and open_now(item, g.restaurant.timezone)
         db.session.add(item)
+        bump_menu_version(g.restaurant.id)
         db.session.commit()
+        if new_photo:
+            render_variants_later(new_photo)
+        if item.scheduled:
+            apply_schedule(g.restaurant.id)
+        refresh_menu(slug, category_ids=[cat.id], item_ids=[item.id])
         flash(f"Item '{name}' created.", "success")
         return redirect(url_for("admin.item_list", slug=slug, cat_id=cat.id))
-    return render_template("admin/item_form.html", category=cat, item=None)
+    return render_template(
+        "admin/item_form.html", category=cat, item=None, tags=restaurant_tags(g.restaurant.id),
+    )
 
 
 @admin_bp.route("/<slug>/admin/item/<int:item_id>/edit", methods=["GET", "POST"])
@@ -173,13 +230,31 @@ def item_edit(slug, item_id):
         abort(404)
     cat = item.category
     if request.method == "POST":
+        was_scheduled = item.scheduled
+        try:
+            apply_form(item, request.form)
+            new_photo = _apply_photo(item)
+        except (PhotoError, ScheduleError) as e:
+            db.session.rollback()
+            flash(str(e), "error")
+            return redirect(url_for("admin.item_edit", slug=slug, item_id=item.id))
         item.name = request.form["name"].strip()
         item.description = request.form.get("description", "").strip()
         item.price_cents = _parse_price(request.form.get("price", ""))
         item.sort_order = int(request.form.get("sort_order", item.sort_order))
         item.available = "available" in request.form
+        item.tags = form_mask(request.form, restaurant_tags(g.restaurant.id))
+        if item.scheduled:
+            # Unticked stays off until the window's next boundary
+            item.available = item.available and open_now(item, g.restaurant.timezone)
         item.category_id = int(request.form.get("category_id", item.category_id))
+        bump_menu_version(g.restaurant.id)
         db.session.commit()
+        if new_photo:
+            render_variants_later(new_photo)
+        if item.scheduled or was_scheduled:
+            apply_schedule(g.restaurant.id)
+        refresh_menu(slug, category_ids={cat.id, item.category_id}, item_ids=[item.id])
         flash(f"Item '{item.name}' updated.", "success")
         return redirect(url_for("admin.item_list", slug=slug, cat_id=item.category_id))
     categories = (
@@ -188,7 +263,10 @@ def item_edit(slug, item_id):
         .order_by(Category.sort_order)
         .all()
     )
-    return render_template("admin/item_form.html", category=cat, item=item, categories=categories)
+    return render_template(
+        "admin/item_form.html", category=cat, item=item, categories=categories,
+        tags=restaurant_tags(g.restaurant.id),
+    )
 
 
 @admin_bp.route("/<slug>/admin/item/<int:item_id>/delete", methods=["POST"])
@@ -200,7 +278,9 @@ def item_delete(slug, item_id):
     cat_id = item.category_id
     name = item.name
     db.session.delete(item)
+    bump_menu_version(g.restaurant.id)
     db.session.commit()
+    refresh_menu(slug, category_ids=[cat_id], item_ids=[item_id])
     flash(f"Item '{name}' deleted.", "success")
     return redirect(url_for("admin.item_list", slug=slug, cat_id=cat_id))
 
@@ -212,12 +292,168 @@ def item_toggle(slug, item_id):
     if item.category.restaurant_id != g.restaurant.id:
         abort(404)
     item.available = not item.available
+    bump_menu_version(g.restaurant.id)
     db.session.commit()
+    refresh_menu(slug, category_ids=[item.category_id], item_ids=[item.id])
     status = "available" if item.available else "unavailable"
     flash(f"'{item.name}' marked as {status}.", "success")
     return redirect(url_for("admin.item_list", slug=slug, cat_id=item.category_id))
 
 
+# ── allergen / dietary tags ─────────────────────────────────────────────────
+def _get_tag(tag_id) -> Tag:
+    tag = db.get_or_404(Tag, tag_id)
+    if tag.restaurant_id != g.restaurant.id:
+        abort(404)
+    return tag
+
+
+def _tags_changed(slug, message):
+    bump_menu_version(g.restaurant.id)
+    db.session.commit()
+    # Filter links and item labels appear on every public page
+    refresh_all(slug)
+    flash(message, "success")
+    return redirect(url_for("admin.tag_list", slug=slug))
+
+
+@admin_bp.route("/<slug>/admin/tags", methods=["GET", "POST"])
+@admin_required
+def tag_list(slug):
+    if request.method == "POST":
+        try:
+            tag = add_tag(g.restaurant.id, request.form.get("name", ""))
+        except TagError as e:
+            flash(str(e), "error")
+            return redirect(url_for("admin.tag_list", slug=slug))
+        return _tags_changed(slug, f"Tag '{tag.name}' created.")
+    return render_template(
+        "admin/tags.html", tags=restaurant_tags(g.restaurant.id),
+        counts=count_tagged(g.restaurant.id),
+    )
+
+
+@admin_bp.route("/<slug>/admin/tag/<int:tag_id>/edit", methods=["POST"])
+@admin_required
+def tag_edit(slug, tag_id):
+    tag = _get_tag(tag_id)
+    try:
+        rename_tag(tag, request.form.get("name", ""))
+    except TagError as e:
+        flash(str(e), "error")
+        return redirect(url_for("admin.tag_list", slug=slug))
+    return _tags_changed(slug, f"Tag '{tag.name}' updated.")
+
+
+@admin_bp.route("/<slug>/admin/tag/<int:tag_id>/delete", methods=["POST"])
+@admin_required
+def tag_delete(slug, tag_id):
+    tag = _get_tag(tag_id)
+    name = tag.name
+    delete_tag(tag)
+    return _tags_changed(slug, f"Tag '{name}' deleted and removed from its items.")
+
+
+# ── translations ────────────────────────────────────────────────────────────
+@admin_bp.route("/<slug>/admin/translations")
+@admin_required
+def translations(slug):
+    locales = restaurant_locales(g.restaurant)
+    if len(locales) < 2:
+        flash("This restaurant has only one language. Ask the site admin to add more.", "error")
+        return redirect(url_for("admin.dashboard", slug=slug))
+    return redirect(url_for("admin.translation_edit", slug=slug, locale=locales[1]))
+
+
+@admin_bp.route("/<slug>/admin/translations/<locale>", methods=["GET", "POST"])
+@admin_required
+def translation_edit(slug, locale):
+    locales = restaurant_locales(g.restaurant)
+    if locale not in locales[1:]:
+        abort(404)
+    restaurant = db.session.get(Restaurant, g.restaurant.id)
+    categories = (
+        Category.query
+        .filter_by(restaurant_id=restaurant.id)
+        .order_by(Category.sort_order, Category.id)
+        .all()
+    )
+    items = (
+        MenuItem.query
+        .join(Category)
+        .filter(Category.restaurant_id == restaurant.id)
+        .order_by(MenuItem.sort_order, MenuItem.id)
+        .all()
+    )
+    items_by_category = {}
+    for item in items:
+        items_by_category.setdefault(item.category_id, []).append(item)
+
+    if request.method == "POST":
+        objects = [("restaurant", restaurant.id)]
+        objects += [("category", c.id) for c in categories]
+        objects += [("item", i.id) for i in items]
+        changed = save_translations(restaurant.id, locale, request.form, objects)
+        if changed:
+            bump_menu_version(restaurant.id)
+            db.session.commit()
+            refresh_all(slug)
+        flash(f"{language_name(locale)} translations saved.", "success")
+        return redirect(url_for("admin.translation_edit", slug=slug, locale=locale))
+
+    return render_template(
+        "admin/translations.html", restaurant=restaurant, locale=locale, locales=locales,
+        categories=categories, items_by_category=items_by_category,
+        text=translations_for(restaurant.id, locale),
+    )
+
+
+# ── import / export ─────────────────────────────────────────────────────────
+_MIMETYPES = {"csv": "text/csv", "json": "application/json"}
+
+
+@admin_bp.route("/<slug>/admin/menu/export")
+@admin_required
+def menu_export(slug):
+    fmt = request.args.get("format", "csv")
+    if fmt not in FORMATS:
+        abort(404)
+    return Response(
+        stream_with_context(iter_export(g.restaurant.id, fmt)),
+        mimetype=_MIMETYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{slug}-menu.{fmt}"'},
+    )
+
+
+@admin_bp.route("/<slug>/admin/menu/import", methods=["GET", "POST"])
+@admin_required
+def menu_import(slug):
+    if request.method == "POST":
+        upload = request.files.get("file")
+        fmt = upload.filename.rsplit(".", 1)[-1].lower() if upload and upload.filename else ""
+        if fmt not in FORMATS:
+            flash("Upload a .csv or .json file.", "error")
+            return redirect(url_for("admin.menu_import", slug=slug))
+        stream = io.TextIOWrapper(upload.stream, encoding="utf-8-sig", newline="")
+        try:
+            result = import_menu(
+                g.restaurant.id, read_rows(stream, fmt),
+                replace=bool(request.form.get("replace")),
+            )
+        except (MenuImportError, UnicodeDecodeError) as exc:
+            db.session.rollback()
+            flash(f"Import failed: {exc}", "error")
+            return redirect(url_for("admin.menu_import", slug=slug))
+        db.session.commit()
+        refresh_all(slug)
+        flash(
+            f"Imported {result.created} new and {result.updated} updated items "
+            f"({result.categories} new categories).", "success",
+        )
+        return redirect(url_for("admin.dashboard", slug=slug))
+    return render_template("admin/menu_import.html")
+
+
 # ── QR code ──────────────────────────────────────────────────────────────────
 @admin_bp.route("/<slug>/admin/qr")
 @admin_required
@@ -229,21 +465,63 @@ def qr_code(slug):
 @admin_bp.route("/<slug>/admin/qr/download")
 @admin_required
 def qr_download(slug):
-    import qrcode
-
     site_url = request.url_root.rstrip("/") + url_for("public.landing", slug=slug)
-    qr = qrcode.QRCode(box_size=20, border=2)
-    qr.add_data(site_url)
-    qr.make(fit=True)
-    img = qr.make_image(fill_color="black", back_color="white")
+    path = qr_png(current_app.config["UPLOAD_FOLDER"], site_url)
+    return send_file(path, mimetype="image/png", download_name=f"{slug}-qr.png")
+
 
-    buf = io.BytesIO()
-    img.save(buf, format="PNG")
-    buf.seek(0)
-    return send_file(buf, mimetype="image/png", download_name=f"{slug}-qr.png")
+@admin_bp.route("/<slug>/admin/qr/tables")
+@admin_required
+def qr_tables(slug):
+    count = request.args.get("count", type=int) or 0
+    fmt = request.args.get("format", "pdf")
+    max_tables = current_app.config["QR_MAX_TABLES"]
+    if not 1 <= count <= max_tables or fmt not in ("pdf", "zip"):
+        flash(f"Choose between 1 and {max_tables} tables.", "error")
+        return redirect(url_for("admin.qr_code", slug=slug))
+
+    site_url = request.url_root.rstrip("/") + url_for("public.landing", slug=slug)
+    folder = current_app.config["UPLOAD_FOLDER"]
+    tables = list(range(1, count + 1))
+    if not tables_ready(folder, site_url, tables):
+        # Rendered by the worker; the waiting page reloads this URL until done
+        enqueue(render_tables, key=f"qr:{slug}:{count}", site_url=site_url, count=count)
+        if not tables_ready(folder, site_url, tables):
+            return render_template("admin/qr_preparing.html", count=count)
+    codes = table_codes(folder, site_url, tables)
+    if fmt == "zip":
+        data, mimetype = build_zip(codes, slug), "application/zip"
+    else:
+        data, mimetype = build_sheet(codes, g.restaurant.name), "application/pdf"
+    return send_file(
+        io.BytesIO(data), mimetype=mimetype, as_attachment=True,
+        download_name=f"{slug}-tables.{fmt}",
+    )
 
 
 # ── helpers ──────────────────────────────────────────────────────────────────
+@admin_bp.errorhandler(413)
+def upload_too_large(e):
+    mb = current_app.config["MAX_CONTENT_LENGTH"] // (1024 * 1024)
+    flash(f"Uploads are limited to {mb} MB.", "error")
+    return redirect(request.url)
+
+
+def _apply_photo(item) -> str | None:
+    """Attach an uploaded photo to *item*, or remove its photo if asked.
+
+    Returns the digest of a newly uploaded photo; raises PhotoError if the
+    upload is not a usable image.
+    """
+    upload = request.files.get("photo")
+    if upload and upload.filename:
+        item.photo = store_photo(upload.read()).digest
+        return item.photo
+    if "remove_photo" in request.form:
+        item.photo = None
+    return None
+
+
 def _parse_price(s: str) -> int | None:
     """Convert a price string like '22.90' or '$22.90' to cents."""
     if not s:
@@ -1,25 +1,34 @@
 from flask import (
-    Blueprint, render_template, session, redirect, url_for, request, jsonify,
-    g, abort, Response,
+    Blueprint, render_template, redirect, url_for, request, jsonify,
+    abort, Response, g, current_app,
 )
-from ..models import db, Category, MenuItem, Restaurant
+from ..http_cache import not_modified
+from ..i18n import current_locale
+from ..menu_api import PickOpsError, menu_payload, parse_pick_ops
+from ..menu_cache import get_menu
+from ..models import Restaurant
+from ..photos import send_variant, variant_file
+from ..picks import add_pick, clear_picks, current_picks, remove_pick, sync_picks
+from ..pwa import ICON_SIZES, cache_version, icon_initial, icon_png, manifest, precache_urls
+from ..ready import signal_ready, visitor_signal
+from ..search import search_items, tagged_items
+from ..sitemap import sitemap_response
+from ..suggest import get_index
+from ..tags import tag_filter
+from ..tenants import load_restaurant
 
 public_bp = Blueprint("public", __name__)
 
 
 # ── helpers ──────────────────────────────────────────────────────────────────
-def _load_restaurant(slug):
-    restaurant = Restaurant.query.filter_by(slug=slug).first_or_404()
-    g.restaurant = restaurant
-    return restaurant
-
-
 def _get_picks() -> list[int]:
-    return session.get("picks", [])
+    return current_picks(g.restaurant.id)
 
 
-def _set_picks(picks: list[int]):
-    session["picks"] = picks
+def _menu(restaurant):
+    """The menu snapshot in the visitor's language; also feeds the page's restaurant text."""
+    g.menu = get_menu(restaurant, current_locale(restaurant))
+    return g.menu
 
 
 # ── SEO ─────────────────────────────────────────────────────────────────────
@@ -31,21 +40,66 @@ def robots():
 
 
 @public_bp.route("/sitemap.xml")
-def sitemap():
+@public_bp.route("/sitemap.xml.gz", defaults={"gz": True}, endpoint="sitemap_gz")
+def sitemap(gz=False):
+    base = request.url_root.rstrip("/")
+    return sitemap_response(base, gz=gz)
+
+
+@public_bp.route("/sitemap-<int:n>.xml")
+@public_bp.route("/sitemap-<int:n>.xml.gz", defaults={"gz": True}, endpoint="sitemap_child_gz")
+def sitemap_child(n, gz=False):
     base = request.url_root.rstrip("/")
-    urls = [base + "/"]
-    for r in Restaurant.query.all():
-        urls.append(base + url_for("public.landing", slug=r.slug))
-        for menu_type in ("dining", "beverages"):
-            urls.append(base + url_for("public.menu", slug=r.slug, menu_type=menu_type))
-        for cat in Category.query.filter_by(restaurant_id=r.id).all():
-            urls.append(base + url_for("public.category", slug=r.slug, category_id=cat.id))
-    xml = '<?xml version="1.0" encoding="UTF-8"?>\n'
-    xml += '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
-    for u in urls:
-        xml += f"  <url><loc>{u}</loc></url>\n"
-    xml += "</urlset>\n"
-    return Response(xml, mimetype="application/xml")
+    resp = sitemap_response(base, n=n, gz=gz) if n > 0 else None
+    if resp is None:
+        abort(404)
+    return resp
+
+
+# ── PWA ─────────────────────────────────────────────────────────────────────
+@public_bp.route("/<slug>/manifest.webmanifest")
+def pwa_manifest(slug):
+    restaurant = load_restaurant(slug)
+    cached = not_modified(restaurant, ())
+    if cached:
+        return cached
+    resp = jsonify(manifest(restaurant))
+    resp.mimetype = "application/manifest+json"
+    return resp
+
+
+@public_bp.route("/<slug>/sw.js")
+def service_worker(slug):
+    restaurant = load_restaurant(slug)
+    cached = not_modified(restaurant, ())
+    if cached:
+        return cached
+    shell, items = precache_urls(restaurant, get_menu(restaurant))
+    body = render_template(
+        "public/sw.js", restaurant_id=restaurant.id, version=cache_version(restaurant),
+        shell=shell, items=items,
+    )
+    return Response(body, mimetype="application/javascript")
+
+
+@public_bp.route("/<slug>/icon-<int:size>.png")
+def pwa_icon(slug, size):
+    restaurant = load_restaurant(slug)
+    if size not in ICON_SIZES:
+        abort(404)
+    png = icon_png(icon_initial(restaurant), restaurant.brand_color, size)
+    resp = Response(png, mimetype="image/png")
+    resp.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    return resp
+
+
+# ── item photos ─────────────────────────────────────────────────────────────
+@public_bp.route("/media/photos/<name>")
+def photo(name):
+    path = variant_file(current_app.config["UPLOAD_FOLDER"], name)
+    if path is None:
+        abort(404)
+    return send_variant(path)
 
 
 # ── directory (root) ────────────────────────────────────────────────────────
@@ -58,101 +112,129 @@ def directory():
 # ── landing page ─────────────────────────────────────────────────────────────
 @public_bp.route("/<slug>/")
 def landing(slug):
-    _load_restaurant(slug)
+    restaurant = load_restaurant(slug)
+    cached = not_modified(restaurant, _get_picks())
+    if cached:
+        return cached
+    if len(restaurant.locales) > 1:
+        _menu(restaurant)
     return render_template("public/landing.html")
 
 
 # ── menu listing ─────────────────────────────────────────────────────────────
 @public_bp.route("/<slug>/menu/<menu_type>")
 def menu(slug, menu_type):
-    restaurant = _load_restaurant(slug)
+    restaurant = load_restaurant(slug)
     if menu_type not in ("dining", "beverages"):
         return redirect(url_for("public.landing", slug=slug))
-    categories = (
-        Category.query
-        .filter_by(restaurant_id=restaurant.id, menu_type=menu_type)
-        .order_by(Category.sort_order)
-        .all()
-    )
+    picks = _get_picks()
+    cached = not_modified(restaurant, picks)
+    if cached:
+        return cached
+    menu = _menu(restaurant)
+    tags = tag_filter(menu, request.args.getlist("tag"))
+    categories = menu.categories_of_type(menu_type)
+    if tags.mask:
+        categories = [c for c in categories if c.matching_items(tags.mask)]
     return render_template(
         "public/menu.html",
         categories=categories,
         menu_type=menu_type,
-        picks=_get_picks(),
+        picks=picks,
+        tags=tags,
     )
 
 
 # ── category page ────────────────────────────────────────────────────────────
 @public_bp.route("/<slug>/category/<int:category_id>")
 def category(slug, category_id):
-    restaurant = _load_restaurant(slug)
-    cat = db.get_or_404(Category, category_id)
-    if cat.restaurant_id != restaurant.id:
+    restaurant = load_restaurant(slug)
+    picks = _get_picks()
+    cached = not_modified(restaurant, picks)
+    if cached:
+        return cached
+    menu = _menu(restaurant)
+    cat = menu.categories_by_id.get(category_id)
+    if cat is None:
         abort(404)
-    items = (
-        MenuItem.query
-        .filter_by(category_id=cat.id, available=True)
-        .order_by(MenuItem.sort_order)
-        .all()
-    )
+    tags = tag_filter(menu, request.args.getlist("tag"))
+    items = cat.matching_items(tags.mask)
     return render_template(
-        "public/category.html", category=cat, items=items, picks=_get_picks(),
+        "public/category.html", category=cat, items=items, picks=picks, tags=tags,
     )
 
 
 # ── item detail ──────────────────────────────────────────────────────────────
 @public_bp.route("/<slug>/item/<int:item_id>")
 def item_detail(slug, item_id):
-    restaurant = _load_restaurant(slug)
-    item = db.get_or_404(MenuItem, item_id)
-    if item.category.restaurant_id != restaurant.id:
+    restaurant = load_restaurant(slug)
+    picks = _get_picks()
+    cached = not_modified(restaurant, picks)
+    if cached:
+        return cached
+    item = _menu(restaurant).items_by_id.get(item_id)
+    if item is None:
         abort(404)
     return render_template(
-        "public/item_detail.html", item=item, picks=_get_picks(),
+        "public/item_detail.html", item=item, picks=picks,
     )
 
 
 # ── search ───────────────────────────────────────────────────────────────────
 @public_bp.route("/<slug>/search")
 def search(slug):
-    restaurant = _load_restaurant(slug)
+    restaurant = load_restaurant(slug)
+    menu = _menu(restaurant)
     q = request.args.get("q", "").strip()
-    results = []
+    tags = tag_filter(menu, request.args.getlist("tag"))
     if q:
-        results = (
-            MenuItem.query
-            .join(Category)
-            .filter(Category.restaurant_id == restaurant.id)
-            .filter(MenuItem.available.is_(True))
-            .filter(MenuItem.name.ilike(f"%{q}%"))
-            .order_by(MenuItem.name)
-            .limit(50)
-            .all()
-        )
-    return render_template("public/search.html", query=q, results=results, picks=_get_picks())
+        results = search_items(restaurant, menu, q, tags=tags.mask)
+    else:
+        results = tagged_items(menu, tags.mask) if tags.mask else []
+    return render_template(
+        "public/search.html", query=q, results=results, picks=_get_picks(), tags=tags,
+    )
+
+
+@public_bp.route("/<slug>/search/suggest")
+def search_suggest(slug):
+    restaurant = load_restaurant(slug)
+    q = request.args.get("q", "").strip()
+    suggestions = get_index(_menu(restaurant)).lookup(q) if q else []
+    results = []
+    for s in suggestions:
+        if s.kind == "category":
+            url = url_for("public.category", slug=slug, category_id=s.id)
+        else:
+            url = url_for("public.item_detail", slug=slug, item_id=s.id)
+        results.append({"type": s.kind, "name": s.name, "detail": s.detail, "url": url})
+    return jsonify(query=q, results=results)
 
 
 # ── shortlist ("My Picks") ──────────────────────────────────────────────────
 @public_bp.route("/<slug>/picks")
 def picks(slug):
-    _load_restaurant(slug)
+    restaurant = load_restaurant(slug)
     pick_ids = _get_picks()
-    items = MenuItem.query.filter(MenuItem.id.in_(pick_ids)).all() if pick_ids else []
-    # Group by category, preserve order
-    by_cat: dict[str, list[MenuItem]] = {}
+    items_by_id = _menu(restaurant).items_by_id
+    items = [items_by_id[i] for i in pick_ids if i in items_by_id]
+    # Group by category, in menu order
+    items.sort(key=lambda i: (i.category.sort_order, i.category_id, i.sort_order, i.id))
+    by_cat: dict[str, list] = {}
     for item in items:
         by_cat.setdefault(item.category.name, []).append(item)
-    return render_template("public/picks.html", by_category=by_cat, picks=pick_ids)
+    return render_template(
+        "public/picks.html", by_category=by_cat, picks=pick_ids,
+        ready=visitor_signal(restaurant.id),
+    )
 
 
 @public_bp.route("/<slug>/picks/add/<int:item_id>", methods=["POST"])
 def pick_add(slug, item_id):
-    _load_restaurant(slug)
-    item = db.get_or_404(MenuItem, item_id)
-    picks = _get_picks()
-    if item.id not in picks:
-        picks.append(item.id)
-        _set_picks(picks)
+    restaurant = load_restaurant(slug)
+    if item_id not in get_menu(restaurant).items_by_id:
+        abort(404)
+    picks = add_pick(restaurant.id, item_id)
     # Return JSON for fetch() calls, redirect for plain form posts
     if request.headers.get("X-Requested-With") == "XMLHttpRequest":
         return jsonify(ok=True, count=len(picks))
@@ -161,11 +243,8 @@ def pick_add(slug, item_id):
 
 @public_bp.route("/<slug>/picks/remove/<int:item_id>", methods=["POST"])
 def pick_remove(slug, item_id):
-    _load_restaurant(slug)
-    picks = _get_picks()
-    if item_id in picks:
-        picks.remove(item_id)
-        _set_picks(picks)
+    restaurant = load_restaurant(slug)
+    picks = remove_pick(restaurant.id, item_id)
     if request.headers.get("X-Requested-With") == "XMLHttpRequest":
         return jsonify(ok=True, count=len(picks))
     return redirect(request.referrer or url_for("public.picks", slug=slug))
@@ -173,6 +252,45 @@ def pick_remove(slug, item_id):
 
 @public_bp.route("/<slug>/picks/clear", methods=["POST"])
 def picks_clear(slug):
-    _load_restaurant(slug)
-    _set_picks([])
+    restaurant = load_restaurant(slug)
+    clear_picks(restaurant.id)
+    return redirect(url_for("public.picks", slug=slug))
+
+
+@public_bp.route("/<slug>/ready", methods=["POST"])
+def ready(slug):
+    restaurant = load_restaurant(slug)
+    signal = signal_ready(restaurant, request.form.get("table"))
+    if request.headers.get("X-Requested-With") == "XMLHttpRequest":
+        return jsonify(ok=True, id=signal.id)
     return redirect(url_for("public.picks", slug=slug))
+
+
+# ── JSON API ────────────────────────────────────────────────────────────────
+@public_bp.route("/<slug>/api/menu.json")
+def api_menu(slug):
+    restaurant = load_restaurant(slug)
+    # Pages link the payload with their language, so ?v= URLs stay immutable
+    versioned = request.args.get("v") == str(restaurant.menu_version) and (
+        len(restaurant.locales) == 1 or request.args.get("lang") in restaurant.locales
+    )
+    if not versioned:
+        cached = not_modified(restaurant, ())
+        if cached:
+            return cached
+    resp = Response(menu_payload(restaurant, _menu(restaurant)), mimetype="application/json")
+    if versioned:
+        # The URL changes with every menu edit, so this copy never goes stale
+        resp.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    return resp
+
+
+@public_bp.route("/<slug>/api/picks", methods=["POST"])
+def api_picks(slug):
+    restaurant = load_restaurant(slug)
+    try:
+        add, remove = parse_pick_ops(request.get_json(silent=True), get_menu(restaurant))
+    except PickOpsError as e:
+        return jsonify(ok=False, error=str(e)), 400
+    picks, changed_at = sync_picks(restaurant.id, add, remove)
+    return jsonify(ok=True, items=picks, count=len(picks), at=changed_at)
@@ -5,10 +5,23 @@ from flask import (
     Blueprint, render_template, request, redirect, url_for, flash,
 )
 from flask_login import login_user, logout_user, login_required, current_user
-from ..models import db, Restaurant, User
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import joinedload
+
+from ..i18n import LocaleError, parse_locales
+from ..jobs import enqueue, task
+from ..menu_cache import bump_menu_version
+from ..models import db, Category, MenuItem, PickSet, ReadySignal, Restaurant, Tag, Translation, User
+from ..schedule import apply_schedule, valid_timezone
+from ..search import rebuild_index
+from ..static_pages import refresh_restaurant, remove_restaurant
+from ..tenants import mark_changed
 
 superadmin_bp = Blueprint("superadmin", __name__)
 
+# Menu items deleted per transaction when purging a restaurant
+PURGE_BATCH = 2000
+
 
 # ── auth helpers ─────────────────────────────────────────────────────────────
 def superadmin_required(view):
@@ -47,8 +60,16 @@ def logout():
 @superadmin_required
 def dashboard():
     restaurants = Restaurant.query.order_by(Restaurant.name).all()
-    users = User.query.order_by(User.email).all()
-    return render_template("superadmin/dashboard.html", restaurants=restaurants, users=users)
+    category_counts = dict(
+        db.session.query(Category.restaurant_id, func.count(Category.id))
+        .group_by(Category.restaurant_id)
+        .all()
+    )
+    users = User.query.options(joinedload(User.restaurant)).order_by(User.email).all()
+    return render_template(
+        "superadmin/dashboard.html", restaurants=restaurants, users=users,
+        category_counts=category_counts,
+    )
 
 
 # ── restaurant CRUD ──────────────────────────────────────────────────────────
@@ -66,20 +87,32 @@ def restaurant_new():
         tagline = request.form.get("tagline", "").strip()
         brand_color = request.form.get("brand_color", "#c9a84c").strip()
         brand_color_dim = request.form.get("brand_color_dim", "#a68939").strip()
+        tz = request.form.get("timezone", "").strip() or "UTC"
 
         if not name:
             flash("Name is required.", "error")
             return render_template("superadmin/restaurant_form.html", restaurant=None)
+        if not valid_timezone(tz):
+            flash(f"Unknown time zone '{tz}'.", "error")
+            return render_template("superadmin/restaurant_form.html", restaurant=None)
+        try:
+            locales = parse_locales(request.form.get("locales") or "en")
+        except LocaleError as e:
+            flash(str(e), "error")
+            return render_template("superadmin/restaurant_form.html", restaurant=None)
         if Restaurant.query.filter_by(slug=slug).first():
             flash(f"Slug '{slug}' is already taken.", "error")
             return render_template("superadmin/restaurant_form.html", restaurant=None)
 
         r = Restaurant(
             name=name, slug=slug, tagline=tagline,
-            brand_color=brand_color, brand_color_dim=brand_color_dim,
+            brand_color=brand_color, brand_color_dim=brand_color_dim, timezone=tz,
+            locales=locales,
         )
         db.session.add(r)
+        mark_changed()
         db.session.commit()
+        refresh_restaurant(r)
         flash(f"Restaurant '{name}' created.", "success")
         return redirect(url_for("superadmin.dashboard"))
     return render_template("superadmin/restaurant_form.html", restaurant=None)
@@ -90,6 +123,16 @@ def restaurant_new():
 def restaurant_edit(restaurant_id):
     r = db.get_or_404(Restaurant, restaurant_id)
     if request.method == "POST":
+        old_slug, old_tz = r.slug, r.timezone
+        tz = request.form.get("timezone", "").strip() or r.timezone
+        if not valid_timezone(tz):
+            flash(f"Unknown time zone '{tz}'.", "error")
+            return render_template("superadmin/restaurant_form.html", restaurant=r)
+        try:
+            locales = parse_locales(request.form.get("locales") or r.locales)
+        except LocaleError as e:
+            flash(str(e), "error")
+            return render_template("superadmin/restaurant_form.html", restaurant=r)
         r.name = request.form["name"].strip()
         new_slug = request.form.get("slug", "").strip() or _slugify(r.name)
         if new_slug != r.slug:
@@ -100,7 +143,14 @@ def restaurant_edit(restaurant_id):
         r.tagline = request.form.get("tagline", "").strip()
         r.brand_color = request.form.get("brand_color", r.brand_color).strip()
         r.brand_color_dim = request.form.get("brand_color_dim", r.brand_color_dim).strip()
+        r.timezone = tz
+        r.locales = locales
+        bump_menu_version(r.id)
         db.session.commit()
+        if tz != old_tz:
+            # Scheduled items now open and close at different instants
+            apply_schedule(r.id)
+        refresh_restaurant(r, old_slug=old_slug)
         flash(f"Restaurant '{r.name}' updated.", "success")
         return redirect(url_for("superadmin.dashboard"))
     return render_template("superadmin/restaurant_form.html", restaurant=r)
@@ -110,13 +160,42 @@ def restaurant_edit(restaurant_id):
 @superadmin_required
 def restaurant_delete(restaurant_id):
     r = db.get_or_404(Restaurant, restaurant_id)
-    name = r.name
-    db.session.delete(r)
+    name, slug = r.name, r.slug
+    # The restaurant disappears now; its menu rows go in a background job
+    db.session.execute(
+        update(User).where(User.restaurant_id == r.id).values(restaurant_id=None)
+    )
+    db.session.execute(delete(Restaurant).where(Restaurant.id == r.id))
+    mark_changed()
     db.session.commit()
+    enqueue(purge_restaurant, restaurant_id=restaurant_id)
+    remove_restaurant(slug)
     flash(f"Restaurant '{name}' and all its data deleted.", "success")
     return redirect(url_for("superadmin.dashboard"))
 
 
+@task("restaurants.purge")
+def purge_restaurant(restaurant_id):
+    """Delete a removed restaurant's menu, tags, translations, signals and shortlists.
+
+    Items go in batches so a large menu never holds the write lock for long.
+    """
+    cids = select(Category.id).where(Category.restaurant_id == restaurant_id)
+    while True:
+        batch = select(MenuItem.id).where(MenuItem.category_id.in_(cids)).limit(PURGE_BATCH)
+        deleted = db.session.execute(delete(MenuItem).where(MenuItem.id.in_(batch))).rowcount
+        db.session.commit()
+        if deleted < PURGE_BATCH:
+            break
+    for model in (Category, Tag, Translation, ReadySignal, PickSet):
+        db.session.execute(delete(model).where(model.restaurant_id == restaurant_id))
+    connection = db.session.connection()
+    if connection.dialect.name == "sqlite":
+        # Bulk deletes skip the ORM events; with no items left this drops the rows
+        rebuild_index(connection, restaurant_id)
+    db.session.commit()
+
+
 # ── user CRUD ────────────────────────────────────────────────────────────────
 @superadmin_bp.route("/user/new", methods=["GET", "POST"])
 @superadmin_required
@@ -9,6 +9,7 @@ def register_cli(app: Flask):
     @click.option("--drop", is_flag=True, help="Drop existing data before seeding.")
     def seed_db(drop):
         """Populate the database with the Jewel of India menu."""
+        from .menu_io import import_menu
         from .models import db, Restaurant, Category, MenuItem
         from .seed_data import MENU
 
@@ -32,35 +33,21 @@ def register_cli(app: Flask):
             db.session.add(restaurant)
             db.session.flush()
 
-        cat_order = 0
-        for cat_name, items in MENU.items():
-            cat = Category.query.filter_by(
-                restaurant_id=restaurant.id, name=cat_name,
-            ).first()
-            if not cat:
-                cat = Category(
-                    restaurant_id=restaurant.id,
-                    name=cat_name,
-                    sort_order=cat_order,
-                )
-                db.session.add(cat)
-                db.session.flush()
-
-            item_order = 0
-            for name, desc, price_cents in items:
-                exists = MenuItem.query.filter_by(
-                    category_id=cat.id, name=name
-                ).first()
-                if not exists:
-                    db.session.add(MenuItem(
-                        category_id=cat.id,
-                        name=name,
-                        description=desc,
-                        price_cents=price_cents,
-                        sort_order=item_order,
-                    ))
-                item_order += 1
-            cat_order += 1
+        # Same path as `flask menu-import`: one lookup pass, bulk inserts
+        rows = enumerate(
+            (
+                {
+                    "category": cat_name,
+                    "name": name,
+                    "description": desc,
+                    "price": None if price_cents is None else price_cents / 100,
+                }
+                for cat_name, items in MENU.items()
+                for name, desc, price_cents in items
+            ),
+            start=1,
+        )
+        import_menu(restaurant.id, rows)
 
         db.session.commit()
         total = MenuItem.query.count()
@@ -88,3 +75,212 @@ def register_cli(app: Flask):
         db.session.add(user)
         db.session.commit()
         click.echo(f"Superadmin '{email}' created.")
+
+    @app.cli.command("db-upgrade")
+    @click.option("--to", "target", type=int, default=None,
+                  help="Stop at this schema version (default: latest).")
+    def db_upgrade(target):
+        """Apply pending schema migrations."""
+        from .migrations import current_version, upgrade
+        from .models import db
+
+        for m in upgrade(db.engine, target):
+            click.echo(f"Applied {m.version}: {m.description}")
+        with db.engine.connect() as conn:
+            click.echo(f"Database schema is at version {current_version(conn)}.")
+
+    @app.cli.command("purge-picks")
+    def purge_picks():
+        """Delete expired shortlists from the picks store."""
+        from .picks import get_store
+
+        click.echo(f"Purged {get_store().purge_expired()} expired pick sets.")
+
+    @app.cli.command("reindex-search")
+    def reindex_search():
+        """Rebuild the full-text search index for all menu items."""
+        from .models import db
+        from .search import create_index, rebuild_index
+
+        with db.engine.begin() as conn:
+            create_index(conn)
+            count = rebuild_index(conn)
+        click.echo(f"Indexed {count} menu items.")
+
+    @app.cli.command("render-static")
+    @click.option("--slug", default=None, help="Only bake this restaurant.")
+    def render_static(slug):
+        """Bake public pages to HTML for nginx to serve directly."""
+        from .static_pages import render_all
+
+        written = render_all(app, slug=slug)
+        click.echo(
+            f"Rendered {len(written)} pages to {app.config['STATIC_PAGES_FOLDER']}."
+        )
+
+    @app.cli.command("build-assets")
+    def build_assets():
+        """Minify and fingerprint static assets; extract critical CSS."""
+        from .assets import build, use_manifest
+
+        manifest = build(app.static_folder)
+        use_manifest(app, manifest)
+        for source, hashed in manifest["files"].items():
+            click.echo(f"{source} -> {hashed}")
+        click.echo(
+            f"Built {len(manifest['files'])} assets and critical CSS for "
+            f"{', '.join(manifest['critical']) or 'no pages'}."
+        )
+
+    @app.cli.command("notify-server")
+    def notify_server():
+        """Serve live staff notifications (Server-Sent Events) until stopped."""
+        from .notify import run
+
+        click.echo(
+            f"Notify server on {app.config['NOTIFY_HOST']}:{app.config['NOTIFY_PORT']}, "
+            f"socket {app.config['NOTIFY_SOCKET']}."
+        )
+        run(app.config)
+
+    @app.cli.command("worker")
+    @click.option("--concurrency", type=int, default=None,
+                  help="Jobs run at once (default: JOBS_CONCURRENCY).")
+    @click.option("--mode", type=click.Choice(["thread", "process"]), default=None,
+                  help="Run jobs on threads or processes (default: JOBS_MODE).")
+    @click.option("--once", is_flag=True, help="Exit when no jobs are due instead of waiting.")
+    def worker(concurrency, mode, once):
+        """Run queued background jobs until stopped."""
+        import signal
+
+        from .jobs import Worker
+
+        runner = Worker(app, concurrency, mode)
+        signal.signal(signal.SIGTERM, runner.stop)
+        signal.signal(signal.SIGINT, runner.stop)
+        click.echo(f"Worker running up to {runner.concurrency} jobs on {runner.mode}s.")
+        ran = runner.run(once=once)
+        click.echo(f"Ran {ran} jobs.")
+
+    @app.cli.command("jobs")
+    @click.option("--retry", is_flag=True, help="Queue failed jobs again.")
+    def jobs(retry):
+        """Show the background job queue and failed jobs."""
+        from .jobs import counts, failed_jobs, retry_failed
+
+        if retry:
+            click.echo(f"Queued {retry_failed()} failed jobs again.")
+        click.echo(", ".join(f"{n} {status}" for status, n in counts().items()) + ".")
+        for job in failed_jobs():
+            error = (job.last_error or "").strip().splitlines()[-1:] or [""]
+            click.echo(f"#{job.id} {job.name} ({job.attempts} attempts): {error[0]}")
+
+    @app.cli.command("qr-tables")
+    @click.argument("slug")
+    @click.option("--tables", type=int, required=True, help="Number of tables.")
+    @click.option("--format", "fmt", type=click.Choice(["pdf", "zip"]), default="pdf")
+    @click.option("--out", type=click.Path(dir_okay=False), default=None,
+                  help="Output file (default: <slug>-tables.<format>).")
+    def qr_tables(slug, tables, fmt, out):
+        """Generate per-table QR codes for a restaurant as a PDF sheet or zip."""
+        from flask import url_for
+
+        from .models import Restaurant
+        from .qr import build_sheet, build_zip, table_codes
+
+        restaurant = Restaurant.query.filter_by(slug=slug).first()
+        if not restaurant:
+            raise click.ClickException(f"No restaurant with slug '{slug}'.")
+        with app.test_request_context(base_url=app.config["SITE_URL"]):
+            site_url = app.config["SITE_URL"].rstrip("/") + url_for(
+                "public.landing", slug=slug,
+            )
+        codes = table_codes(
+            app.config["UPLOAD_FOLDER"], site_url, list(range(1, tables + 1)),
+            workers=app.config["QR_POOL_WORKERS"],
+        )
+        if fmt == "zip":
+            data = build_zip(codes, slug)
+        else:
+            data = build_sheet(codes, restaurant.name)
+        out = out or f"{slug}-tables.{fmt}"
+        with open(out, "wb") as fh:
+            fh.write(data)
+        click.echo(f"Wrote {tables} table QR codes to {out}.")
+
+    @app.cli.command("menu-import")
+    @click.argument("slug")
+    @click.argument("path", type=click.File("r", encoding="utf-8-sig"))
+    @click.option("--format", "fmt", type=click.Choice(["csv", "json"]), default=None,
+                  help="File format (default: from the file extension).")
+    @click.option("--replace", is_flag=True, help="Delete the existing menu first.")
+    def menu_import(slug, path, fmt, replace):
+        """Import menu items from a CSV or JSON file ('-' for stdin)."""
+        from .menu_io import MenuImportError, import_menu, read_rows
+        from .models import db, Restaurant
+        from .static_pages import refresh_all
+
+        restaurant = Restaurant.query.filter_by(slug=slug).first()
+        if not restaurant:
+            raise click.ClickException(f"No restaurant with slug '{slug}'.")
+        fmt = fmt or ("json" if path.name.endswith(".json") else "csv")
+        try:
+            result = import_menu(restaurant.id, read_rows(path, fmt), replace=replace)
+        except MenuImportError as exc:
+            db.session.rollback()
+            raise click.ClickException(str(exc))
+        db.session.commit()
+        with app.test_request_context(base_url=app.config["SITE_URL"]):
+            refresh_all(slug)
+        click.echo(
+            f"Imported {result.created} new and {result.updated} updated items "
+            f"({result.categories} new categories) into '{restaurant.name}'."
+        )
+
+    @app.cli.command("menu-export")
+    @click.argument("slug")
+    @click.option("--format", "fmt", type=click.Choice(["csv", "json"]), default="csv")
+    @click.option("--out", type=click.File("w", encoding="utf-8"), default="-",
+                  help="Output file (default: stdout).")
+    def menu_export(slug, fmt, out):
+        """Export a restaurant's menu as CSV or JSON."""
+        from .menu_io import iter_export
+        from .models import Restaurant
+
+        restaurant = Restaurant.query.filter_by(slug=slug).first()
+        if not restaurant:
+            raise click.ClickException(f"No restaurant with slug '{slug}'.")
+        for chunk in iter_export(restaurant.id, fmt):
+            out.write(chunk)
+
+    @app.cli.command("seed-synthetic")
+    @click.option("--restaurants", type=int, default=100, show_default=True)
+    @click.option("--items", "items_per_menu", type=int, default=150, show_default=True,
+                  help="Menu items per restaurant.")
+    @click.option("--dining-categories", type=int, default=8, show_default=True)
+    @click.option("--beverage-categories", type=int, default=4, show_default=True)
+    @click.option("--unavailable-ratio", type=float, default=0.05, show_default=True)
+    @click.option("--users", "users_per_restaurant", type=int, default=1, show_default=True,
+                  help="Owner accounts per restaurant.")
+    @click.option("--seed", type=int, default=0, show_default=True)
+    @click.option("--prefix", default="synthetic", show_default=True,
+                  help="Slug prefix for generated restaurants.")
+    @click.option("--drop", is_flag=True, help="Delete restaurants with this prefix first.")
+    def seed_synthetic(drop, **options):
+        """Generate a deterministic synthetic dataset for capacity testing."""
+        import time
+
+        from .models import db
+        from .synthetic import SyntheticSpec, clear, generate
+
+        spec = SyntheticSpec(**options)
+        started = time.perf_counter()
+        if drop:
+            click.echo(f"Removed {clear(spec.prefix)} '{spec.prefix}' restaurants.")
+        result = generate(spec)
+        db.session.commit()
+        click.echo(
+            f"Created {result.restaurants} restaurants, {result.categories} categories, "
+            f"{result.items} items and {result.users} users "
+            f"in {time.perf_counter() - started:.1f}s."
+        )
@@ -0,0 +1,131 @@
+"""Response compression negotiated from ``Accept-Encoding``.
+
+Text responses at least ``COMPRESS_MIN_SIZE`` bytes long are compressed
+with Brotli (when the optional ``brotli`` package is installed) or gzip.
+Pages that carry an ETag -- the public menu pages, see ``http_cache`` --
+are a pure function of (host, URL, ETag): the host appears in their
+canonical links and the ETag covers the menu version, templates and the
+visitor's picks. Their compressed bodies are kept in a per-worker LRU
+keyed on (host, URL, ETag, encoding), so each page is compressed once per
+menu change rather than once per request. A view that renders a value the
+ETag does not cover calls :func:`skip_body_cache` to keep that body out.
+
+Compressed responses get a weak ETag (``W/"..."``), as the bytes differ
+from the identity representation; conditional requests compare weakly.
+"""
+
+import gzip
+import threading
+from collections import OrderedDict
+
+from flask import current_app, g, request
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+
+def available_encodings():
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def compress(data, encoding, config):
+    if encoding == "br":
+        return brotli.compress(data, quality=config["COMPRESS_BR_LEVEL"])
+    return gzip.compress(data, compresslevel=config["COMPRESS_GZIP_LEVEL"], mtime=0)
+
+
+class CompressionCache:
+    """Byte-bounded LRU of compressed bodies."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key, body):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._entries[key] = body
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+def skip_body_cache():
+    """Keep this response's compressed body out of the cache."""
+    g.skip_body_cache = True
+
+
+def _compressible(response, config):
+    return (
+        response.status_code == 200
+        and not response.direct_passthrough
+        and not response.is_streamed
+        and "Content-Encoding" not in response.headers
+        and response.mimetype in config["COMPRESS_MIMETYPES"]
+    )
+
+
+def init_app(app):
+    app.extensions["compression_cache"] = CompressionCache(app.config["COMPRESS_CACHE_MAX_BYTES"])
+
+    @app.before_request
+    def reset_body_cache():
+        # g outlives the request when an app context is already pushed
+        g.skip_body_cache = False
+
+    @app.after_request
+    def compress_response(response):
+        config = current_app.config
+        if not config["COMPRESS_ENABLED"] or not _compressible(response, config):
+            return response
+        response.vary.add("Accept-Encoding")
+        if response.content_length is not None and response.content_length < config["COMPRESS_MIN_SIZE"]:
+            return response
+        encoding = request.accept_encodings.best_match(available_encodings())
+        if encoding is None:
+            return response
+
+        etag, weak = response.get_etag()
+        cache = current_app.extensions["compression_cache"]
+        cacheable = etag and not weak and not g.get("skip_body_cache")
+        key = (request.host, request.full_path, etag, encoding) if cacheable else None
+        body = cache.get(key) if key else None
+        if body is None:
+            body = compress(response.get_data(), encoding, config)
+            if key:
+                cache.put(key, body)
+
+        response.set_data(body)
+        response.headers["Content-Encoding"] = encoding
+        if etag:
+            response.set_etag(etag, weak=True)
+        return response
@@ -14,5 +14,82 @@ class Config:
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # SQLite connection profile (see menuvi/sqlite_profile.py)
+    SQLITE_JOURNAL_MODE = os.environ.get("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS = os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", 5000))
+    SQLITE_MMAP_SIZE_MB = int(os.environ.get("SQLITE_MMAP_SIZE_MB", 256))
+    SQLITE_CACHE_SIZE_KB = int(os.environ.get("SQLITE_CACHE_SIZE_KB", 20000))
+    SQLITE_TEMP_STORE = os.environ.get("SQLITE_TEMP_STORE", "MEMORY")
+    # Seconds between per-worker wal_checkpoint/optimize runs (0 disables)
+    SQLITE_MAINTENANCE_INTERVAL = int(os.environ.get("SQLITE_MAINTENANCE_INTERVAL", 300))
+
     UPLOAD_FOLDER = str(INSTANCE_DIR / "uploads")
     MAX_CONTENT_LENGTH = int(os.environ.get("MAX_UPLOAD_MB", 10)) * 1024 * 1024
+    # Item photos: the nginx internal location that serves them ("" = the app)
+    PHOTOS_ACCEL_PREFIX = os.environ.get("PHOTOS_ACCEL_PREFIX", "")
+
+    # Per-worker slug -> restaurant cache, invalidated across workers by a stamp file
+    TENANT_STAMP_FILE = str(INSTANCE_DIR / "tenants.stamp")
+    TENANT_CACHE_SIZE = int(os.environ.get("TENANT_CACHE_SIZE", 10000))
+
+    # Per-worker cache of compiled restaurant menus (0 disables caching)
+    MENU_CACHE_MAX_BYTES = int(os.environ.get("MENU_CACHE_MAX_MB", 32)) * 1024 * 1024
+
+    # Server-side picks: "sqlite" (pick_sets table) or "memory" (per process)
+    PICKS_STORE = os.environ.get("PICKS_STORE", "sqlite")
+    PICKS_TTL_HOURS = int(os.environ.get("PICKS_TTL_HOURS", 12))
+
+    # Expose the per-request SQL statement count as X-Query-Count (always on in debug)
+    QUERY_COUNT_HEADER = os.environ.get("QUERY_COUNT_HEADER", "0") == "1"
+
+    # Baked public pages served by nginx (see `flask render-static`)
+    STATIC_PAGES_FOLDER = str(INSTANCE_DIR / "static_pages")
+    STATIC_PAGES_ENABLED = os.environ.get("STATIC_PAGES_ENABLED", "0") == "1"
+    # Public origin used for canonical/OG URLs in baked pages
+    SITE_URL = os.environ.get("SITE_URL", "http://localhost/")
+
+    # Cache-Control for pages that send ETag/Last-Modified, keyed by endpoint
+    # (e.g. {"public.landing": "public, max-age=300"}); others use the default
+    CACHE_CONTROL_DEFAULT = os.environ.get("CACHE_CONTROL_DEFAULT", "private, no-cache")
+    CACHE_CONTROL: dict[str, str] = {}
+
+    # Response compression (br needs the optional `brotli` package)
+    COMPRESS_ENABLED = os.environ.get("COMPRESS_ENABLED", "1") == "1"
+    COMPRESS_MIN_SIZE = int(os.environ.get("COMPRESS_MIN_SIZE", 500))
+    COMPRESS_MIMETYPES = {
+        "text/html", "text/css", "text/plain", "text/xml", "text/csv",
+        "application/json", "application/javascript", "application/xml",
+        "image/svg+xml",
+    }
+    COMPRESS_GZIP_LEVEL = int(os.environ.get("COMPRESS_GZIP_LEVEL", 6))
+    COMPRESS_BR_LEVEL = int(os.environ.get("COMPRESS_BR_LEVEL", 5))
+    # Per-worker cache of compressed public pages, keyed by URL + ETag + encoding
+    COMPRESS_CACHE_MAX_BYTES = int(os.environ.get("COMPRESS_CACHE_MAX_MB", 16)) * 1024 * 1024
+
+    # Staff notifications: SSE server (`flask notify-server`) and the Unix socket
+    # app workers publish to. NOTIFY_EVENTS_ORIGIN points admin pages at it when
+    # it is not behind the same origin (e.g. "http://127.0.0.1:8011" in development).
+    NOTIFY_SOCKET = os.environ.get("NOTIFY_SOCKET", str(INSTANCE_DIR / "notify.sock"))
+    NOTIFY_HOST = os.environ.get("NOTIFY_HOST", "127.0.0.1")
+    NOTIFY_PORT = int(os.environ.get("NOTIFY_PORT", 8011))
+    NOTIFY_EVENTS_ORIGIN = os.environ.get("NOTIFY_EVENTS_ORIGIN", "")
+    NOTIFY_HEARTBEAT = int(os.environ.get("NOTIFY_HEARTBEAT", 25))
+    NOTIFY_TOKEN_MAX_AGE = int(os.environ.get("NOTIFY_TOKEN_HOURS", 12)) * 3600
+
+    # URLs per sitemap document before /sitemap.xml becomes a sitemap index
+    SITEMAP_MAX_URLS = 50000
+
+    # Background jobs (see menuvi/jobs.py): run by `flask worker`, or straight
+    # away in the request with JOBS_INLINE. JOBS_LEASE must outlast the longest job.
+    JOBS_INLINE = os.environ.get("JOBS_INLINE", "0") == "1"
+    JOBS_MODE = os.environ.get("JOBS_MODE", "thread")
+    JOBS_CONCURRENCY = int(os.environ.get("JOBS_CONCURRENCY", 2))
+    JOBS_POLL_INTERVAL = float(os.environ.get("JOBS_POLL_INTERVAL", 1.0))
+    JOBS_LEASE = int(os.environ.get("JOBS_LEASE", 600))
+    JOBS_RETRY_DELAY = int(os.environ.get("JOBS_RETRY_DELAY", 10))
+    JOBS_RETRY_DELAY_MAX = int(os.environ.get("JOBS_RETRY_DELAY_MAX", 3600))
+
+    # Bulk per-table QR codes: upper bound per request and render pool size
+    QR_MAX_TABLES = int(os.environ.get("QR_MAX_TABLES", 500))
+    QR_POOL_WORKERS = int(os.environ.get("QR_POOL_WORKERS", 0)) or None
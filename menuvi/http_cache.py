@@ -0,0 +1,88 @@
+"""Conditional GET support for public pages.
+
+Public pages are a function of the restaurant's content version plus the
+visitor's picks (the badge) and language, so those are enough for a strong
+ETag.
+``not_modified()`` compares it against ``If-None-Match`` /
+``If-Modified-Since`` right after the restaurant is loaded, before any menu
+data is read or a template is rendered. Validators and the endpoint's
+``Cache-Control`` policy are added to the response in ``after_request``.
+"""
+
+import hashlib
+import zlib
+from datetime import timezone
+from pathlib import Path
+
+from flask import Response, current_app, g, request
+
+from .assets import manifest_version
+from .i18n import current_locale, restaurant_locales
+
+
+def _template_fingerprint(app):
+    # Deploys that change templates or assets must not be answered with a 304
+    digest = hashlib.sha1()
+    template_dir = Path(app.root_path) / app.template_folder
+    for path in sorted(template_dir.rglob("*")):
+        if path.is_file():
+            digest.update(path.read_bytes())
+    digest.update(manifest_version(app.extensions.get("assets")).encode())
+    return digest.hexdigest()[:8]
+
+
+def init_app(app):
+    app.extensions["etag_salt"] = _template_fingerprint(app)
+
+    @app.before_request
+    def reset_validators():
+        # g outlives the request when an app context is already pushed
+        g.validators = None
+
+    @app.after_request
+    def add_cache_headers(response):
+        validators = g.get("validators")
+        if validators is None or response.status_code not in (200, 304):
+            return response
+        etag, last_modified = validators
+        response.set_etag(etag)
+        if last_modified is not None:
+            response.last_modified = last_modified
+        policies = current_app.config["CACHE_CONTROL"]
+        response.headers["Cache-Control"] = policies.get(
+            request.endpoint, current_app.config["CACHE_CONTROL_DEFAULT"],
+        )
+        return response
+
+
+def page_etag(restaurant, picks):
+    picks_digest = zlib.crc32(",".join(map(str, picks)).encode()) if picks else 0
+    salt = current_app.extensions["etag_salt"]
+    etag = f"{salt}-{restaurant.id}-{restaurant.menu_version}-{picks_digest:x}"
+    locale = current_locale(restaurant)
+    return etag if locale == restaurant_locales(restaurant)[0] else f"{etag}-{locale}"
+
+
+def not_modified(restaurant, picks):
+    """Return a 304 response if the client's copy is current, else None.
+
+    Also records the validators so the full response carries them.
+    Last-Modified is only sent to visitors without picks: a picks change
+    alters the page without touching the restaurant's timestamp.
+    """
+    etag = page_etag(restaurant, picks)
+    last_modified = None
+    if not picks:
+        last_modified = restaurant.updated_at.replace(
+            microsecond=0, tzinfo=timezone.utc,
+        )
+    g.validators = (etag, last_modified)
+
+    if request.if_none_match:
+        # Weak comparison: compressed variants carry W/"<etag>"
+        if request.if_none_match.contains_weak(etag):
+            return Response(status=304)
+    elif last_modified is not None and request.if_modified_since is not None:
+        if last_modified <= request.if_modified_since:
+            return Response(status=304)
+    return None
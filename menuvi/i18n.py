@@ -0,0 +1,208 @@
+"""Multi-language menus: locale negotiation and compiled translations.
+
+A restaurant lists the languages it offers in ``Restaurant.locales``
+(``"en,fr,ja"``). The first is its default, the language names and
+descriptions are entered in; ``Translation`` rows hold the restaurant's
+name and tagline and its category and item text in the others.
+
+Translations are never looked up while rendering. Each (restaurant,
+locale) gets its own menu snapshot (``menuvi/menu_cache.py``) with the
+translated text compiled in by :func:`apply_translations` -- one query
+when the snapshot is built, falling back to the default text field by
+field -- so a page in another language costs what the default one does.
+
+Public pages choose a locale with :func:`current_locale`: ``?lang=`` (the
+language links, which also set the ``lang`` cookie), then that cookie,
+then ``Accept-Language``, then the default. The locale is part of page
+ETags, and pages of multilingual restaurants carry ``Vary`` so they are
+never baked to static files (``menuvi/static_pages.py``).
+"""
+
+import re
+import sys
+
+from flask import g, request
+from sqlalchemy import delete, event, select
+
+from .models import db, Category, MenuItem, Translation
+
+LOCALE_COOKIE = "lang"
+LOCALE_COOKIE_MAX_AGE = 365 * 24 * 3600
+# Translatable fields per kind of row
+FIELDS = {
+    "restaurant": ("name", "tagline"),
+    "category": ("name",),
+    "item": ("name", "description"),
+}
+# Names shown in the language switcher, in their own language
+LANGUAGE_NAMES = {
+    "ar": "العربية", "de": "Deutsch", "el": "Ελληνικά", "en": "English",
+    "es": "Español", "fr": "Français", "hi": "हिन्दी", "id": "Bahasa Indonesia",
+    "it": "Italiano", "ja": "日本語", "ko": "한국어", "nl": "Nederlands",
+    "pt": "Português", "ru": "Русский", "th": "ไทย", "tr": "Türkçe",
+    "vi": "Tiếng Việt", "zh": "中文",
+}
+_LOCALE_RE = re.compile(r"^[a-z]{2,3}(-[a-z0-9]{2,8})?$")
+
+
+class LocaleError(ValueError):
+    pass
+
+
+def parse_locales(value) -> str:
+    """Normalise a comma-separated list of language codes, e.g. ``"en, FR"``."""
+    locales = []
+    for code in (value or "").split(","):
+        code = code.strip().lower().replace("_", "-")
+        if not code:
+            continue
+        if not _LOCALE_RE.match(code):
+            raise LocaleError(f"'{code}' is not a language code (e.g. en, fr, pt-br).")
+        if code not in locales:
+            locales.append(code)
+    if not locales:
+        raise LocaleError("At least one language is required.")
+    return ",".join(locales)
+
+
+def restaurant_locales(restaurant) -> tuple[str, ...]:
+    """The restaurant's languages, default first (a Tenant or a Restaurant row)."""
+    locales = restaurant.locales or "en"
+    return tuple(locales.split(",")) if isinstance(locales, str) else locales
+
+
+def language_name(code) -> str:
+    return LANGUAGE_NAMES.get(code) or LANGUAGE_NAMES.get(code.split("-")[0]) or code
+
+
+# ── negotiation ─────────────────────────────────────────────────────────────
+def current_locale(restaurant) -> str:
+    """The language this request's public page is served in."""
+    if g.get("locale") is not None:
+        return g.locale
+    locales = restaurant_locales(restaurant)
+    locale = locales[0]
+    if len(locales) > 1:
+        g.vary_locale = True
+        chosen = request.args.get("lang")
+        if chosen in locales:
+            g.remember_locale = chosen
+        else:
+            chosen = request.cookies.get(LOCALE_COOKIE)
+        if chosen in locales:
+            locale = chosen
+        else:
+            locale = request.accept_languages.best_match(locales, default=locale)
+    g.locale = locale
+    return locale
+
+
+def init_app(app):
+    app.jinja_env.globals.update(language_name=language_name, form_key=form_key)
+
+    @app.before_request
+    def reset_locale():
+        # g outlives the request when an app context is already pushed
+        g.locale = None
+        g.vary_locale = False
+        g.remember_locale = None
+        g.menu = None  # the page's menu snapshot, for translated restaurant text
+
+    @app.after_request
+    def add_locale_headers(response):
+        if g.get("vary_locale"):
+            response.vary.update(("Accept-Language", "Cookie"))
+        if g.get("remember_locale"):
+            response.set_cookie(
+                LOCALE_COOKIE, g.remember_locale, max_age=LOCALE_COOKIE_MAX_AGE,
+                samesite="Lax",
+            )
+        return response
+
+
+# ── compiling ───────────────────────────────────────────────────────────────
+def apply_translations(snapshot, locale):
+    """Overwrite *snapshot*'s text with its *locale* translations, in place."""
+    targets = {
+        "restaurant": {snapshot.restaurant_id: snapshot},
+        "category": snapshot.categories_by_id,
+        "item": snapshot.items_by_id,
+    }
+    rows = db.session.execute(
+        select(Translation.kind, Translation.object_id, Translation.field, Translation.text)
+        .where(Translation.restaurant_id == snapshot.restaurant_id, Translation.locale == locale)
+    )
+    for kind, object_id, field, text in rows:
+        target = targets.get(kind, {}).get(object_id)
+        if target is None or not text or field not in FIELDS[kind]:
+            continue
+        setattr(target, field, text)
+        snapshot.size += sys.getsizeof(text)
+
+
+# ── editing ─────────────────────────────────────────────────────────────────
+def form_key(kind, object_id, field):
+    return f"t-{kind}-{object_id}-{field}"
+
+
+def translations_for(restaurant_id, locale) -> dict[str, str]:
+    """A restaurant's *locale* text keyed by :func:`form_key`."""
+    rows = db.session.execute(
+        select(Translation.kind, Translation.object_id, Translation.field, Translation.text)
+        .where(Translation.restaurant_id == restaurant_id, Translation.locale == locale)
+    )
+    return {form_key(kind, oid, field): text for kind, oid, field, text in rows}
+
+
+def save_translations(restaurant_id, locale, form, objects) -> int:
+    """Store the translation form's fields for *objects*, ``(kind, id)`` pairs.
+
+    Blank fields remove the translation, so the default text shows. Does
+    not commit. Returns the number of rows written or removed.
+    """
+    existing = {
+        form_key(t.kind, t.object_id, t.field): t for t in db.session.execute(
+            select(Translation)
+            .where(Translation.restaurant_id == restaurant_id, Translation.locale == locale)
+        ).scalars()
+    }
+    changed = 0
+    for kind, object_id in objects:
+        for field in FIELDS[kind]:
+            key = form_key(kind, object_id, field)
+            if key not in form:
+                continue
+            text = form[key].strip()
+            row = existing.get(key)
+            if row is not None and not text:
+                db.session.delete(row)
+            elif row is not None and row.text != text:
+                row.text = text
+            elif row is None and text:
+                db.session.add(Translation(
+                    restaurant_id=restaurant_id, locale=locale, kind=kind,
+                    object_id=object_id, field=field, text=text,
+                ))
+            else:
+                continue
+            changed += 1
+    return changed
+
+
+def delete_translations(connection, restaurant_id, kinds=("category", "item")):
+    """Drop a restaurant's translations of *kinds*, e.g. after its menu is replaced."""
+    connection.execute(
+        delete(Translation)
+        .where(Translation.restaurant_id == restaurant_id, Translation.kind.in_(kinds))
+    )
+
+
+@event.listens_for(Category, "after_delete")
+@event.listens_for(MenuItem, "after_delete")
+def _forget_translations(mapper, connection, target):
+    # Deleted ids can be reused by SQLite; their text must not carry over
+    kind = "category" if isinstance(target, Category) else "item"
+    connection.execute(
+        delete(Translation.__table__)
+        .where(Translation.kind == kind, Translation.object_id == target.id)
+    )
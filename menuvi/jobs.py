@@ -0,0 +1,270 @@
+"""Durable background jobs kept in the app's own SQLite database.
+
+Work that need not finish before the response — photo variants, per-table
+QR sets, re-baking static pages, purging a deleted restaurant — is queued
+as a ``jobs`` row with :func:`enqueue` and run by ``flask worker``
+(``deploy/menuvi-worker.service``). Rows survive restarts and deploys; a
+job's row is deleted once it succeeds.
+
+Tasks are plain functions registered with ``@task(name)`` and called, in
+an app context, with the JSON keyword arguments they were queued with. A
+failing task is retried with exponential backoff up to ``max_attempts``
+and then kept as ``failed`` for ``flask jobs``. A job whose worker died
+is picked up again once its lease (``JOBS_LEASE``) runs out, so tasks
+must be safe to run twice.
+
+``key`` deduplicates: while a job with the same key is still queued,
+queueing it again is a no-op. With ``JOBS_INLINE`` set (tests, or
+development without a worker) tasks run straight away in the caller;
+delayed ones are still queued.
+"""
+
+import json
+import signal
+import threading
+import time
+import traceback
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import timedelta
+
+from flask import current_app
+from sqlalchemy import and_, delete, func, insert, or_, select, update
+
+from .models import db, utcnow, Job
+
+
+@dataclass(frozen=True)
+class Task:
+    name: str
+    fn: Callable
+    max_attempts: int
+
+
+TASKS: dict[str, Task] = {}
+
+
+def task(name, max_attempts=5):
+    """Register a function as the background task *name*."""
+    def register(fn):
+        if name in TASKS:
+            raise ValueError(f"Duplicate task {name!r}")
+        TASKS[name] = Task(name, fn, max_attempts)
+        fn.task_name = name
+        return fn
+    return register
+
+
+# ── queueing ────────────────────────────────────────────────────────────────
+def enqueue(fn, key=None, delay=0, **kwargs) -> bool:
+    """Queue the task *fn* to run with *kwargs* (JSON-serialisable).
+
+    Returns False if a job with the same *key* is already queued. Commits,
+    so call it after the request's own commit.
+    """
+    app = current_app._get_current_object()
+    if app.config["JOBS_INLINE"] and not delay:
+        try:
+            fn(**kwargs)
+        except Exception:
+            app.logger.exception("Job %s failed", fn.task_name)
+        return True
+    now = utcnow()
+    result = db.session.execute(
+        insert(Job).prefix_with("OR IGNORE").values(
+            name=fn.task_name, args=json.dumps(kwargs, separators=(",", ":")),
+            key=key, status="queued", attempts=0,
+            run_at=now + timedelta(seconds=delay), created_at=now,
+        )
+    )
+    db.session.commit()
+    return result.rowcount == 1
+
+
+def claim(lease):
+    """Mark the next due job running and return it, or None.
+
+    Due means queued with ``run_at`` passed, or running under a lease older
+    than *lease* seconds (its worker died).
+    """
+    now = utcnow()
+    due = or_(
+        and_(Job.status == "queued", Job.run_at <= now),
+        and_(Job.status == "running", Job.locked_at < now - timedelta(seconds=lease)),
+    )
+    # One statement: concurrent workers can never claim the same row
+    next_id = select(Job.id).where(due).order_by(Job.run_at, Job.id).limit(1).scalar_subquery()
+    job = db.session.execute(
+        update(Job).where(Job.id == next_id)
+        .values(status="running", locked_at=now, attempts=Job.attempts + 1)
+        .returning(Job.id, Job.name, Job.args, Job.attempts)
+        .execution_options(synchronize_session=False)
+    ).first()
+    db.session.commit()
+    return job
+
+
+def backoff(attempts):
+    """Seconds before retrying a job that has failed *attempts* times."""
+    config = current_app.config
+    return min(config["JOBS_RETRY_DELAY"] * 2 ** (attempts - 1), config["JOBS_RETRY_DELAY_MAX"])
+
+
+def finish(job, error=None):
+    """Record the outcome of a claimed *job*: delete it, retry it or fail it."""
+    done = update(Job).where(Job.id == job.id).execution_options(synchronize_session=False)
+    remove = delete(Job).where(Job.id == job.id).execution_options(synchronize_session=False)
+    spec = TASKS.get(job.name)
+    if error is None:
+        db.session.execute(remove)
+    elif spec is None or job.attempts >= spec.max_attempts:
+        db.session.execute(done.values(status="failed", locked_at=None, last_error=error))
+    else:
+        retried = db.session.execute(
+            done.prefix_with("OR IGNORE").values(
+                status="queued", locked_at=None, last_error=error,
+                run_at=utcnow() + timedelta(seconds=backoff(job.attempts)),
+            )
+        ).rowcount
+        if not retried:
+            # A newer copy with the same key is queued and covers this one
+            db.session.execute(remove)
+    db.session.commit()
+
+
+def counts() -> dict[str, int]:
+    rows = db.session.execute(select(Job.status, func.count()).group_by(Job.status))
+    return {"queued": 0, "running": 0, "failed": 0, **dict(rows.all())}
+
+
+def failed_jobs():
+    return db.session.execute(
+        select(Job).where(Job.status == "failed").order_by(Job.id)
+    ).scalars().all()
+
+
+def retry_failed() -> int:
+    """Queue every failed job again with fresh attempts. Returns how many."""
+    retried = db.session.execute(
+        update(Job).prefix_with("OR IGNORE").where(Job.status == "failed")
+        .values(status="queued", attempts=0, run_at=utcnow())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    # Failed copies of a job that is queued anyway
+    db.session.execute(
+        delete(Job).where(Job.status == "failed").execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return retried
+
+
+# ── running ─────────────────────────────────────────────────────────────────
+_process_app = None
+
+
+def _execute(app, name, args):
+    """Run one job; returns None on success or the error text."""
+    spec = TASKS.get(name)
+    if spec is None:
+        return f"Unknown task {name!r}"
+    with app.app_context():
+        try:
+            spec.fn(**json.loads(args))
+        except Exception:
+            db.session.rollback()
+            return traceback.format_exc()
+    return None
+
+
+def _init_process(config):
+    global _process_app
+    from . import create_app
+
+    # Ctrl-C reaches the whole process group; let the parent wind down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _process_app = create_app(type("WorkerConfig", (), config))
+
+
+def _execute_in_process(name, args):
+    return _execute(_process_app, name, args)
+
+
+class Worker:
+    """Claims due jobs and runs them on a thread or process pool."""
+
+    def __init__(self, app, concurrency=None, mode=None):
+        self.app = app
+        self.concurrency = concurrency or app.config["JOBS_CONCURRENCY"]
+        self.mode = mode or app.config["JOBS_MODE"]
+        if self.mode not in ("thread", "process"):
+            raise ValueError(f"JOBS_MODE must be 'thread' or 'process', not {self.mode!r}")
+        self._stopping = threading.Event()
+
+    def stop(self, *_):
+        """Stop claiming jobs; running ones are allowed to finish."""
+        self._stopping.set()
+
+    def _pool(self):
+        if self.mode == "process":
+            config = {k: v for k, v in self.app.config.items() if k.isupper()}
+            return ProcessPoolExecutor(
+                self.concurrency, initializer=_init_process, initargs=(config,),
+            )
+        return ThreadPoolExecutor(self.concurrency, thread_name_prefix="jobs")
+
+    def _submit(self, pool, job):
+        if self.mode == "process":
+            return pool.submit(_execute_in_process, job.name, job.args)
+        return pool.submit(_execute, self.app, job.name, job.args)
+
+    def _finish(self, job, started, future):
+        try:
+            error = future.result()
+        except Exception as exc:  # e.g. a pool process was killed
+            error = f"{type(exc).__name__}: {exc}"
+        finish(job, error)
+        elapsed = time.monotonic() - started
+        if error is None:
+            self.app.logger.info("Job %s %s done in %.2fs", job.id, job.name, elapsed)
+        else:
+            self.app.logger.warning(
+                "Job %s %s failed (attempt %s): %s",
+                job.id, job.name, job.attempts, error.strip().splitlines()[-1],
+            )
+
+    def run(self, once=False) -> int:
+        """Run jobs until stopped, or with *once* until none are due.
+
+        Returns the number of jobs run.
+        """
+        config = self.app.config
+        running = {}
+        ran = 0
+        with self.app.app_context(), self._pool() as pool:
+            while not self._stopping.is_set():
+                while len(running) < self.concurrency:
+                    job = claim(config["JOBS_LEASE"])
+                    if job is None:
+                        break
+                    spec = TASKS.get(job.name)
+                    if spec is not None and job.attempts > spec.max_attempts:
+                        finish(job, "Lease expired: the worker running it stopped")
+                        continue
+                    running[self._submit(pool, job)] = (job, time.monotonic())
+                if not running:
+                    if once:
+                        break
+                    self._stopping.wait(config["JOBS_POLL_INTERVAL"])
+                    continue
+                done, _ = wait(
+                    running, timeout=config["JOBS_POLL_INTERVAL"], return_when=FIRST_COMPLETED,
+                )
+                for future in done:
+                    self._finish(*running.pop(future), future)
+                    ran += 1
+            # Stopping: let running jobs complete rather than leave them to the lease
+            for future, (job, started) in running.items():
+                self._finish(job, started, future)
+                ran += 1
+        return ran
@@ -0,0 +1,98 @@
+"""Compact JSON menu for client-side browsing and batched picks sync.
+
+``/<slug>/api/menu.json`` returns the whole menu in one payload: every
+category in menu order, each with its available items as positional rows
+(``item_fields`` names the columns). An item's ``photo`` is ``[digest,
+width, height, placeholder]`` or null; ``photos`` gives the URL prefix and
+widths to build its srcset from. Its ``tags`` is the bitmask of the
+restaurant's ``tags`` (``menuvi/tags.py``), so the client can apply a
+``?tag=`` filter the same way the server does. Text is in the snapshot's
+language (``menuvi/i18n.py``). The serialised bytes are built once per
+menu snapshot, so serving it costs no queries or JSON encoding once the
+snapshot is warm.
+
+Pages link it as ``?v=<menu_version>`` (plus ``&lang=`` for multilingual
+restaurants). That URL never changes content, so it is cached for a year.
+A different or missing ``v`` gets the current menu with the usual ETag
+revalidation.
+
+Picks live in the browser (``app.js``) and reach the server as one batch of
+additions and removals (``POST /<slug>/api/picks``).
+"""
+
+import json
+
+from flask import url_for
+
+from .photos import WIDTHS
+
+ITEM_FIELDS = ("id", "name", "description", "price", "photo", "tags")
+# Upper bound on ids per picks batch
+MAX_PICK_OPS = 500
+
+
+class PickOpsError(ValueError):
+    pass
+
+
+def menu_payload(restaurant, menu) -> bytes:
+    if menu.api_payload is None:
+        menu.api_payload = json.dumps({
+            "version": menu.version,
+            "restaurant": {
+                "slug": restaurant.slug,
+                "name": menu.name,
+                "tagline": menu.tagline,
+            },
+            "item_fields": ITEM_FIELDS,
+            "photos": {
+                "url": url_for("public.photo", name="-").rsplit("/", 1)[0] + "/",
+                "widths": WIDTHS,
+            },
+            "tags": [{"bit": t.bit, "slug": t.slug, "name": t.name} for t in menu.tags],
+            "categories": [
+                {
+                    "id": category.id,
+                    "name": category.name,
+                    "type": category.menu_type,
+                    "tag_mask": category.tag_mask,
+                    "items": [
+                        [
+                            item.id, item.name, item.description, item.price_display,
+                            _photo(item.photo), item.tags,
+                        ]
+                        for item in category.available_items
+                    ],
+                }
+                for category in menu.categories
+            ],
+        }, separators=(",", ":"), ensure_ascii=False).encode()
+    return menu.api_payload
+
+
+def _photo(photo):
+    if photo is None:
+        return None
+    return [photo.digest, photo.width, photo.height, photo.placeholder]
+
+
+def parse_pick_ops(data, menu):
+    """Validate a ``{"add": [...], "remove": [...]}`` batch. Returns (add, remove).
+
+    Ids that are not on the menu are dropped from ``add`` (the item may have
+    been deleted since the client loaded it); removals are applied as given.
+    """
+    if not isinstance(data, dict):
+        raise PickOpsError("Expected a JSON object.")
+    ops = []
+    for key in ("add", "remove"):
+        ids = data.get(key, [])
+        if not isinstance(ids, list) or not all(
+            isinstance(i, int) and not isinstance(i, bool) for i in ids
+        ):
+            raise PickOpsError(f"'{key}' must be a list of item ids.")
+        ops.append(ids)
+    add, remove = ops
+    if len(add) + len(remove) > MAX_PICK_OPS:
+        raise PickOpsError(f"At most {MAX_PICK_OPS} changes per request.")
+    return [i for i in add if i in menu.items_by_id], remove
@@ -0,0 +1,273 @@
+"""Per-worker cache of each restaurant's menu tree.
+
+Public pages read the whole menu of a restaurant (categories + items) on
+almost every request, while the menu itself only changes when an admin
+edits it. Snapshots are keyed by ``(restaurant id, menu_version, locale)``;
+admin writes bump ``Restaurant.menu_version`` so every worker picks up the
+new menu on its next request without any cross-process signalling. Ids are
+never reused, so a renamed slug, or a new restaurant taking a deleted one's
+slug, can never be served another restaurant's snapshot.
+
+A snapshot in one of a restaurant's other languages has its translations
+compiled in when it is built (``menuvi/i18n.py``), so serving it costs the
+same as serving the default language.
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from flask import current_app
+from sqlalchemy import select, update
+
+from .i18n import apply_translations, restaurant_locales
+from .models import db, format_price, utcnow, Category, MenuItem, Photo, Restaurant, Tag
+from .tenants import mark_changed
+
+# Rough per-object overhead used when estimating snapshot sizes
+_OBJECT_OVERHEAD = 200
+
+
+@dataclass(slots=True, eq=False)
+class CategorySnapshot:
+    id: int
+    name: str
+    menu_type: str
+    sort_order: int
+    tag_mask: int = 0
+    items: list["ItemSnapshot"] = field(default_factory=list)
+
+    @property
+    def available_items(self):
+        return [item for item in self.items if item.available]
+
+    def matching_items(self, want):
+        """Available items carrying every tag bit in *want*."""
+        if (self.tag_mask & want) != want:
+            return []
+        return [item for item in self.items if item.available and (item.tags & want) == want]
+
+
+@dataclass(slots=True, eq=False)
+class PhotoSnapshot:
+    digest: str
+    width: int
+    height: int
+    placeholder: str
+
+
+@dataclass(slots=True, eq=False)
+class TagSnapshot:
+    bit: int
+    name: str
+    slug: str
+
+
+@dataclass(slots=True, eq=False)
+class ItemSnapshot:
+    id: int
+    category_id: int
+    name: str
+    description: str
+    price_cents: int | None
+    available: bool
+    sort_order: int
+    photo: PhotoSnapshot | None = None
+    category: CategorySnapshot | None = None
+    tags: int = 0
+    labels: tuple[str, ...] = ()  # names of its tags, in registry order
+
+    @property
+    def price_display(self):
+        return format_price(self.price_cents)
+
+
+@dataclass(slots=True, eq=False)
+class MenuSnapshot:
+    restaurant_id: int
+    slug: str
+    version: int
+    categories: list[CategorySnapshot]
+    categories_by_id: dict[int, CategorySnapshot]
+    items_by_id: dict[int, ItemSnapshot]
+    tags: list[TagSnapshot] = field(default_factory=list)
+    locale: str = ""  # "" for the default language
+    # Restaurant text in this snapshot's language
+    name: str = ""
+    tagline: str = ""
+    size: int = 0
+    # Built on demand by menuvi.suggest and menuvi.menu_api
+    prefix_index: object = None
+    api_payload: bytes | None = None
+
+    def categories_of_type(self, menu_type):
+        return [c for c in self.categories if c.menu_type == menu_type]
+
+
+class MenuCache:
+    """Thread-safe LRU of menu snapshots bounded by an estimated byte size."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[int, int, str], MenuSnapshot] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, restaurant_id, version, locale=""):
+        key = (restaurant_id, version, locale)
+        with self._lock:
+            snapshot = self._entries.get(key)
+            if snapshot is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return snapshot
+
+    def put(self, snapshot):
+        if snapshot.size > self.max_bytes:
+            return
+        with self._lock:
+            # A newer version makes every older snapshot of the restaurant dead weight
+            for key in [
+                k for k in self._entries
+                if k[0] == snapshot.restaurant_id
+                and (k[1] != snapshot.version or k[2] == snapshot.locale)
+            ]:
+                self._discard(key)
+            self._entries[(snapshot.restaurant_id, snapshot.version, snapshot.locale)] = snapshot
+            self.current_bytes += snapshot.size
+            while self.current_bytes > self.max_bytes:
+                self._discard(next(iter(self._entries)))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def _discard(self, key):
+        snapshot = self._entries.pop(key)
+        self.current_bytes -= snapshot.size
+
+
+def init_app(app):
+    app.extensions["menu_cache"] = MenuCache(app.config["MENU_CACHE_MAX_BYTES"])
+
+
+def get_cache() -> MenuCache:
+    return current_app.extensions["menu_cache"]
+
+
+def get_menu(restaurant, locale=None) -> MenuSnapshot:
+    """Return the menu snapshot for *restaurant*, building it on a miss.
+
+    *locale* selects one of the restaurant's other languages; the default
+    language is used for None or a locale the restaurant does not offer.
+    """
+    locales = restaurant_locales(restaurant)
+    locale = locale if locale in locales[1:] else ""
+    cache = get_cache()
+    snapshot = cache.get(restaurant.id, restaurant.menu_version, locale)
+    if snapshot is None:
+        snapshot = build_snapshot(restaurant, locale)
+        cache.put(snapshot)
+    return snapshot
+
+
+def build_snapshot(restaurant, locale="") -> MenuSnapshot:
+    cat_rows = db.session.execute(
+        select(
+            Category.id, Category.name, Category.menu_type, Category.sort_order,
+            Category.tag_mask,
+        )
+        .where(Category.restaurant_id == restaurant.id)
+        .order_by(Category.sort_order, Category.id)
+    ).all()
+    item_rows = db.session.execute(
+        select(
+            MenuItem.id, MenuItem.category_id, MenuItem.name, MenuItem.description,
+            MenuItem.price_cents, MenuItem.available, MenuItem.sort_order,
+            MenuItem.photo, Photo.width, Photo.height, Photo.placeholder, MenuItem.tags,
+        )
+        .join(Category, Category.id == MenuItem.category_id)
+        .outerjoin(Photo, Photo.digest == MenuItem.photo)
+        .where(Category.restaurant_id == restaurant.id)
+        .order_by(MenuItem.sort_order, MenuItem.id)
+    ).all()
+    tags = [
+        TagSnapshot(row.bit, row.name, row.slug) for row in db.session.execute(
+            select(Tag.bit, Tag.name, Tag.slug)
+            .where(Tag.restaurant_id == restaurant.id)
+            .order_by(Tag.name)
+        )
+    ]
+
+    size = _OBJECT_OVERHEAD * (1 + len(tags))
+    categories = []
+    categories_by_id = {}
+    for row in cat_rows:
+        cat = CategorySnapshot(
+            id=row.id, name=row.name, menu_type=row.menu_type or "dining",
+            sort_order=row.sort_order or 0, tag_mask=row.tag_mask or 0,
+        )
+        categories.append(cat)
+        categories_by_id[cat.id] = cat
+        size += _OBJECT_OVERHEAD + sys.getsizeof(cat.name)
+
+    items_by_id = {}
+    for row in item_rows:
+        cat = categories_by_id[row.category_id]
+        item = ItemSnapshot(
+            id=row.id, category_id=row.category_id, name=row.name,
+            description=row.description or "", price_cents=row.price_cents,
+            available=bool(row.available), sort_order=row.sort_order or 0,
+            category=cat, tags=row.tags or 0,
+        )
+        if item.tags:
+            item.labels = tuple(t.name for t in tags if item.tags >> t.bit & 1)
+        if row.photo is not None:
+            item.photo = PhotoSnapshot(row.photo, row.width, row.height, row.placeholder)
+            size += _OBJECT_OVERHEAD + sys.getsizeof(row.placeholder)
+        cat.items.append(item)
+        items_by_id[item.id] = item
+        size += (
+            _OBJECT_OVERHEAD + sys.getsizeof(item.name)
+            + sys.getsizeof(item.description)
+        )
+
+    snapshot = MenuSnapshot(
+        restaurant_id=restaurant.id,
+        slug=restaurant.slug,
+        version=restaurant.menu_version,
+        categories=categories,
+        categories_by_id=categories_by_id,
+        items_by_id=items_by_id,
+        tags=tags,
+        locale=locale,
+        name=restaurant.name,
+        tagline=restaurant.tagline or "",
+        size=size,
+    )
+    if locale:
+        apply_translations(snapshot, locale)
+    return snapshot
+
+
+def bump_menu_version(restaurant_id):
+    """Mark a restaurant's public content as changed.
+
+    Runs in the caller's session, so the bump commits atomically with the
+    edit that caused it.
+    """
+    db.session.execute(
+        update(Restaurant)
+        .where(Restaurant.id == restaurant_id)
+        .values(menu_version=Restaurant.menu_version + 1, updated_at=utcnow())
+    )
+    mark_changed()
@@ -0,0 +1,357 @@
+"""Bulk menu import and export (CSV and JSON).
+
+Both formats carry one row per menu item::
+
+    category, menu_type, name, description, price, available
+
+Exports stream from a single categories JOIN menu_items query, so a large
+menu is never held in memory. Imports read the upload incrementally too:
+CSV a line at a time, JSON one array element at a time from fixed-size
+chunks. Imports resolve the restaurant's existing
+categories and items in one query each, then write in batches with bulk
+``insert()`` / ``update()`` statements inside the caller's transaction:
+rows matching an existing item (same category and name) update it, the
+rest are appended. Bulk statements bypass the ORM events that maintain the
+search index, so the restaurant's index is rebuilt once at the end.
+"""
+
+import csv
+import io
+import json
+from dataclasses import dataclass
+from itertools import islice
+
+from sqlalchemy import delete, func, insert, select, update
+
+from .i18n import delete_translations
+from .menu_cache import bump_menu_version
+from .models import db, Category, MenuItem
+
+FIELDS = ("category", "menu_type", "name", "description", "price", "available")
+FORMATS = ("csv", "json")
+MENU_TYPES = ("dining", "beverages")
+BATCH_SIZE = 1000
+# JSON uploads are read this many characters at a time; one item may not
+# exceed JSON_ITEM_MAX characters
+JSON_CHUNK = 64 * 1024
+JSON_ITEM_MAX = 1024 * 1024
+
+_TRUE = {"1", "true", "yes", "y", "on"}
+_FALSE = {"0", "false", "no", "n", "off"}
+
+
+class MenuImportError(ValueError):
+    def __init__(self, line, message):
+        super().__init__(f"Row {line}: {message}")
+        self.line = line
+
+
+@dataclass(slots=True)
+class ImportResult:
+    created: int = 0
+    updated: int = 0
+    categories: int = 0
+
+
+# ── reading ─────────────────────────────────────────────────────────────────
+def read_csv(stream):
+    """Yield ``(line, row)`` pairs from a text stream with a header row."""
+    reader = csv.DictReader(stream)
+    if reader.fieldnames is None:
+        return
+    reader.fieldnames = [f.strip().lower() for f in reader.fieldnames]
+    for row in reader:
+        yield reader.line_num, row
+
+
+class _JSONReader:
+    """Chunked buffer over a text stream for decoding one value at a time."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.decoder = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _more(self):
+        chunk = self.stream.read(JSON_CHUNK)
+        self.eof = not chunk
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return bool(chunk)
+
+    def peek(self):
+        """The next non-whitespace character, or "" at the end of the stream."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._more():
+                return ""
+
+    def value(self, index):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as exc:
+                if len(self.buf) - self.pos > JSON_ITEM_MAX:
+                    raise MenuImportError(index, "item is too large") from None
+                if self.eof or not self._more():
+                    raise MenuImportError(index, f"invalid JSON ({exc.msg})") from None
+                continue
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self.buf) and not self.eof and self._more():
+                continue
+            self.pos = end
+            return value
+
+
+def read_json(stream):
+    """Yield ``(index, row)`` pairs from a JSON array of objects, as it is read."""
+    reader = _JSONReader(stream)
+    if reader.peek() != "[":
+        raise MenuImportError(1, "expected a JSON array of items")
+    reader.pos += 1
+    index = 0
+    if reader.peek() == "]":
+        reader.pos += 1
+    else:
+        while True:
+            index += 1
+            row = reader.value(index)
+            if not isinstance(row, dict):
+                raise MenuImportError(index, "expected an object")
+            yield index, row
+            separator = reader.peek()
+            reader.pos += 1
+            if separator == "]":
+                break
+            if separator != ",":
+                raise MenuImportError(index, "invalid JSON (expected ',' or ']')")
+    if reader.peek():
+        raise MenuImportError(index, "invalid JSON (extra data after the array)")
+
+
+def read_rows(stream, fmt):
+    if fmt == "csv":
+        return read_csv(stream)
+    return read_json(stream)
+
+
+def _text(row, key):
+    value = row.get(key)
+    return "" if value is None else str(value).strip()
+
+
+def _price(line, value):
+    if value is None or value == "":
+        return None
+    if isinstance(value, bool):
+        raise MenuImportError(line, f"invalid price {value!r}")
+    if isinstance(value, (int, float)):
+        return int(round(value * 100))
+    s = str(value).replace("$", "").replace(",", "").strip()
+    if not s:
+        return None
+    try:
+        return int(round(float(s) * 100))
+    except ValueError:
+        raise MenuImportError(line, f"invalid price {value!r}") from None
+
+
+def _available(line, value):
+    if value is None or value == "":
+        return True
+    if isinstance(value, bool):
+        return value
+    s = str(value).strip().lower()
+    if s in _TRUE:
+        return True
+    if s in _FALSE:
+        return False
+    raise MenuImportError(line, f"invalid available value {value!r}")
+
+
+def clean_row(line, row):
+    """Validate one raw row into column values."""
+    category = _text(row, "category")
+    name = _text(row, "name")
+    if not category:
+        raise MenuImportError(line, "category is required")
+    if not name:
+        raise MenuImportError(line, "name is required")
+    menu_type = _text(row, "menu_type").lower() or "dining"
+    if menu_type not in MENU_TYPES:
+        raise MenuImportError(line, f"menu_type must be one of {', '.join(MENU_TYPES)}")
+    return {
+        "category": category,
+        "menu_type": menu_type,
+        "name": name,
+        "description": _text(row, "description"),
+        "price_cents": _price(line, row.get("price")),
+        "available": _available(line, row.get("available")),
+    }
+
+
+# ── importing ───────────────────────────────────────────────────────────────
+def _clear_menu(restaurant_id):
+    category_ids = select(Category.id).where(Category.restaurant_id == restaurant_id)
+    db.session.execute(delete(MenuItem).where(MenuItem.category_id.in_(category_ids)))
+    db.session.execute(delete(Category).where(Category.restaurant_id == restaurant_id))
+    # Bulk deletes skip the ORM events; new rows may reuse the old ids
+    delete_translations(db.session.connection(), restaurant_id)
+
+
+def import_menu(restaurant_id, rows, replace=False) -> ImportResult:
+    """Write ``(line, row)`` pairs into a restaurant's menu.
+
+    Runs in the caller's session and does not commit; a
+    ``MenuImportError`` leaves the session to be rolled back.
+    """
+    if replace:
+        _clear_menu(restaurant_id)
+
+    categories = {
+        name: cid for cid, name in db.session.execute(
+            select(Category.id, Category.name)
+            .where(Category.restaurant_id == restaurant_id)
+        )
+    }
+    next_category_order = db.session.execute(
+        select(func.coalesce(func.max(Category.sort_order) + 1, 0))
+        .where(Category.restaurant_id == restaurant_id)
+    ).scalar_one()
+    items = {}
+    next_item_order = {}
+    for iid, cid, name, sort_order in db.session.execute(
+        select(MenuItem.id, MenuItem.category_id, MenuItem.name, MenuItem.sort_order)
+        .join(Category)
+        .where(Category.restaurant_id == restaurant_id)
+    ):
+        items[(cid, name)] = iid
+        next_item_order[cid] = max(next_item_order.get(cid, 0), (sort_order or 0) + 1)
+
+    result = ImportResult()
+    rows = iter(rows)
+    while batch := [clean_row(line, row) for line, row in islice(rows, BATCH_SIZE)]:
+        new_categories = {}
+        for row in batch:
+            if row["category"] not in categories:
+                new_categories.setdefault(row["category"], row["menu_type"])
+        if new_categories:
+            created = db.session.execute(
+                insert(Category).returning(Category.id, Category.name),
+                [
+                    {
+                        "restaurant_id": restaurant_id,
+                        "name": name,
+                        "menu_type": menu_type,
+                        "sort_order": next_category_order + n,
+                    }
+                    for n, (name, menu_type) in enumerate(new_categories.items())
+                ],
+            )
+            categories.update((name, cid) for cid, name in created)
+            next_category_order += len(new_categories)
+            result.categories += len(new_categories)
+
+        inserts, updates = {}, {}
+        for row in batch:
+            cid = categories[row["category"]]
+            values = {
+                "name": row["name"],
+                "description": row["description"],
+                "price_cents": row["price_cents"],
+                "available": row["available"],
+            }
+            key = (cid, row["name"])
+            if key in items:
+                updates[key] = {"id": items[key], **values}
+            elif key in inserts:
+                inserts[key].update(values)
+            else:
+                order = next_item_order.get(cid, 0)
+                next_item_order[cid] = order + 1
+                inserts[key] = {"category_id": cid, "sort_order": order, **values}
+
+        if updates:
+            db.session.execute(update(MenuItem), list(updates.values()))
+            result.updated += len(updates)
+        if inserts:
+            created = db.session.execute(
+                insert(MenuItem).returning(
+                    MenuItem.id, MenuItem.category_id, MenuItem.name,
+                ),
+                list(inserts.values()),
+            )
+            items.update(((cid, name), iid) for iid, cid, name in created)
+            result.created += len(inserts)
+
+    connection = db.session.connection()
+    if connection.dialect.name == "sqlite":
+        from .search import rebuild_index
+        rebuild_index(connection, restaurant_id)
+    bump_menu_version(restaurant_id)
+    return result
+
+
+# ── exporting ───────────────────────────────────────────────────────────────
+def export_rows(restaurant_id):
+    """Yield one dict per menu item, in menu order, from a single query."""
+    result = db.session.execute(
+        select(
+            Category.name.label("category"), Category.menu_type,
+            MenuItem.name, MenuItem.description, MenuItem.price_cents,
+            MenuItem.available,
+        )
+        .join(MenuItem, MenuItem.category_id == Category.id)
+        .where(Category.restaurant_id == restaurant_id)
+        .order_by(Category.sort_order, Category.id, MenuItem.sort_order, MenuItem.id)
+        .execution_options(yield_per=BATCH_SIZE)
+    )
+    for row in result:
+        yield {
+            "category": row.category,
+            "menu_type": row.menu_type or "dining",
+            "name": row.name,
+            "description": row.description or "",
+            "price": None if row.price_cents is None else f"{row.price_cents / 100:.2f}",
+            "available": bool(row.available),
+        }
+
+
+def iter_csv(rows):
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=FIELDS)
+    writer.writeheader()
+    for row in rows:
+        writer.writerow({
+            **row,
+            "price": row["price"] or "",
+            "available": "1" if row["available"] else "0",
+        })
+        if buf.tell() >= 8192:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue()
+
+
+def iter_json(rows):
+    yield "["
+    separator = "\n  "
+    for row in rows:
+        yield separator + json.dumps(row, ensure_ascii=False)
+        separator = ",\n  "
+    yield "\n]\n"
+
+
+def iter_export(restaurant_id, fmt):
+    """Chunks of the restaurant's menu serialised as *fmt*."""
+    rows = export_rows(restaurant_id)
+    if fmt == "csv":
+        return iter_csv(rows)
+    return iter_json(rows)
@@ -0,0 +1,195 @@
+"""Versioned schema migrations.
+
+``db.create_all()`` only creates missing tables, so columns and indexes
+added to existing tables need a migration. The schema version lives in a
+one-row ``schema_version`` table. New databases are created at the latest
+version directly (``create_all`` already builds the current schema);
+existing ones are brought forward with ``flask db-upgrade``.
+
+Each migration runs in its own transaction together with the version bump
+and must be idempotent, so a database that was partly migrated by hand
+upgrades cleanly.
+"""
+
+from dataclasses import dataclass
+from typing import Callable
+
+from sqlalchemy import MetaData, inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateTable
+
+from .models import db, Restaurant, utcnow
+
+schema_version = db.Table(
+    "schema_version", db.metadata,
+    db.Column("version", db.Integer, nullable=False),
+)
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    apply: Callable[[Connection], None]
+
+
+MIGRATIONS: list[Migration] = []
+
+
+def migration(version, description):
+    def register(fn):
+        assert not MIGRATIONS or MIGRATIONS[-1].version == version - 1
+        MIGRATIONS.append(Migration(version, description, fn))
+        return fn
+    return register
+
+
+def head():
+    return MIGRATIONS[-1].version
+
+
+# ── migrations ──────────────────────────────────────────────────────────────
+@migration(1, "Add restaurants.menu_version and restaurants.updated_at")
+def _content_version(conn):
+    columns = {c["name"] for c in inspect(conn).get_columns("restaurants")}
+    if "menu_version" not in columns:
+        conn.execute(text(
+            "ALTER TABLE restaurants ADD COLUMN menu_version INTEGER NOT NULL DEFAULT 1"
+        ))
+    if "updated_at" not in columns:
+        # ADD COLUMN ... NOT NULL needs a constant default
+        now = utcnow().strftime("%Y-%m-%d %H:%M:%S.%f")
+        conn.execute(text(
+            f"ALTER TABLE restaurants ADD COLUMN updated_at DATETIME NOT NULL DEFAULT '{now}'"
+        ))
+
+
+@migration(2, "Index the columns public and admin queries filter and sort on")
+def _hot_path_indexes(conn):
+    for statement in (
+        "CREATE INDEX IF NOT EXISTS ix_restaurants_name ON restaurants (name)",
+        "CREATE INDEX IF NOT EXISTS ix_users_restaurant_id ON users (restaurant_id)",
+        "CREATE INDEX IF NOT EXISTS ix_categories_restaurant_type_order "
+        "ON categories (restaurant_id, menu_type, sort_order)",
+        "CREATE INDEX IF NOT EXISTS ix_menu_items_category_available_order "
+        "ON menu_items (category_id, available, sort_order)",
+    ):
+        conn.execute(text(statement))
+    if conn.dialect.name == "sqlite":
+        conn.execute(text("ANALYZE"))
+
+
+@migration(3, "Add menu_items.photo")
+def _item_photos(conn):
+    # The photos table itself is created by create_all
+    columns = {c["name"] for c in inspect(conn).get_columns("menu_items")}
+    if "photo" not in columns:
+        conn.execute(text(
+            "ALTER TABLE menu_items ADD COLUMN photo VARCHAR(64) REFERENCES photos (digest)"
+        ))
+
+
+@migration(4, "Add item availability windows and restaurant schedule columns")
+def _availability_windows(conn):
+    for table, column, ddl in (
+        ("restaurants", "timezone", "VARCHAR(64) NOT NULL DEFAULT 'UTC'"),
+        ("restaurants", "schedule_checked_at", "DATETIME"),
+        ("restaurants", "next_transition", "DATETIME"),
+        ("menu_items", "available_from", "DATE"),
+        ("menu_items", "available_until", "DATE"),
+        ("menu_items", "available_days", "INTEGER"),
+        ("menu_items", "available_start", "TIME"),
+        ("menu_items", "available_end", "TIME"),
+    ):
+        if column not in {c["name"] for c in inspect(conn).get_columns(table)}:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+
+@migration(5, "Add menu_items.tags and categories.tag_mask")
+def _item_tags(conn):
+    # The tags registry itself is created by create_all
+    for table, column in (("menu_items", "tags"), ("categories", "tag_mask")):
+        if column not in {c["name"] for c in inspect(conn).get_columns(table)}:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0"))
+
+
+@migration(6, "Add restaurants.locales")
+def _restaurant_locales(conn):
+    # The translations table itself is created by create_all
+    if "locales" not in {c["name"] for c in inspect(conn).get_columns("restaurants")}:
+        conn.execute(text(
+            "ALTER TABLE restaurants ADD COLUMN locales VARCHAR(100) NOT NULL DEFAULT 'en'"
+        ))
+
+
+@migration(7, "Rebuild restaurants with AUTOINCREMENT so ids are never reused")
+def _restaurant_autoincrement(conn):
+    if conn.dialect.name != "sqlite":
+        return
+    ddl = conn.execute(text(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'restaurants'"
+    )).scalar()
+    if "AUTOINCREMENT" in ddl.upper():
+        return
+    # SQLite cannot alter a primary key: copy into a new table and swap
+    table = Restaurant.__table__
+    rebuilt = table.to_metadata(MetaData(), name="restaurants_rebuilt")
+    conn.execute(CreateTable(rebuilt))
+    existing = {c["name"] for c in inspect(conn).get_columns("restaurants")}
+    columns = ", ".join(c.name for c in table.columns if c.name in existing)
+    conn.execute(text(
+        f"INSERT INTO restaurants_rebuilt ({columns}) SELECT {columns} FROM restaurants"
+    ))
+    conn.execute(text("DROP TABLE restaurants"))
+    conn.execute(text("ALTER TABLE restaurants_rebuilt RENAME TO restaurants"))
+    for index in table.indexes:
+        index.create(conn)
+
+
+# ── runner ──────────────────────────────────────────────────────────────────
+def current_version(conn):
+    if not inspect(conn).has_table("schema_version"):
+        return 0
+    return conn.execute(text("SELECT max(version) FROM schema_version")).scalar() or 0
+
+
+def stamp(conn, version):
+    schema_version.create(conn, checkfirst=True)
+    conn.execute(schema_version.delete())
+    conn.execute(schema_version.insert().values(version=version))
+
+
+def pending(conn):
+    version = current_version(conn)
+    return [m for m in MIGRATIONS if m.version > version]
+
+
+def upgrade(engine, target=None):
+    """Apply pending migrations up to *target* (default: latest). Returns them."""
+    target = head() if target is None else target
+    applied = []
+    with engine.connect() as conn:
+        todo = [m for m in pending(conn) if m.version <= target]
+    for m in todo:
+        with engine.begin() as conn:
+            m.apply(conn)
+            stamp(conn, m.version)
+        applied.append(m)
+    return applied
+
+
+def init_schema(app):
+    """Create missing tables; stamp new databases, warn about pending migrations."""
+    with db.engine.begin() as conn:
+        fresh = not inspect(conn).has_table("restaurants")
+    db.create_all()
+    with db.engine.begin() as conn:
+        if fresh:
+            stamp(conn, head())
+            return
+        todo = pending(conn)
+    if todo:
+        app.logger.warning(
+            "Database schema is at version %d; %d migration(s) pending. "
+            "Run `flask db-upgrade`.", todo[0].version - 1, len(todo),
+        )
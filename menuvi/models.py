@@ -1,3 +1,5 @@
+from datetime import datetime, timezone
+
 from flask_login import UserMixin
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash, check_password_hash
@@ -5,8 +7,28 @@ from werkzeug.security import generate_password_hash, check_password_hash
 db = SQLAlchemy()
 
 
+def utcnow():
+    """Naive UTC timestamp, as stored in SQLite DateTime columns."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def format_price(price_cents):
+    if price_cents is None:
+        return ""
+    dollars = price_cents / 100
+    return f"${dollars:,.2f}"
+
+
+# Indexes below are also created on existing databases by menuvi/migrations.py;
+# keep the two in step.
 class Restaurant(db.Model):
     __tablename__ = "restaurants"
+    __table_args__ = (
+        db.Index("ix_restaurants_name", "name"),
+        # Never reuse a deleted restaurant's id: its rows are purged by a
+        # queued job, which must not reach a restaurant created meanwhile
+        {"sqlite_autoincrement": True},
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(200), nullable=False)
@@ -14,6 +36,18 @@ class Restaurant(db.Model):
     tagline = db.Column(db.String(300), default="")
     brand_color = db.Column(db.String(20), default="#c9a84c")
     brand_color_dim = db.Column(db.String(20), default="#a68939")
+    # Content version: bumped on every menu or branding write. Keys the
+    # per-worker menu cache and the public pages' ETags.
+    menu_version = db.Column(db.Integer, nullable=False, default=1)
+    updated_at = db.Column(db.DateTime, nullable=False, default=utcnow)
+    # Scheduled items (see menuvi/schedule.py): local time zone, when item
+    # visibility was last brought up to date, and when it next changes (UTC)
+    timezone = db.Column(db.String(64), nullable=False, default="UTC")
+    schedule_checked_at = db.Column(db.DateTime, nullable=True)
+    next_transition = db.Column(db.DateTime, nullable=True)
+    # Languages the menu is offered in, comma-separated; the first is the
+    # default, in which names and descriptions are entered (menuvi/i18n.py)
+    locales = db.Column(db.String(100), nullable=False, default="en")
 
     categories = db.relationship(
         "Category", back_populates="restaurant", cascade="all, delete-orphan",
@@ -21,6 +55,9 @@ class Restaurant(db.Model):
     users = db.relationship(
         "User", back_populates="restaurant",
     )
+    ready_signals = db.relationship(
+        "ReadySignal", cascade="all, delete-orphan",
+    )
 
     def __repr__(self):
         return f"<Restaurant {self.name!r}>"
@@ -28,6 +65,9 @@ class Restaurant(db.Model):
 
 class User(UserMixin, db.Model):
     __tablename__ = "users"
+    __table_args__ = (
+        db.Index("ix_users_restaurant_id", "restaurant_id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(254), unique=True, nullable=False)
@@ -57,6 +97,7 @@ class Category(db.Model):
     __tablename__ = "categories"
     __table_args__ = (
         db.UniqueConstraint("restaurant_id", "name", name="uq_category_restaurant_name"),
+        db.Index("ix_categories_restaurant_type_order", "restaurant_id", "menu_type", "sort_order"),
     )
 
     id = db.Column(db.Integer, primary_key=True)
@@ -66,6 +107,8 @@ class Category(db.Model):
     name = db.Column(db.String(120), nullable=False)
     menu_type = db.Column(db.String(20), default="dining")  # "dining" or "beverages"
     sort_order = db.Column(db.Integer, default=0)
+    # OR of its items' tags, kept up to date by menuvi/tags.py
+    tag_mask = db.Column(db.Integer, nullable=False, default=0)
 
     restaurant = db.relationship("Restaurant", back_populates="categories")
     items = db.relationship(
@@ -79,6 +122,9 @@ class Category(db.Model):
 
 class MenuItem(db.Model):
     __tablename__ = "menu_items"
+    __table_args__ = (
+        db.Index("ix_menu_items_category_available_order", "category_id", "available", "sort_order"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     category_id = db.Column(
@@ -89,15 +135,163 @@ class MenuItem(db.Model):
     price_cents = db.Column(db.Integer, nullable=True)
     available = db.Column(db.Boolean, default=True)
     sort_order = db.Column(db.Integer, default=0)
+    photo = db.Column(db.String(64), db.ForeignKey("photos.digest"), nullable=True)
+    # Allergen/dietary tags: bit n set = the restaurant's Tag with bit n
+    tags = db.Column(db.Integer, nullable=False, default=0)
+    # Availability window in the restaurant's local time; all None = always.
+    # Dates are inclusive, days a Monday=1 ... Sunday=64 bitmask, and an end
+    # time before the start time runs past midnight.
+    available_from = db.Column(db.Date, nullable=True)
+    available_until = db.Column(db.Date, nullable=True)
+    available_days = db.Column(db.Integer, nullable=True)
+    available_start = db.Column(db.Time, nullable=True)
+    available_end = db.Column(db.Time, nullable=True)
 
     category = db.relationship("Category", back_populates="items")
 
     @property
     def price_display(self):
-        if self.price_cents is None:
-            return ""
-        dollars = self.price_cents / 100
-        return f"${dollars:,.2f}"
+        return format_price(self.price_cents)
+
+    @property
+    def scheduled(self):
+        return any(
+            v is not None for v in (
+                self.available_from, self.available_until, self.available_days,
+                self.available_start, self.available_end,
+            )
+        )
 
     def __repr__(self):
         return f"<MenuItem {self.name!r}>"
+
+
+class Tag(db.Model):
+    """An allergen or dietary label of one restaurant (see menuvi/tags.py)."""
+
+    __tablename__ = "tags"
+    __table_args__ = (
+        db.UniqueConstraint("restaurant_id", "bit", name="uq_tag_restaurant_bit"),
+        db.UniqueConstraint("restaurant_id", "slug", name="uq_tag_restaurant_slug"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    restaurant_id = db.Column(db.Integer, db.ForeignKey("restaurants.id"), nullable=False)
+    bit = db.Column(db.Integer, nullable=False)  # position in MenuItem.tags
+    name = db.Column(db.String(60), nullable=False)
+    slug = db.Column(db.String(60), nullable=False)  # ?tag= value on public pages
+
+    @property
+    def mask(self):
+        return 1 << self.bit
+
+    def __repr__(self):
+        return f"<Tag {self.name!r} bit {self.bit}>"
+
+
+class Translation(db.Model):
+    """Restaurant, category or item text in one of the restaurant's other languages.
+
+    ``kind`` and ``object_id`` name the row (``"item"``, 42) and ``field``
+    the column (``name``, ``description`` or ``tagline``). Read once per
+    (restaurant, locale) menu snapshot, see menuvi/i18n.py.
+    """
+
+    __tablename__ = "translations"
+    __table_args__ = (
+        db.UniqueConstraint(
+            "restaurant_id", "locale", "kind", "object_id", "field", name="uq_translation",
+        ),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    restaurant_id = db.Column(db.Integer, db.ForeignKey("restaurants.id"), nullable=False)
+    locale = db.Column(db.String(16), nullable=False)
+    kind = db.Column(db.String(10), nullable=False)  # "restaurant", "category" or "item"
+    object_id = db.Column(db.Integer, nullable=False)
+    field = db.Column(db.String(20), nullable=False)
+    text = db.Column(db.Text, nullable=False)
+
+    def __repr__(self):
+        return f"<Translation {self.locale} {self.kind} {self.object_id} {self.field}>"
+
+
+class Photo(db.Model):
+    """An uploaded image, stored once by content hash (see menuvi/photos.py)."""
+
+    __tablename__ = "photos"
+
+    digest = db.Column(db.String(64), primary_key=True)  # SHA-256 of the upload
+    width = db.Column(db.Integer, nullable=False)
+    height = db.Column(db.Integer, nullable=False)
+    placeholder = db.Column(db.Text, nullable=False)  # tiny data: URI shown while loading
+    created_at = db.Column(db.DateTime, nullable=False, default=utcnow)
+
+    def __repr__(self):
+        return f"<Photo {self.digest[:12]} {self.width}x{self.height}>"
+
+
+class PickSet(db.Model):
+    """A visitor's shortlist at one restaurant (see menuvi/picks.py)."""
+
+    __tablename__ = "pick_sets"
+    __table_args__ = (
+        db.Index("ix_pick_sets_expires_at", "expires_at"),
+        {"sqlite_with_rowid": False},
+    )
+
+    session_id = db.Column(db.String(32), primary_key=True)
+    restaurant_id = db.Column(db.Integer, primary_key=True)
+    items = db.Column(db.LargeBinary, nullable=False)  # delta-varint item ids
+    expires_at = db.Column(db.Integer, nullable=False)  # unix time
+
+    def __repr__(self):
+        return f"<PickSet {self.session_id!r} r{self.restaurant_id}>"
+
+
+class ReadySignal(db.Model):
+    """A customer's "ready to order", open until staff acknowledge it."""
+
+    __tablename__ = "ready_signals"
+    __table_args__ = (
+        db.Index("ix_ready_signals_restaurant_open", "restaurant_id", "acknowledged_at"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    restaurant_id = db.Column(db.Integer, db.ForeignKey("restaurants.id"), nullable=False)
+    session_id = db.Column(db.String(32), nullable=False)
+    table_label = db.Column(db.String(20), nullable=True)
+    items = db.Column(db.LargeBinary, nullable=False, default=b"")  # picks at the time
+    created_at = db.Column(db.DateTime, nullable=False, default=utcnow)
+    acknowledged_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<ReadySignal {self.id} r{self.restaurant_id} table={self.table_label!r}>"
+
+
+class Job(db.Model):
+    """A unit of background work, run by `flask worker` (see menuvi/jobs.py)."""
+
+    __tablename__ = "jobs"
+    __table_args__ = (
+        db.Index("ix_jobs_status_run_at", "status", "run_at"),
+        # One queued job per key: INSERT OR IGNORE drops duplicates
+        db.Index(
+            "ux_jobs_queued_key", "key", unique=True,
+            sqlite_where=db.text("status = 'queued'"),
+        ),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    args = db.Column(db.Text, nullable=False, default="{}")  # JSON keyword arguments
+    key = db.Column(db.String(200), nullable=True)
+    status = db.Column(db.String(10), nullable=False, default="queued")  # queued|running|failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    run_at = db.Column(db.DateTime, nullable=False, default=utcnow)
+    locked_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=utcnow)
+
+    def __repr__(self):
+        return f"<Job {self.id} {self.name} {self.status}>"
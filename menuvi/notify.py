@@ -0,0 +1,289 @@
+"""Live staff notifications over Server-Sent Events.
+
+SSE connections stay open for hours, which would pin the sync gunicorn
+workers that serve the menu. They are held by a separate asyncio process
+instead (``flask notify-server``, ``deploy/menuvi-notify.service``), which
+nginx routes ``/<slug>/admin/events`` to. An idle connection there costs a
+socket and a few kilobytes; nothing runs for it apart from a heartbeat
+comment every ``NOTIFY_HEARTBEAT`` seconds.
+
+Workers publish by sending a JSON datagram to the server's Unix socket
+(``NOTIFY_SOCKET``). The server fans it out in-process to every connection
+subscribed to that restaurant. Publishing never blocks a request: if the
+server is down, the event is dropped and staff see it on their next page
+load, since the events themselves are stored in the database by the caller.
+
+Connections authenticate with a signed, expiring token from the admin
+page, so the notify server needs no session or database access.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import signal
+import socket
+from urllib.parse import parse_qs, urlsplit
+
+from flask import current_app
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+log = logging.getLogger(__name__)
+
+EVENTS_PATH = re.compile(r"^/([^/]+)/admin/events$")
+_TOKEN_SALT = "menuvi-notify"
+_MAX_REQUEST_HEAD = 8192
+_REQUEST_TIMEOUT = 10
+_SSE_HEADERS = (
+    b"HTTP/1.1 200 OK\r\n"
+    b"Content-Type: text/event-stream\r\n"
+    b"Cache-Control: no-cache\r\n"
+    b"Connection: keep-alive\r\n"
+    b"X-Accel-Buffering: no\r\n"
+    # Token-authenticated, no cookies: safe to read from another origin in development
+    b"Access-Control-Allow-Origin: *\r\n"
+    b"\r\n"
+    b"retry: 5000\n\n"
+)
+_HEARTBEAT = b": ping\n\n"
+
+
+# ── tokens ──────────────────────────────────────────────────────────────────
+def _serializer(secret_key):
+    return URLSafeTimedSerializer(secret_key, salt=_TOKEN_SALT)
+
+
+def make_token(restaurant):
+    return _serializer(current_app.config["SECRET_KEY"]).dumps([restaurant.id, restaurant.slug])
+
+
+def read_token(secret_key, token, max_age):
+    """(restaurant id, slug) from *token*, or None if invalid or expired."""
+    try:
+        restaurant_id, slug = _serializer(secret_key).loads(token, max_age=max_age)
+    except (BadSignature, TypeError, ValueError):
+        return None
+    return restaurant_id, slug
+
+
+def events_url(restaurant):
+    origin = current_app.config["NOTIFY_EVENTS_ORIGIN"].rstrip("/")
+    return f"{origin}/{restaurant.slug}/admin/events?token={make_token(restaurant)}"
+
+
+# ── publishing (app workers) ────────────────────────────────────────────────
+_publisher = None
+
+
+def publish(restaurant_id, event, data, event_id=None) -> bool:
+    """Hand an event to the notify server. Returns False if it was dropped."""
+    global _publisher
+    message = json.dumps(
+        {"channel": restaurant_id, "event": event, "data": data, "id": event_id},
+        separators=(",", ":"),
+    ).encode()
+    try:
+        if _publisher is None:
+            _publisher = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            _publisher.setblocking(False)
+        _publisher.sendto(message, current_app.config["NOTIFY_SOCKET"])
+    except OSError as e:
+        # Not running, or its queue is full: staff get it on their next page load
+        current_app.logger.info("Notification %r for restaurant %s dropped: %s",
+                                event, restaurant_id, e)
+        return False
+    return True
+
+
+# ── server ──────────────────────────────────────────────────────────────────
+def format_event(event, data, event_id=None) -> bytes:
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return ("\n".join(lines) + "\n\n").encode()
+
+
+class Hub:
+    """Connections by restaurant id; writes are fire-and-forget."""
+
+    def __init__(self, max_buffer):
+        self.max_buffer = max_buffer
+        self.channels: dict[int, set[asyncio.StreamWriter]] = {}
+
+    def __len__(self):
+        return sum(len(writers) for writers in self.channels.values())
+
+    def subscribe(self, channel, writer):
+        self.channels.setdefault(channel, set()).add(writer)
+
+    def unsubscribe(self, channel, writer):
+        writers = self.channels.get(channel)
+        if writers is not None:
+            writers.discard(writer)
+            if not writers:
+                del self.channels[channel]
+
+    def broadcast(self, channel, payload):
+        for writer in list(self.channels.get(channel, ())):
+            self._send(channel, writer, payload)
+
+    def ping(self):
+        for channel, writers in list(self.channels.items()):
+            for writer in list(writers):
+                self._send(channel, writer, _HEARTBEAT)
+
+    def _send(self, channel, writer, payload):
+        transport = writer.transport
+        if transport.is_closing():
+            return
+        # A client that stopped reading would otherwise grow this without bound
+        if transport.get_write_buffer_size() > self.max_buffer:
+            self.unsubscribe(channel, writer)
+            transport.abort()
+            return
+        writer.write(payload)
+
+
+class _Datagrams(asyncio.DatagramProtocol):
+    def __init__(self, hub):
+        self.hub = hub
+
+    def datagram_received(self, data, addr):
+        try:
+            message = json.loads(data)
+            channel = int(message["channel"])
+            payload = format_event(str(message["event"]), message.get("data"), message.get("id"))
+        except (ValueError, KeyError, TypeError):
+            log.warning("Ignoring malformed notification datagram")
+            return
+        self.hub.broadcast(channel, payload)
+
+
+def _response(status):
+    reason = {400: "Bad Request", 403: "Forbidden", 404: "Not Found", 405: "Method Not Allowed"}
+    return f"HTTP/1.1 {status} {reason[status]}\r\nContent-Length: 0\r\nConnection: close\r\n\r\n".encode()
+
+
+class NotifyServer:
+    def __init__(self, secret_key, socket_path, host="127.0.0.1", port=8011,
+                 heartbeat=25, token_max_age=12 * 3600, max_buffer=64 * 1024):
+        self.secret_key = secret_key
+        self.socket_path = socket_path
+        self.host = host
+        self.port = port
+        self.heartbeat = heartbeat
+        self.token_max_age = token_max_age
+        self.hub = Hub(max_buffer)
+        self._server = None
+        self._datagrams = None
+        self._heartbeat_task = None
+        self._handlers = set()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            config["SECRET_KEY"], config["NOTIFY_SOCKET"],
+            host=config["NOTIFY_HOST"], port=config["NOTIFY_PORT"],
+            heartbeat=config["NOTIFY_HEARTBEAT"],
+            token_max_age=config["NOTIFY_TOKEN_MAX_AGE"],
+        )
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)  # left over from a previous run
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.bind(self.socket_path)
+        os.chmod(self.socket_path, 0o660)
+        self._datagrams, _ = await loop.create_datagram_endpoint(
+            lambda: _Datagrams(self.hub), sock=sock,
+        )
+        self._server = await asyncio.start_server(
+            self._handle, self.host, self.port,
+            limit=_MAX_REQUEST_HEAD, backlog=1024,
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        if self.heartbeat > 0:
+            self._heartbeat_task = asyncio.create_task(self._heartbeats())
+        log.info("Notify server on %s:%s, socket %s", self.host, self.port, self.socket_path)
+
+    async def close(self):
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+        self._server.close()
+        for writers in list(self.hub.channels.values()):
+            for writer in list(writers):
+                writer.transport.abort()
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        await self._server.wait_closed()
+        self._datagrams.close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    async def _heartbeats(self):
+        while True:
+            await asyncio.sleep(self.heartbeat)
+            self.hub.ping()
+
+    def _authorise(self, head):
+        """Restaurant id for a request head, or an HTTP status to refuse with."""
+        try:
+            method, target, _ = head.split(b"\r\n", 1)[0].decode("latin-1").split(" ")
+        except ValueError:
+            return None, 400
+        if method != "GET":
+            return None, 405
+        url = urlsplit(target)
+        match = EVENTS_PATH.match(url.path)
+        if match is None:
+            return None, 404
+        token = parse_qs(url.query).get("token", [""])[0]
+        claims = read_token(self.secret_key, token, self.token_max_age)
+        if claims is None or claims[1] != match.group(1):
+            return None, 403
+        return claims[0], None
+
+    async def _handle(self, reader, writer):
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), _REQUEST_TIMEOUT)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError,
+                asyncio.LimitOverrunError, ConnectionError):
+            writer.transport.abort()
+            return
+        channel, status = self._authorise(head)
+        if channel is None:
+            writer.write(_response(status))
+            writer.close()
+            return
+
+        writer.write(_SSE_HEADERS)
+        self.hub.subscribe(channel, writer)
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        try:
+            # EventSource never sends anything after the request; EOF means gone
+            while await reader.read(1024):
+                pass
+        except ConnectionError:
+            pass
+        finally:
+            self._handlers.discard(task)
+            self.hub.unsubscribe(channel, writer)
+            writer.transport.abort()
+
+
+def run(config):
+    """Serve until SIGINT/SIGTERM."""
+    async def main():
+        server = NotifyServer.from_config(config)
+        await server.start()
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+        await stop.wait()
+        await server.close()
+
+    asyncio.run(main())
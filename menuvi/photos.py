@@ -0,0 +1,219 @@
+"""Item photos: content-addressed originals and responsive variants.
+
+Uploads are stored once under ``UPLOAD_FOLDER/photos/`` named by the
+SHA-256 of their bytes, so the same image used twice (or uploaded again)
+costs nothing. The upload request only checks the image and records its
+size and a tiny placeholder that pages inline while the real image loads.
+
+Resized WebP and JPEG copies at each of ``WIDTHS`` are rendered off the
+request by a background job (``menuvi/jobs.py``). A variant requested
+before it exists is rendered on demand, so pages can link every width
+straight away.
+
+Variant files never change once written. ``/media/photos/<name>`` checks
+the name and hands the file to nginx with ``X-Accel-Redirect``
+(``PHOTOS_ACCEL_PREFIX``); without nginx the app sends it itself. Either
+way it is cached for a year.
+"""
+
+import base64
+import hashlib
+import io
+import os
+import re
+import tempfile
+from pathlib import Path
+
+from flask import Response, current_app, send_file, url_for
+
+from .assets import IMMUTABLE
+from .jobs import enqueue, task
+from .models import db, Photo
+
+# Rendered widths in CSS pixels x density; never wider than the original
+WIDTHS = (160, 320, 640, 1280)
+FORMATS = {
+    "webp": ("WEBP", "image/webp", {"quality": 80, "method": 4}),
+    "jpg": ("JPEG", "image/jpeg", {"quality": 82, "optimize": True, "progressive": True}),
+}
+ACCEPTED = {"JPEG", "PNG", "WEBP"}
+# Refuse decompression bombs before decoding (about 48 megapixels)
+MAX_PIXELS = 48_000_000
+PLACEHOLDER_WIDTH = 16
+_VARIANT = re.compile(r"^([0-9a-f]{64})-(\d+)\.(webp|jpg)$")
+
+
+class PhotoError(ValueError):
+    pass
+
+
+# ── storage ─────────────────────────────────────────────────────────────────
+def _dir(folder, digest) -> Path:
+    return Path(folder) / "photos" / digest[:2]
+
+
+def original_path(folder, digest) -> Path:
+    return _dir(folder, digest) / digest
+
+
+def variant_name(digest, width, ext):
+    return f"{digest}-{width}.{ext}"
+
+
+def variant_path(folder, name) -> Path:
+    return _dir(folder, name) / name
+
+
+def _write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    with os.fdopen(fd, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+
+
+def widths_for(width):
+    """The variant widths worth rendering for an original *width* pixels wide."""
+    return [w for w in WIDTHS if w <= width] or [WIDTHS[0]]
+
+
+# ── upload ──────────────────────────────────────────────────────────────────
+def _open(data):
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        img = Image.open(io.BytesIO(data))
+    except (UnidentifiedImageError, OSError):
+        raise PhotoError("That file is not an image.")
+    if img.format not in ACCEPTED:
+        raise PhotoError("Photos must be JPEG, PNG or WebP.")
+    if img.width * img.height > MAX_PIXELS:
+        raise PhotoError("That photo is too large; please resize it first.")
+    return img
+
+
+def _upright(img):
+    """Apply EXIF rotation and flatten transparency onto white."""
+    from PIL import Image, ImageOps
+
+    img = ImageOps.exif_transpose(img)
+    if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+        img = img.convert("RGBA")
+        background = Image.new("RGB", img.size, "white")
+        background.paste(img, mask=img.getchannel("A"))
+        return background
+    return img.convert("RGB")
+
+
+def describe(data):
+    """(width, height, placeholder data URI) of an upload, upright."""
+    img = _open(data)
+    width, height = img.size
+    if img.getexif().get(0x0112, 1) in (5, 6, 7, 8):  # rotated a quarter turn
+        width, height = height, width
+    try:
+        # JPEGs decode straight at a fraction of their size
+        img.draft("RGB", (PLACEHOLDER_WIDTH * 4, PLACEHOLDER_WIDTH * 4))
+        img = _upright(img)
+        img.thumbnail((PLACEHOLDER_WIDTH, PLACEHOLDER_WIDTH))
+        buf = io.BytesIO()
+        img.save(buf, "WEBP", quality=40)
+    except OSError:
+        raise PhotoError("That image is damaged and could not be read.")
+    return width, height, "data:image/webp;base64," + base64.b64encode(buf.getvalue()).decode()
+
+
+def store_photo(data) -> Photo:
+    """Save an uploaded image and return its Photo row (added to the session)."""
+    digest = hashlib.sha256(data).hexdigest()
+    photo = db.session.get(Photo, digest)
+    if photo is None:
+        width, height, placeholder = describe(data)
+        photo = Photo(digest=digest, width=width, height=height, placeholder=placeholder)
+        db.session.add(photo)
+    path = original_path(current_app.config["UPLOAD_FOLDER"], digest)
+    if not path.exists():
+        _write(path, data)
+    return photo
+
+
+# ── variants ────────────────────────────────────────────────────────────────
+def render_variants(folder, digest) -> int:
+    """Write any missing variants of a stored original. Returns how many."""
+    from PIL import Image
+
+    original = original_path(folder, digest)
+    with Image.open(original) as img:
+        img = _upright(img)
+        missing = [
+            (width, ext) for width in widths_for(img.width) for ext in FORMATS
+            if not variant_path(folder, variant_name(digest, width, ext)).exists()
+        ]
+        # Largest first, each downscaled from the last: cheaper than from the original
+        current = img
+        for width in sorted({w for w, _ in missing}, reverse=True):
+            if width < current.width:
+                height = max(1, round(current.height * width / current.width))
+                current = current.resize((width, height), Image.LANCZOS, reducing_gap=3.0)
+            for ext in FORMATS:
+                if (width, ext) not in missing:
+                    continue
+                fmt, _, options = FORMATS[ext]
+                buf = io.BytesIO()
+                current.save(buf, fmt, **options)
+                _write(variant_path(folder, variant_name(digest, width, ext)), buf.getvalue())
+    return len(missing)
+
+
+@task("photos.render_variants")
+def _render_task(digest):
+    render_variants(current_app.config["UPLOAD_FOLDER"], digest)
+
+
+def render_variants_later(digest):
+    """Queue variant rendering for a just-stored photo (after the commit)."""
+    enqueue(_render_task, key=f"photo:{digest}", digest=digest)
+
+
+def variant_file(folder, name) -> Path | None:
+    """Path of the variant called *name*, rendering it if needed; None if invalid."""
+    match = _VARIANT.match(name)
+    if match is None or int(match.group(2)) not in WIDTHS:
+        return None
+    path = variant_path(folder, name)
+    if not path.exists():
+        if not original_path(folder, match.group(1)).exists():
+            return None
+        render_variants(folder, match.group(1))
+        if not path.exists():
+            return None  # wider than the original
+    return path
+
+
+def send_variant(path) -> Response:
+    mimetype = FORMATS[path.suffix[1:]][1]
+    prefix = current_app.config["PHOTOS_ACCEL_PREFIX"]
+    if prefix:
+        resp = Response(mimetype=mimetype)
+        resp.headers["X-Accel-Redirect"] = f"{prefix.rstrip('/')}/{path.parent.name}/{path.name}"
+    else:
+        resp = send_file(path, mimetype=mimetype, etag=False)
+    resp.headers["Cache-Control"] = IMMUTABLE
+    return resp
+
+
+# ── templates ───────────────────────────────────────────────────────────────
+def photo_url(photo, width, ext="jpg"):
+    """URL of the widest variant of *photo* no wider than *width*."""
+    width = max([w for w in widths_for(photo.width) if w <= width] or [WIDTHS[0]])
+    return url_for("public.photo", name=variant_name(photo.digest, width, ext))
+
+
+def photo_srcset(photo, ext):
+    return ", ".join(
+        f"{photo_url(photo, w, ext)} {min(w, photo.width)}w" for w in widths_for(photo.width)
+    )
+
+
+def init_app(app):
+    app.jinja_env.globals.update(photo_url=photo_url, photo_srcset=photo_srcset)
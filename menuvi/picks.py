@@ -0,0 +1,279 @@
+"""Server-side "My Picks" storage.
+
+The session cookie only carries an opaque, fixed-size id (``session["sid"]``,
+set on a visitor's first pick). Picks themselves are stored per
+(session id, restaurant), so shortlists no longer leak between restaurants
+and the cookie does not grow with every pick.
+
+A pick set is the sorted item ids, delta-encoded as unsigned LEB128
+varints: a 30-item shortlist of nearby ids fits in about 30 bytes. Sets
+expire ``PICKS_TTL_HOURS`` after their last change.
+
+Stores are pluggable through ``PICKS_STORE``: ``"sqlite"`` (default, the
+``pick_sets`` table, one upserted row per change) or ``"memory"`` (per
+process, for development and tests).
+"""
+
+import secrets
+import threading
+import time
+from abc import ABC, abstractmethod
+
+from flask import current_app, g, session
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.sqlite import insert
+
+from .compression import skip_body_cache
+from .models import db, PickSet
+
+SESSION_KEY = "sid"
+# Expired rows are purged at most this often per worker
+_PURGE_INTERVAL = 3600
+
+
+# ── encoding ────────────────────────────────────────────────────────────────
+def encode(ids) -> bytes:
+    """Sorted, de-duplicated ids as delta-encoded varints."""
+    out = bytearray()
+    previous = 0
+    for value in sorted(set(ids)):
+        delta = value - previous
+        previous = value
+        while delta >= 0x80:
+            out.append((delta & 0x7F) | 0x80)
+            delta >>= 7
+        out.append(delta)
+    return bytes(out)
+
+
+def decode(data) -> list[int]:
+    ids = []
+    value = shift = previous = 0
+    for byte in data or b"":
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        previous += value
+        ids.append(previous)
+        value = shift = 0
+    return ids
+
+
+# ── stores ──────────────────────────────────────────────────────────────────
+class PickStore(ABC):
+    """Interface: pick sets keyed by (session id, restaurant id)."""
+
+    def __init__(self, ttl_seconds):
+        self.ttl = ttl_seconds
+
+    def get(self, sid, restaurant_id) -> list[int]:
+        return self.read(sid, restaurant_id)[0]
+
+    @abstractmethod
+    def read(self, sid, restaurant_id) -> tuple[list[int], int]:
+        """The pick set and when it last changed (unix seconds, 0 if none)."""
+
+    def add(self, sid, restaurant_id, item_id) -> list[int]:
+        return self._update(sid, restaurant_id, lambda ids: ids | {item_id})
+
+    def remove(self, sid, restaurant_id, item_id) -> list[int]:
+        return self._update(sid, restaurant_id, lambda ids: ids - {item_id})
+
+    def apply(self, sid, restaurant_id, add=(), remove=()) -> list[int]:
+        """Apply a batch of additions and removals in one write."""
+        add, remove = set(add), set(remove)
+        return self._update(sid, restaurant_id, lambda ids: (ids | add) - remove)
+
+    @abstractmethod
+    def clear(self, sid, restaurant_id):
+        ...
+
+    @abstractmethod
+    def purge_expired(self) -> int:
+        ...
+
+    @abstractmethod
+    def _update(self, sid, restaurant_id, change) -> list[int]:
+        """Replace the pick set with ``change(ids)`` and return it sorted."""
+
+
+class MemoryPickStore(PickStore):
+    def __init__(self, ttl_seconds):
+        super().__init__(ttl_seconds)
+        self._sets: dict[tuple[str, int], tuple[bytes, float]] = {}
+        self._lock = threading.Lock()
+
+    def read(self, sid, restaurant_id):
+        entry = self._sets.get((sid, restaurant_id))
+        if entry is None or entry[1] <= time.time():
+            return [], 0
+        return decode(entry[0]), int(entry[1]) - self.ttl
+
+    def _update(self, sid, restaurant_id, change):
+        with self._lock:
+            ids = sorted(change(set(self.get(sid, restaurant_id))))
+            self._sets[(sid, restaurant_id)] = (encode(ids), int(time.time()) + self.ttl)
+        return ids
+
+    def clear(self, sid, restaurant_id):
+        with self._lock:
+            self._sets.pop((sid, restaurant_id), None)
+
+    def purge_expired(self):
+        now = time.time()
+        with self._lock:
+            expired = [k for k, (_, expires) in self._sets.items() if expires <= now]
+            for key in expired:
+                del self._sets[key]
+        return len(expired)
+
+
+class SQLitePickStore(PickStore):
+    """One ``pick_sets`` row per (session, restaurant), written with an upsert.
+
+    The upsert only applies if the row still holds the value it was
+    computed from, so two concurrent taps from the same visitor cannot
+    overwrite each other; the loser re-reads and retries.
+    """
+
+    def __init__(self, ttl_seconds):
+        super().__init__(ttl_seconds)
+        self._next_purge = time.monotonic() + _PURGE_INTERVAL
+
+    def _row(self, sid, restaurant_id):
+        return db.session.execute(
+            select(PickSet.items, PickSet.expires_at).where(
+                PickSet.session_id == sid, PickSet.restaurant_id == restaurant_id,
+            )
+        ).first()
+
+    def read(self, sid, restaurant_id):
+        row = self._row(sid, restaurant_id)
+        if row is None or row.expires_at <= int(time.time()):
+            return [], 0
+        return decode(row.items), row.expires_at - self.ttl
+
+    def _update(self, sid, restaurant_id, change):
+        self._maybe_purge()
+        while True:
+            row = self._row(sid, restaurant_id)
+            old = row.items if row is not None else None
+            current = set(decode(old)) if row and row.expires_at > time.time() else set()
+            ids = sorted(change(current))
+            stmt = insert(PickSet).values(
+                session_id=sid, restaurant_id=restaurant_id,
+                items=encode(ids), expires_at=int(time.time()) + self.ttl,
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[PickSet.session_id, PickSet.restaurant_id],
+                set_={"items": stmt.excluded["items"], "expires_at": stmt.excluded.expires_at},
+                where=PickSet.items.is_(old) if old is not None else None,
+            )
+            if db.session.execute(stmt).rowcount:
+                db.session.commit()
+                return ids
+            db.session.rollback()
+
+    def clear(self, sid, restaurant_id):
+        db.session.execute(delete(PickSet).where(
+            PickSet.session_id == sid, PickSet.restaurant_id == restaurant_id,
+        ))
+        db.session.commit()
+
+    def purge_expired(self):
+        count = db.session.execute(
+            delete(PickSet).where(PickSet.expires_at <= int(time.time()))
+        ).rowcount
+        db.session.commit()
+        return count
+
+    def _maybe_purge(self):
+        if time.monotonic() >= self._next_purge:
+            self._next_purge = time.monotonic() + _PURGE_INTERVAL
+            self.purge_expired()
+
+
+STORES = {"sqlite": SQLitePickStore, "memory": MemoryPickStore}
+
+
+def init_app(app):
+    kind = app.config["PICKS_STORE"]
+    if kind not in STORES:
+        raise ValueError(f"PICKS_STORE must be one of {', '.join(STORES)}")
+    app.extensions["picks_store"] = STORES[kind](app.config["PICKS_TTL_HOURS"] * 3600)
+    app.jinja_env.globals["picks_changed_at"] = picks_changed_at
+
+
+def get_store() -> PickStore:
+    return current_app.extensions["picks_store"]
+
+
+# ── request helpers ─────────────────────────────────────────────────────────
+def session_id(create=False):
+    """The visitor's opaque picks id; only issued once they pick something."""
+    # Cookies from before server-side picks carried the whole list
+    if "picks" in session:
+        del session["picks"]
+    sid = session.get(SESSION_KEY)
+    if sid is None and create:
+        sid = session[SESSION_KEY] = secrets.token_urlsafe(16)
+    return sid
+
+
+def _read(restaurant_id):
+    # Read at most once per request
+    cached = g.get("picks")
+    if cached is None or cached[0] != restaurant_id:
+        sid = session_id()
+        ids, changed_at = get_store().read(sid, restaurant_id) if sid else ([], 0)
+        cached = g.picks = (restaurant_id, ids, changed_at)
+    return cached
+
+
+def current_picks(restaurant_id) -> list[int]:
+    """The visitor's picks at *restaurant_id*."""
+    return _read(restaurant_id)[1]
+
+
+def picks_changed_at(restaurant_id) -> int:
+    """When the visitor's picks last changed on the server.
+
+    Pages carry it so the browser can tell whether a page's picks are newer
+    than the copy it keeps (see ``app.js``).
+    """
+    changed_at = _read(restaurant_id)[2]
+    if changed_at:
+        # Per visitor and not part of the ETag: the body must not be shared
+        skip_body_cache()
+    return changed_at
+
+
+def add_pick(restaurant_id, item_id) -> list[int]:
+    ids = get_store().add(session_id(create=True), restaurant_id, item_id)
+    g.pop("picks", None)
+    return ids
+
+
+def remove_pick(restaurant_id, item_id) -> list[int]:
+    sid = session_id()
+    ids = get_store().remove(sid, restaurant_id, item_id) if sid else []
+    g.pop("picks", None)
+    return ids
+
+
+def sync_picks(restaurant_id, add=(), remove=()) -> tuple[list[int], int]:
+    """Apply a client's queued changes. Returns the picks and their change time."""
+    sid = session_id(create=bool(add))
+    if sid is not None and (add or remove):
+        get_store().apply(sid, restaurant_id, add, remove)
+        g.pop("picks", None)
+    _, ids, changed_at = _read(restaurant_id)
+    return ids, changed_at
+
+
+def clear_picks(restaurant_id):
+    sid = session_id()
+    if sid:
+        get_store().clear(sid, restaurant_id)
+    g.picks = (restaurant_id, [], 0)
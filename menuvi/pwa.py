@@ -0,0 +1,105 @@
+"""Installable, offline-capable public menus.
+
+Each restaurant gets a web app manifest and a service worker at
+``/<slug>/sw.js`` (so its scope is the restaurant's pages and nothing
+else). The worker is rendered per menu version: its cache name is the
+page ETag without the picks part, so an admin edit, template change or
+asset build changes the script, the browser installs the new worker, and
+it precaches into a fresh cache before dropping the old one.
+
+Menu pages are served stale-while-revalidate from that cache. The picks
+page is per visitor, so it is network-first with the cached copy as the
+offline fallback, and the worker refreshes that copy after every
+pick/remove/clear. This keeps "Show Waiter" usable with no signal.
+"""
+
+import io
+import zlib
+from functools import lru_cache
+
+from flask import url_for
+
+from .assets import asset_url
+from .http_cache import page_etag
+
+ICON_SIZES = (192, 512)
+BACKGROUND = "#0f0f0f"
+
+
+def cache_version(restaurant):
+    return page_etag(restaurant, ())
+
+
+def precache_urls(restaurant, menu):
+    """(shell, items): URLs the worker must cache on install, and best-effort ones."""
+    slug = restaurant.slug
+    shell = [
+        url_for("public.landing", slug=slug),
+        url_for("public.menu", slug=slug, menu_type="dining"),
+        url_for("public.menu", slug=slug, menu_type="beverages"),
+        url_for("public.picks", slug=slug),
+        url_for("public.api_menu", slug=slug, v=restaurant.menu_version),
+        asset_url("css/style.css"),
+        asset_url("js/app.js"),
+    ]
+    items = []
+    for category in menu.categories:
+        available = category.available_items
+        if not available:
+            continue
+        shell.append(url_for("public.category", slug=slug, category_id=category.id))
+        items.extend(
+            url_for("public.item_detail", slug=slug, item_id=item.id) for item in available
+        )
+    return shell, items
+
+
+def manifest(restaurant):
+    slug = restaurant.slug
+    return {
+        "name": restaurant.name,
+        "short_name": restaurant.name[:12],
+        "description": restaurant.tagline or f"Menu for {restaurant.name}",
+        "start_url": url_for("public.landing", slug=slug),
+        "scope": url_for("public.landing", slug=slug),
+        "display": "standalone",
+        "background_color": BACKGROUND,
+        "theme_color": restaurant.brand_color,
+        "icons": [
+            {
+                "src": url_for("public.pwa_icon", slug=slug, size=size,
+                               v=icon_version(restaurant)),
+                "sizes": f"{size}x{size}",
+                "type": "image/png",
+                "purpose": "any maskable",
+            }
+            for size in ICON_SIZES
+        ],
+    }
+
+
+def icon_initial(restaurant):
+    return (restaurant.name.strip()[:1] or "M").upper()
+
+
+def icon_version(restaurant):
+    # Icons only change with the initial and colour, so they can be cached for good
+    key = f"{icon_initial(restaurant)}{restaurant.brand_color}".encode()
+    return f"{zlib.crc32(key):x}"
+
+
+@lru_cache(maxsize=256)
+def icon_png(initial, color, size) -> bytes:
+    """Brand-coloured square with the restaurant's initial."""
+    from PIL import Image, ImageDraw, ImageFont
+
+    try:
+        img = Image.new("RGB", (size, size), color)
+    except ValueError:
+        img = Image.new("RGB", (size, size), "#c9a84c")
+    draw = ImageDraw.Draw(img)
+    font = ImageFont.load_default(size=size // 2)
+    draw.text((size / 2, size / 2), initial, fill=BACKGROUND, font=font, anchor="mm")
+    buf = io.BytesIO()
+    img.save(buf, format="PNG", optimize=True)
+    return buf.getvalue()
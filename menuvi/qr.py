@@ -0,0 +1,147 @@
+"""QR code rendering with an on-disk, content-addressed cache.
+
+A QR image is a pure function of its URL and render options, so rendered
+PNGs are stored under ``UPLOAD_FOLDER/qr/`` named by a hash of both and
+never rendered twice. Bulk per-table sets render their cache misses across
+a process pool and are bundled as a zip of PNGs or a printable PDF sheet;
+the admin download renders a set's misses in a background job first.
+"""
+
+import hashlib
+import io
+import json
+import os
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from .jobs import task
+
+# Bump when the rendering below changes so old cache entries are ignored
+RENDER_VERSION = 1
+DEFAULT_OPTIONS = {"box_size": 20, "border": 2}
+# Below this many misses a pool costs more than it saves
+_POOL_THRESHOLD = 8
+
+# Printable sheet layout: A4 at 150 dpi, 2 x 3 codes per page
+_PAGE_SIZE = (1240, 1754)
+_GRID = (2, 3)
+_CELL_QR = 480
+
+
+def cache_path(folder, url, options=None) -> Path:
+    options = {**DEFAULT_OPTIONS, **(options or {})}
+    key = json.dumps(
+        {"v": RENDER_VERSION, "url": url, **options}, sort_keys=True,
+    ).encode()
+    digest = hashlib.sha256(key).hexdigest()
+    return Path(folder) / "qr" / digest[:2] / f"{digest}.png"
+
+
+def render_png(url, box_size, border) -> bytes:
+    import qrcode
+
+    qr = qrcode.QRCode(box_size=box_size, border=border)
+    qr.add_data(url)
+    qr.make(fit=True)
+    img = qr.make_image(fill_color="black", back_color="white")
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def _render_to_file(job):
+    url, options, path = job
+    data = render_png(url, **options)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    with os.fdopen(fd, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+    return str(path)
+
+
+def qr_png(folder, url, options=None) -> Path:
+    """Path of the cached PNG for *url*, rendering it on a miss."""
+    path = cache_path(folder, url, options)
+    if not path.exists():
+        _render_to_file((url, {**DEFAULT_OPTIONS, **(options or {})}, path))
+    return path
+
+
+def qr_pngs(folder, urls, options=None, workers=None) -> list[Path]:
+    """Cached PNG paths for many URLs, rendering misses in a process pool."""
+    options = {**DEFAULT_OPTIONS, **(options or {})}
+    paths = [cache_path(folder, url, options) for url in urls]
+    missing = [(url, options, str(p)) for url, p in zip(urls, paths) if not p.exists()]
+    if len(missing) >= _POOL_THRESHOLD and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(_render_to_file, missing, chunksize=8))
+    else:
+        for job in missing:
+            _render_to_file(job)
+    return paths
+
+
+def table_url(site_url, table):
+    return f"{site_url}?table={table}"
+
+
+def table_codes(folder, site_url, tables, workers=None):
+    """[(table number, PNG path)] for each table of a restaurant."""
+    urls = [table_url(site_url, t) for t in tables]
+    return list(zip(tables, qr_pngs(folder, urls, workers=workers)))
+
+
+def tables_ready(folder, site_url, tables) -> bool:
+    """Whether every table code is already cached."""
+    return all(cache_path(folder, table_url(site_url, t)).exists() for t in tables)
+
+
+@task("qr.render_tables")
+def render_tables(site_url, count):
+    from flask import current_app
+
+    table_codes(
+        current_app.config["UPLOAD_FOLDER"], site_url, list(range(1, count + 1)),
+        workers=current_app.config["QR_POOL_WORKERS"],
+    )
+
+
+def build_zip(codes, prefix) -> bytes:
+    buf = io.BytesIO()
+    # PNGs are already compressed; storing them keeps this fast
+    with zipfile.ZipFile(buf, "w", compression=zipfile.ZIP_STORED) as zf:
+        for table, path in codes:
+            zf.write(path, f"{prefix}-table-{table:03d}.png")
+    return buf.getvalue()
+
+
+def build_sheet(codes, title) -> bytes:
+    """A printable multi-page PDF with labelled codes, six per A4 page."""
+    from PIL import Image, ImageDraw
+
+    cols, rows = _GRID
+    cell_w, cell_h = _PAGE_SIZE[0] // cols, _PAGE_SIZE[1] // rows
+    per_page = cols * rows
+    pages = []
+    for start in range(0, len(codes), per_page):
+        page = Image.new("RGB", _PAGE_SIZE, "white")
+        draw = ImageDraw.Draw(page)
+        for slot, (table, path) in enumerate(codes[start:start + per_page]):
+            x = (slot % cols) * cell_w
+            y = (slot // cols) * cell_h
+            with Image.open(path) as img:
+                code = img.convert("RGB").resize((_CELL_QR, _CELL_QR), Image.NEAREST)
+            page.paste(code, (x + (cell_w - _CELL_QR) // 2, y + 40))
+            draw.text(
+                (x + cell_w // 2, y + 40 + _CELL_QR + 20),
+                f"{title} — Table {table}", fill="black", anchor="mt", font_size=28,
+            )
+        pages.append(page)
+    buf = io.BytesIO()
+    if pages:
+        pages[0].save(buf, format="PDF", save_all=True, append_images=pages[1:], resolution=150)
+    return buf.getvalue()
@@ -0,0 +1,63 @@
+"""Count SQL statements issued per request (and inside tests).
+
+Every statement that reaches the DBAPI cursor is counted, so lazy loads
+triggered from templates show up just like explicit queries. In debug mode
+(or with ``QUERY_COUNT_HEADER`` set) the total is returned to the client as
+an ``X-Query-Count`` response header.
+"""
+
+from contextlib import contextmanager
+
+from flask import g, has_app_context
+from sqlalchemy import event
+
+HEADER = "X-Query-Count"
+
+# Counters opened with count_queries(); only used from tests and CLI tooling
+_counters: list["QueryCounter"] = []
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        self.statements: list[str] = []
+
+    def record(self, statement):
+        self.count += 1
+        self.statements.append(statement)
+
+
+@contextmanager
+def count_queries():
+    """Count every statement executed while the block is active."""
+    counter = QueryCounter()
+    _counters.append(counter)
+    try:
+        yield counter
+    finally:
+        _counters.remove(counter)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    for counter in _counters:
+        counter.record(statement)
+    if has_app_context():
+        counter = g.get("query_counter")
+        if counter is not None:
+            counter.record(statement)
+
+
+def init_app(app, db):
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", _before_cursor_execute)
+
+    @app.before_request
+    def start_query_counter():
+        g.query_counter = QueryCounter()
+
+    @app.after_request
+    def add_query_count_header(response):
+        counter = g.get("query_counter")
+        if counter is not None and (app.debug or app.config["QUERY_COUNT_HEADER"]):
+            response.headers[HEADER] = str(counter.count)
+        return response
@@ -0,0 +1,95 @@
+"""Customers signal "ready to order"; staff see it live and acknowledge it.
+
+A signal is one ``ready_signals`` row per visitor session, open until a
+staff member acknowledges it. Pressing the button again refreshes the
+open signal (table number, picks, time) instead of adding another.
+Every change is stored first and then published to the notify server
+(``menuvi/notify.py``), so a missed live event only delays it until the
+next dashboard load.
+
+The session remembers which restaurants the visitor has signalled at, so
+the picks page only looks for an open signal where there can be one.
+"""
+
+from flask import session
+from sqlalchemy import select
+
+from .menu_cache import get_menu
+from .models import db, utcnow, ReadySignal
+from .notify import publish
+from .picks import current_picks, decode, encode, session_id
+
+TABLE_LABEL_MAX = 20
+SESSION_KEY = "ready"  # restaurant ids this session has signalled at
+
+
+def payload(signal, menu):
+    """JSON-ready description of *signal* for the staff dashboard."""
+    items = [menu.items_by_id[i].name for i in decode(signal.items) if i in menu.items_by_id]
+    return {
+        "id": signal.id,
+        "table": signal.table_label or "",
+        "items": items,
+        "created_at": signal.created_at.strftime("%H:%M"),
+    }
+
+
+def open_signal(restaurant_id):
+    """The current visitor's unacknowledged signal, if any."""
+    sid = session_id()
+    if sid is None:
+        return None
+    return db.session.execute(
+        select(ReadySignal).where(
+            ReadySignal.restaurant_id == restaurant_id,
+            ReadySignal.session_id == sid,
+            ReadySignal.acknowledged_at.is_(None),
+        )
+    ).scalar_one_or_none()
+
+
+def visitor_signal(restaurant_id):
+    """:func:`open_signal` for the picks page; no query unless the visitor has signalled."""
+    if restaurant_id not in session.get(SESSION_KEY, ()):
+        return None
+    signal = open_signal(restaurant_id)
+    if signal is None:
+        # Acknowledged since: stop looking until the next signal
+        session[SESSION_KEY] = [r for r in session[SESSION_KEY] if r != restaurant_id]
+    return signal
+
+
+def open_signals(restaurant_id):
+    return db.session.execute(
+        select(ReadySignal)
+        .where(ReadySignal.restaurant_id == restaurant_id, ReadySignal.acknowledged_at.is_(None))
+        .order_by(ReadySignal.created_at, ReadySignal.id)
+    ).scalars().all()
+
+
+def signal_ready(restaurant, table_label=None):
+    """Open (or refresh) the visitor's signal and notify staff."""
+    signal = open_signal(restaurant.id)
+    if signal is None:
+        signal = ReadySignal(restaurant_id=restaurant.id, session_id=session_id(create=True))
+        db.session.add(signal)
+    signal.table_label = (table_label or "").strip()[:TABLE_LABEL_MAX] or None
+    signal.items = encode(current_picks(restaurant.id))
+    signal.created_at = utcnow()
+    db.session.commit()
+    if restaurant.id not in session.get(SESSION_KEY, ()):
+        session[SESSION_KEY] = [*session.get(SESSION_KEY, ()), restaurant.id]
+    publish(restaurant.id, "ready", payload(signal, get_menu(restaurant)), event_id=signal.id)
+    return signal
+
+
+def acknowledge(restaurant_id, signal_id):
+    """Close a signal; returns False if it does not belong to this restaurant."""
+    signal = db.session.get(ReadySignal, signal_id)
+    if signal is None or signal.restaurant_id != restaurant_id:
+        return False
+    if signal.acknowledged_at is None:
+        signal.acknowledged_at = utcnow()
+        db.session.commit()
+        publish(restaurant_id, "ack", {"id": signal.id}, event_id=signal.id)
+    return True
@@ -0,0 +1,244 @@
+"""Scheduled menu items: availability windows applied at their boundaries.
+
+An item may carry an availability window (a date range, weekdays and
+hours, in the restaurant's ``timezone``), e.g. a lunch special on weekdays
+from 11:30 to 14:30. Public pages never evaluate windows: they read
+``available`` like for any other item, and this module flips that flag
+when a window opens or closes.
+
+Each restaurant stores ``next_transition``, the next UTC instant one of
+its windows changes. A job queued for that instant (``menuvi/jobs.py``)
+applies it, bumping ``menu_version`` so caches and ETags move on, and
+re-bakes the affected pages. ``load_restaurant`` also applies a passed
+transition on the first request after it, so a busy or stopped worker
+never leaves a special showing. Only items whose own window changed are
+flipped: a special switched off by hand stays off until its next boundary.
+"""
+
+from contextlib import nullcontext
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from flask import current_app, has_request_context
+from sqlalchemy import or_, select
+
+from .jobs import enqueue, task
+from .menu_cache import bump_menu_version
+from .models import db, utcnow, Category, MenuItem, Restaurant
+from .static_pages import refresh_menu
+from .tenants import mark_changed
+
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+ALL_DAYS = 0b1111111
+# Days ahead scanned for the next change of a repeating window
+_HORIZON_DAYS = 8
+_DAY_VALUES = {str(i) for i in range(len(WEEKDAYS))}
+
+
+class ScheduleError(ValueError):
+    pass
+
+
+def zone(name) -> ZoneInfo:
+    try:
+        return ZoneInfo(name or "UTC")
+    except (ZoneInfoNotFoundError, ValueError):
+        return ZoneInfo("UTC")
+
+
+def valid_timezone(name) -> bool:
+    try:
+        ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return False
+    return True
+
+
+def _local(utc, tz):
+    return utc.replace(tzinfo=timezone.utc).astimezone(tz).replace(tzinfo=None)
+
+
+def _utc(local, tz):
+    return local.replace(tzinfo=tz).astimezone(timezone.utc).replace(tzinfo=None)
+
+
+@dataclass(frozen=True, slots=True)
+class Window:
+    from_date: date | None = None
+    until_date: date | None = None
+    days: int | None = None
+    start: time | None = None
+    end: time | None = None
+
+    @classmethod
+    def of(cls, item):
+        return cls(
+            item.available_from, item.available_until, item.available_days,
+            item.available_start, item.available_end,
+        )
+
+    def _day_open(self, day):
+        if self.from_date and day < self.from_date:
+            return False
+        if self.until_date and day > self.until_date:
+            return False
+        return self.days is None or bool(self.days >> day.weekday() & 1)
+
+    def open_at(self, local) -> bool:
+        """Whether the window is open at the naive local datetime *local*."""
+        day, now = local.date(), local.time()
+        start = self.start or time(0)
+        if self.end is None or start < self.end:
+            return self._day_open(day) and start <= now and (self.end is None or now < self.end)
+        # Runs past midnight: the early hours belong to the previous day's window
+        return (
+            (self._day_open(day) and now >= start)
+            or (self._day_open(day - timedelta(days=1)) and now < self.end)
+        )
+
+    def _boundaries(self, today):
+        times = {time(0)} | {t for t in (self.start, self.end) if t is not None}
+        for offset in range(_HORIZON_DAYS):
+            for t in times:
+                yield datetime.combine(today + timedelta(days=offset), t)
+        if self.from_date:
+            yield datetime.combine(self.from_date, time(0))
+        if self.until_date:
+            yield datetime.combine(self.until_date + timedelta(days=1), time(0))
+
+    def summary(self):
+        """Short description for the admin, e.g. "Mon Tue Wed, 11:30–14:30"."""
+        parts = []
+        if self.days is not None:
+            parts.append(" ".join(d for i, d in enumerate(WEEKDAYS) if self.days >> i & 1) or "Never")
+        if self.start or self.end:
+            start, end = self.start or time(0), self.end or time(0)
+            parts.append(f"{start:%H:%M}–{end:%H:%M}")
+        if self.from_date or self.until_date:
+            first = f"{self.from_date:%d %b %Y}" if self.from_date else ""
+            last = f"{self.until_date:%d %b %Y}" if self.until_date else ""
+            parts.append(f"{first} – {last}".strip())
+        return ", ".join(parts)
+
+    def next_change(self, local):
+        """First local datetime after *local* at which open_at() changes.
+
+        Beyond the scanned days only date bounds are candidates; one of those
+        is returned as the time to look again. None if the state is final.
+        """
+        current = self.open_at(local)
+        horizon = datetime.combine(local.date() + timedelta(days=_HORIZON_DAYS), time(0))
+        for candidate in sorted(c for c in self._boundaries(local.date()) if c > local):
+            if candidate > horizon or self.open_at(candidate) != current:
+                return candidate
+        return None
+
+
+# ── admin form ──────────────────────────────────────────────────────────────
+def _parse(value, kind):
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value) if kind is date else time.fromisoformat(value)
+    except ValueError:
+        raise ScheduleError(f"'{value}' is not a valid {'date' if kind is date else 'time'}.")
+
+
+def apply_form(item, form):
+    """Set *item*'s availability window from the item form."""
+    from_date = _parse(form.get("available_from"), date)
+    until_date = _parse(form.get("available_until"), date)
+    if from_date and until_date and until_date < from_date:
+        raise ScheduleError("The last day is before the first day.")
+    days = sum(1 << int(d) for d in set(form.getlist("available_days")) if d in _DAY_VALUES)
+    item.available_from, item.available_until = from_date, until_date
+    item.available_days = days if days and days != ALL_DAYS else None
+    item.available_start = _parse(form.get("available_start"), time)
+    item.available_end = _parse(form.get("available_end"), time)
+
+
+def open_now(item, timezone_name) -> bool:
+    return Window.of(item).open_at(_local(utcnow(), zone(timezone_name)))
+
+
+def schedule_summary(item):
+    return Window.of(item).summary()
+
+
+def init_app(app):
+    app.jinja_env.globals.update(weekdays=WEEKDAYS, schedule_summary=schedule_summary)
+
+
+# ── applying ────────────────────────────────────────────────────────────────
+def _scheduled_items(restaurant_id):
+    return db.session.execute(
+        select(MenuItem).join(Category).where(
+            Category.restaurant_id == restaurant_id,
+            or_(
+                MenuItem.available_from.is_not(None), MenuItem.available_until.is_not(None),
+                MenuItem.available_days.is_not(None), MenuItem.available_start.is_not(None),
+                MenuItem.available_end.is_not(None),
+            ),
+        )
+    ).scalars().all()
+
+
+@task("schedule.apply")
+def _apply_task(restaurant_id):
+    restaurant = db.session.get(Restaurant, restaurant_id)
+    # Not due: the schedule changed since this job was queued
+    if restaurant and restaurant.next_transition and restaurant.next_transition <= utcnow():
+        apply_schedule(restaurant_id)
+
+
+def apply_schedule(restaurant_id, now=None) -> list[MenuItem]:
+    """Bring scheduled items up to date and plan the next transition.
+
+    Commits. Returns the items whose ``available`` flag was flipped.
+    """
+    restaurant = db.session.get(Restaurant, restaurant_id)
+    if restaurant is None:
+        return []
+    now = now or utcnow()
+    tz = zone(restaurant.timezone)
+    local_now = _local(now, tz)
+    since = restaurant.schedule_checked_at and _local(restaurant.schedule_checked_at, tz)
+    changed = []
+    next_at = None
+    for item in _scheduled_items(restaurant_id):
+        window = Window.of(item)
+        is_open = window.open_at(local_now)
+        if (since is None or window.open_at(since) != is_open) and item.available != is_open:
+            item.available = is_open
+            changed.append(item)
+        upcoming = window.next_change(local_now)
+        if upcoming is not None:
+            upcoming = _utc(upcoming, tz)
+            next_at = upcoming if next_at is None else min(next_at, upcoming)
+    restaurant.schedule_checked_at = now
+    restaurant.next_transition = next_at
+    if changed:
+        bump_menu_version(restaurant_id)
+    # next_transition is part of the cached Tenant
+    mark_changed()
+    db.session.commit()
+
+    if next_at is not None:
+        enqueue(
+            _apply_task, key=f"schedule:{restaurant_id}:{next_at:%Y%m%d%H%M%S}",
+            delay=(next_at - now).total_seconds(), restaurant_id=restaurant_id,
+        )
+    if changed:
+        config = current_app.config
+        context = (
+            nullcontext() if has_request_context()
+            else current_app.test_request_context(base_url=config["SITE_URL"])
+        )
+        with context:
+            refresh_menu(
+                restaurant.slug, category_ids={i.category_id for i in changed},
+                item_ids=[i.id for i in changed],
+            )
+    return changed
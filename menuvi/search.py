@@ -0,0 +1,235 @@
+"""Full-text menu search backed by an SQLite FTS5 index.
+
+``menu_items_fts`` mirrors the name and description of every menu item,
+tagged with a ``tenant`` token (``r<restaurant_id>``) so a single index can
+be scoped to one restaurant inside the MATCH expression. The index is kept
+in sync by ORM events on ``MenuItem`` and can be rebuilt from scratch with
+``flask reindex-search``. On databases without FTS5 (anything other than
+SQLite) search falls back to a LIKE scan over name and description.
+
+The index holds the default language only. In a restaurant's other
+languages the translated menu snapshot is scanned instead, so results and
+snippets match the text on the page (and the suggestions, which come from
+the same snapshot).
+"""
+
+import re
+from dataclasses import dataclass
+
+from markupsafe import Markup, escape
+from sqlalchemy import event, or_, text
+
+from .models import db, Category, MenuItem
+from .suggest import normalise
+
+FTS_TABLE = "menu_items_fts"
+RESULT_LIMIT = 50
+
+# Highlight markers; control characters never appear in admin-entered text
+_HL_START, _HL_END = "\x02", "\x03"
+_TOKEN_RE = re.compile(r"\w+")
+
+
+@dataclass(slots=True)
+class SearchResult:
+    item: object
+    snippet_html: Markup
+
+
+def _is_sqlite(connection):
+    return connection.dialect.name == "sqlite"
+
+
+def _highlight(raw):
+    html = str(escape(raw))
+    return Markup(html.replace(_HL_START, "<mark>").replace(_HL_END, "</mark>"))
+
+
+def _match_expression(restaurant_id, query):
+    tokens = _TOKEN_RE.findall(query.lower())
+    if not tokens:
+        return None
+    terms = " AND ".join(f'"{t}"*' for t in tokens)
+    return f"tenant:r{restaurant_id} AND {{name description}}: ({terms})"
+
+
+# ── index maintenance ───────────────────────────────────────────────────────
+def create_index(connection):
+    connection.execute(text(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        "name, description, tenant, "
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    ))
+
+
+def rebuild_index(connection, restaurant_id=None):
+    """Repopulate the index (for one restaurant, or all). Returns row count."""
+    if restaurant_id is None:
+        connection.execute(text(f"DELETE FROM {FTS_TABLE}"))
+        where = ""
+    else:
+        connection.execute(
+            text(f"DELETE FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :tenant"),
+            {"tenant": f"tenant:r{restaurant_id}"},
+        )
+        where = "WHERE c.restaurant_id = :rid"
+    result = connection.execute(
+        text(
+            f"INSERT INTO {FTS_TABLE} (rowid, name, description, tenant) "
+            "SELECT m.id, m.name, coalesce(m.description, ''), 'r' || c.restaurant_id "
+            "FROM menu_items m JOIN categories c ON c.id = m.category_id " + where
+        ),
+        {"rid": restaurant_id},
+    )
+    return result.rowcount
+
+
+def _index_item(connection, item):
+    connection.execute(
+        text(
+            f"INSERT OR REPLACE INTO {FTS_TABLE} (rowid, name, description, tenant) "
+            "SELECT :id, :name, :description, 'r' || restaurant_id "
+            "FROM categories WHERE id = :category_id"
+        ),
+        {
+            "id": item.id,
+            "name": item.name,
+            "description": item.description or "",
+            "category_id": item.category_id,
+        },
+    )
+
+
+@event.listens_for(MenuItem, "after_insert")
+@event.listens_for(MenuItem, "after_update")
+def _sync_item(mapper, connection, item):
+    if _is_sqlite(connection):
+        _index_item(connection, item)
+
+
+@event.listens_for(MenuItem, "after_delete")
+def _remove_item(mapper, connection, item):
+    if _is_sqlite(connection):
+        connection.execute(
+            text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {"id": item.id},
+        )
+
+
+@event.listens_for(db.metadata, "after_create")
+def _create_index(metadata, connection, **kw):
+    if not _is_sqlite(connection):
+        return
+    existed = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE name = :name"), {"name": FTS_TABLE},
+    ).first()
+    create_index(connection)
+    if not existed:
+        rebuild_index(connection)
+
+
+@event.listens_for(db.metadata, "after_drop")
+def _drop_index(metadata, connection, **kw):
+    if _is_sqlite(connection):
+        connection.execute(text(f"DROP TABLE IF EXISTS {FTS_TABLE}"))
+
+
+# ── querying ────────────────────────────────────────────────────────────────
+def search_items(restaurant, menu, query, tags=0, limit=RESULT_LIMIT) -> list[SearchResult]:
+    """BM25-ranked available items of *restaurant* matching *query*.
+
+    *tags* is a tag bitmask (``menuvi/tags.py``) every result must carry.
+    Items are resolved through the restaurant's menu snapshot, so the only
+    SQL issued is the index lookup itself; a translated snapshot is
+    searched without any.
+    """
+    if menu.locale:
+        return _search_snapshot(menu, query, tags, limit)
+    if not _is_sqlite(db.session.connection()):
+        return _search_like(restaurant, menu, query, tags, limit)
+    match = _match_expression(restaurant.id, query)
+    if match is None:
+        return []
+    rows = db.session.execute(
+        text(
+            f"SELECT f.rowid AS id, "
+            f"snippet({FTS_TABLE}, 1, :hs, :he, '…', 16) AS snippet "
+            f"FROM {FTS_TABLE} f JOIN menu_items m ON m.id = f.rowid "
+            f"WHERE {FTS_TABLE} MATCH :match AND m.available = 1 "
+            f"AND (m.tags & :tags) = :tags "
+            f"ORDER BY bm25({FTS_TABLE}, 10.0, 1.0, 0.0) LIMIT :limit"
+        ),
+        {"hs": _HL_START, "he": _HL_END, "match": match, "tags": tags, "limit": limit},
+    ).all()
+    results = []
+    for row in rows:
+        item = menu.items_by_id.get(row.id)
+        if item is None:
+            continue
+        # Only show a description snippet when the description itself matched
+        snippet = _highlight(row.snippet) if _HL_START in row.snippet else Markup("")
+        results.append(SearchResult(item=item, snippet_html=snippet))
+    return results
+
+
+def _search_like(restaurant, menu, query, tags, limit):
+    pattern = f"%{query}%"
+    ids = (
+        db.session.query(MenuItem.id)
+        .join(Category)
+        .filter(Category.restaurant_id == restaurant.id)
+        .filter(MenuItem.available.is_(True))
+        .filter(MenuItem.tags.op("&")(tags) == tags)
+        .filter(or_(MenuItem.name.ilike(pattern), MenuItem.description.ilike(pattern)))
+        .order_by(MenuItem.name)
+        .limit(limit)
+        .all()
+    )
+    return [
+        SearchResult(item=menu.items_by_id[i], snippet_html=Markup(""))
+        for (i,) in ids if i in menu.items_by_id
+    ]
+
+
+def _words(s):
+    return {normalise(w) for w in _TOKEN_RE.findall(s)}
+
+
+def _hits(tokens, words):
+    return [t for t in tokens if any(w.startswith(t) for w in words)]
+
+
+def _mark(word, tokens):
+    return f"{_HL_START}{word}{_HL_END}" if _hits(tokens, _words(word)) else word
+
+
+def _search_snapshot(menu, query, tags, limit):
+    """Prefix-match every token of *query* against the snapshot's own text."""
+    tokens = _TOKEN_RE.findall(normalise(query))
+    if not tokens:
+        return []
+    ranked = []
+    for category in menu.categories:
+        for item in category.matching_items(tags):
+            name, description = _words(item.name), _words(item.description)
+            if len(_hits(tokens, name | description)) < len(tokens):
+                continue
+            snippet = Markup("")
+            if _hits(tokens, description):
+                snippet = _highlight(_TOKEN_RE.sub(lambda m: _mark(m[0], tokens), item.description))
+            # Name matches rank first, like the index's column weights
+            in_name = len(_hits(tokens, name))
+            ranked.append((-in_name, len(ranked), SearchResult(item=item, snippet_html=snippet)))
+    ranked.sort(key=lambda r: r[:2])
+    return [result for *_, result in ranked[:limit]]
+
+
+def tagged_items(menu, tags) -> list[SearchResult]:
+    """Every available item carrying the tag bitmask *tags*, in menu order.
+
+    Answers a tag filter without a search query from the cached snapshot;
+    categories whose tag mask lacks a wanted bit are skipped whole.
+    """
+    return [
+        SearchResult(item=item, snippet_html=Markup(""))
+        for category in menu.categories for item in category.matching_items(tags)
+    ]
@@ -0,0 +1,159 @@
+"""sitemap.xml generation.
+
+URLs come from a single restaurants LEFT JOIN categories query, streamed in
+batches and written out as chunks of XML; a cheap aggregate over the same
+join decides whether the sitemap needs splitting. Past ``SITEMAP_MAX_URLS``
+(50,000 per the sitemaps.org protocol) ``/sitemap.xml`` becomes a sitemap
+index pointing at numbered ``/sitemap-<n>.xml`` children. Every document also
+has a ``.xml.gz`` variant.
+
+Finished documents are cached per worker, keyed on the global content
+generation (see ``tenants.content_generation``) and the request origin, so
+the query only reruns after a restaurant or its categories change.
+"""
+
+import gzip
+import threading
+from itertools import islice
+from xml.sax.saxutils import escape
+
+from flask import Response, current_app, stream_with_context, url_for
+from sqlalchemy import distinct, func, select
+
+from .models import db, Category, Restaurant
+from .tenants import content_generation
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+URLSET_OPEN = '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+INDEX_OPEN = '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+# URLs per yielded chunk of the streamed response
+_CHUNK = 500
+_PAGES_PER_RESTAURANT = 3  # landing + dining + beverages
+
+
+class SitemapCache:
+    def __init__(self):
+        self._key = None
+        self._documents: dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, name):
+        with self._lock:
+            if key != self._key:
+                return None
+            return self._documents.get(name)
+
+    def put(self, key, name, body):
+        with self._lock:
+            if key != self._key:
+                self._key = key
+                self._documents = {}
+            self._documents[name] = body
+
+
+def init_app(app):
+    app.extensions["sitemap_cache"] = SitemapCache()
+
+
+def url_count():
+    restaurants, categories = db.session.execute(
+        select(func.count(distinct(Restaurant.id)), func.count(Category.id))
+        .select_from(Restaurant)
+        .outerjoin(Category, Category.restaurant_id == Restaurant.id)
+    ).one()
+    return 1 + restaurants * _PAGES_PER_RESTAURANT + categories
+
+
+def iter_urls(base):
+    """Yield every public URL, reading restaurants and categories in one query."""
+    yield base + url_for("public.directory")
+    rows = db.session.execute(
+        select(Restaurant.id, Restaurant.slug, Category.id.label("category_id"))
+        .outerjoin(Category, Category.restaurant_id == Restaurant.id)
+        .order_by(Restaurant.slug, Category.sort_order, Category.id)
+        .execution_options(yield_per=1000)
+    )
+    current = None
+    for row in rows:
+        if row.id != current:
+            current = row.id
+            yield base + url_for("public.landing", slug=row.slug)
+            for menu_type in ("dining", "beverages"):
+                yield base + url_for("public.menu", slug=row.slug, menu_type=menu_type)
+        if row.category_id is not None:
+            yield base + url_for(
+                "public.category", slug=row.slug, category_id=row.category_id,
+            )
+
+
+def _urlset(urls):
+    yield XML_HEADER + URLSET_OPEN
+    while True:
+        batch = list(islice(urls, _CHUNK))
+        if not batch:
+            break
+        yield "".join(f"  <url><loc>{escape(u)}</loc></url>\n" for u in batch)
+    yield "</urlset>\n"
+
+
+def _index(base, children):
+    yield XML_HEADER + INDEX_OPEN
+    for n in range(1, children + 1):
+        loc = base + url_for("public.sitemap_child", n=n)
+        yield f"  <sitemap><loc>{escape(loc)}</loc></sitemap>\n"
+    yield "</sitemapindex>\n"
+
+
+def _document(base, n):
+    """Chunks of sitemap document *n* (0 = /sitemap.xml), or None if absent."""
+    limit = current_app.config["SITEMAP_MAX_URLS"]
+    children = -(-url_count() // limit)
+    if n == 0:
+        if children <= 1:
+            return _urlset(iter_urls(base))
+        return _index(base, children)
+    if children <= 1 or n > children:
+        return None
+    start = (n - 1) * limit
+    return _urlset(islice(iter_urls(base), start, start + limit))
+
+
+def sitemap_response(base, n=0, gz=False):
+    cache = current_app.extensions["sitemap_cache"]
+    key = (content_generation(), base)
+    name = f"{n}.gz" if gz else str(n)
+    body = cache.get(key, name)
+    if body is not None:
+        return _response(body, gz)
+
+    if gz:
+        plain = cache.get(key, str(n))
+        if plain is None:
+            chunks = _document(base, n)
+            if chunks is None:
+                return None
+            plain = "".join(chunks).encode()
+            cache.put(key, str(n), plain)
+        body = gzip.compress(plain)
+        cache.put(key, name, body)
+        return _response(body, gz)
+
+    chunks = _document(base, n)
+    if chunks is None:
+        return None
+
+    def generate():
+        parts = []
+        for chunk in chunks:
+            data = chunk.encode()
+            parts.append(data)
+            yield data
+        cache.put(key, name, b"".join(parts))
+
+    return Response(stream_with_context(generate()), mimetype="application/xml")
+
+
+def _response(body, gz):
+    if gz:
+        return Response(body, mimetype="application/gzip")
+    return Response(body, mimetype="application/xml")
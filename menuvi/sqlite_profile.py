@@ -0,0 +1,99 @@
+"""Production tuning for SQLite connections.
+
+Every new DBAPI connection gets the configured pragmas: WAL journaling (so
+readers never block on a writer), ``synchronous=NORMAL`` (safe with WAL),
+a busy timeout (so concurrent writers wait instead of failing with
+"database is locked"), a memory-mapped I/O window, a larger page cache and
+in-memory temp storage.
+
+Each worker also runs ``wal_checkpoint(PASSIVE)`` and ``optimize`` at most
+once per ``SQLITE_MAINTENANCE_INTERVAL`` seconds, when a connection is
+checked out, so the WAL file stays small and planner statistics fresh.
+Non-SQLite engines are left untouched.
+"""
+
+import threading
+import time
+
+from sqlalchemy import event
+
+JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+SYNCHRONOUS = {"OFF", "NORMAL", "FULL", "EXTRA"}
+TEMP_STORES = {"DEFAULT", "FILE", "MEMORY"}
+
+
+def pragmas(config):
+    """The ``PRAGMA`` statements for *config*, in the order they are applied."""
+    journal_mode = config["SQLITE_JOURNAL_MODE"].upper()
+    synchronous = config["SQLITE_SYNCHRONOUS"].upper()
+    temp_store = config["SQLITE_TEMP_STORE"].upper()
+    for name, value, allowed in (
+        ("SQLITE_JOURNAL_MODE", journal_mode, JOURNAL_MODES),
+        ("SQLITE_SYNCHRONOUS", synchronous, SYNCHRONOUS),
+        ("SQLITE_TEMP_STORE", temp_store, TEMP_STORES),
+    ):
+        if value not in allowed:
+            raise ValueError(f"{name} must be one of {', '.join(sorted(allowed))}")
+    return [
+        # busy_timeout first: switching to WAL needs a brief exclusive lock
+        f"PRAGMA busy_timeout = {int(config['SQLITE_BUSY_TIMEOUT_MS'])}",
+        f"PRAGMA journal_mode = {journal_mode}",
+        f"PRAGMA synchronous = {synchronous}",
+        f"PRAGMA mmap_size = {int(config['SQLITE_MMAP_SIZE_MB']) * 1024 * 1024}",
+        # Negative cache_size is in KiB rather than pages
+        f"PRAGMA cache_size = -{int(config['SQLITE_CACHE_SIZE_KB'])}",
+        f"PRAGMA temp_store = {temp_store}",
+    ]
+
+
+class Maintenance:
+    """Rate-limits checkpoint/optimize to once per interval per process."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._due = time.monotonic() + interval
+        self._lock = threading.Lock()
+
+    def run_if_due(self, dbapi_connection):
+        if self.interval <= 0 or time.monotonic() < self._due:
+            return False
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            self._due = time.monotonic() + self.interval
+            run_maintenance(dbapi_connection)
+        finally:
+            self._lock.release()
+        return True
+
+
+def run_maintenance(dbapi_connection):
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA wal_checkpoint(PASSIVE)")
+        cursor.execute("PRAGMA optimize")
+    finally:
+        cursor.close()
+
+
+def init_app(app, db):
+    if app.config["SQLALCHEMY_DATABASE_URI"].split(":", 1)[0].split("+")[0] != "sqlite":
+        return
+    statements = pragmas(app.config)
+    maintenance = Maintenance(app.config["SQLITE_MAINTENANCE_INTERVAL"])
+    app.extensions["sqlite_maintenance"] = maintenance
+
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+    def checkout(dbapi_connection, connection_record, connection_proxy):
+        maintenance.run_if_due(dbapi_connection)
+
+    with app.app_context():
+        event.listen(db.engine, "connect", apply_pragmas)
+        event.listen(db.engine, "checkout", checkout)
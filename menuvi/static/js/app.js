@@ -1,36 +1,390 @@
-// Progressive enhancement: make "Pick" buttons work via fetch for snappier UX
-document.addEventListener('DOMContentLoaded', () => {
-  document.querySelectorAll('.pick-form').forEach(form => {
-    form.addEventListener('submit', async (e) => {
-      e.preventDefault();
+// My Picks live in the browser and reach the server in batches
+// (POST <slug>/api/picks, see menuvi/menu_api.py). State per restaurant:
+// the last server-confirmed set and when it was taken, plus changes not
+// yet sent. Server-rendered pages carry their picks and a timestamp; a
+// page newer than our last sync replaces the confirmed set.
+const Picks = (() => {
+  const body = document.body;
+  const api = body.dataset.picksApi;
+  if (!api) return null;
+  const key = `menuvi-picks:${api}`;
+  const SYNC_DELAY = 2000;
+  let timer = null;
+
+  let state;
+  try {
+    state = JSON.parse(localStorage.getItem(key));
+  } catch {
+    state = null;
+  }
+  state = state || { items: [], at: 0, add: [], remove: [] };
+  if (body.dataset.picks && Number(body.dataset.picksAt) > state.at) {
+    state.items = JSON.parse(body.dataset.picks);
+    state.at = Number(body.dataset.picksAt);
+  }
+
+  const save = () => {
+    try {
+      localStorage.setItem(key, JSON.stringify(state));
+    } catch {
+      // private mode or full: picks still sync, just not across pages
+    }
+  };
+
+  const current = () => {
+    const ids = new Set(state.items);
+    state.add.forEach(id => ids.add(id));
+    state.remove.forEach(id => ids.delete(id));
+    return ids;
+  };
+
+  const pending = () => state.add.length + state.remove.length > 0;
+
+  const sync = async (keepalive = false) => {
+    clearTimeout(timer);
+    if (!pending()) return true;
+    const batch = { add: state.add, remove: state.remove };
+    state.add = [];
+    state.remove = [];
+    save();
+    try {
+      const resp = await fetch(api, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(batch),
+        keepalive,
+      });
+      if (!resp.ok) throw new Error(resp.status);
+      const data = await resp.json();
+      state.items = data.items;
+      state.at = data.at;
+      save();
+      return true;
+    } catch {
+      // Offline: put the batch back in front of anything queued since
+      const add = new Set(batch.add.concat(state.add));
+      const remove = new Set(batch.remove.concat(state.remove));
+      state.add.forEach(id => remove.delete(id));
+      state.remove.forEach(id => add.delete(id));
+      state.add = [...add];
+      state.remove = [...remove];
+      save();
+      return false;
+    }
+  };
+
+  const set = (id, picked) => {
+    const [into, from] = picked ? ['add', 'remove'] : ['remove', 'add'];
+    state[from] = state[from].filter(x => x !== id);
+    if (!state[into].includes(id)) state[into].push(id);
+    save();
+    render();
+    clearTimeout(timer);
+    timer = setTimeout(sync, SYNC_DELAY);
+  };
+
+  const render = (root = document) => {
+    const ids = current();
+    document.querySelectorAll('.topbar-picks').forEach(el => {
+      let badge = el.querySelector('.badge');
+      if (!badge && ids.size) {
+        badge = document.createElement('span');
+        badge.className = 'badge';
+        el.appendChild(badge);
+      }
+      if (badge) {
+        badge.textContent = ids.size;
+        badge.hidden = ids.size === 0;
+      }
+    });
+    root.querySelectorAll('.pick-form[data-item-id]').forEach(form => {
+      const picked = ids.has(Number(form.dataset.itemId));
+      if (form.classList.contains('pick-toggle')) {
+        form.hidden = picked;
+        return;
+      }
       const btn = form.querySelector('button');
+      btn.textContent = picked ? 'Picked' : '+ Pick';
+      btn.classList.toggle('btn-picked', picked);
+      btn.disabled = picked;
+    });
+    root.querySelectorAll('.unpick-form[data-item-id]').forEach(form => {
+      const picked = ids.has(Number(form.dataset.itemId));
+      const row = form.closest('.pick-item');
+      if (row) row.hidden = !picked;
+      else form.hidden = !picked;
+    });
+  };
+
+  document.addEventListener('submit', (e) => {
+    const form = e.target;
+    if (!form.dataset.itemId && !form.classList.contains('clear-picks-form')) return;
+    e.preventDefault();
+    if (form.classList.contains('clear-picks-form')) {
+      current().forEach(id => set(id, false));
+    } else {
+      set(Number(form.dataset.itemId), form.classList.contains('pick-form'));
+    }
+  });
+
+  // Send whatever is queued before the page goes away
+  document.addEventListener('visibilitychange', () => {
+    if (document.visibilityState === 'hidden') sync(true);
+  });
+  window.addEventListener('pagehide', () => sync(true));
+
+  document.addEventListener('DOMContentLoaded', async () => {
+    save();
+    render();
+    // The picks page lists what the server has: bring it up to date first
+    if (document.getElementById('picks-container') && pending() && await sync()) {
+      location.reload();
+    }
+  });
+
+  return { current, render, sync };
+})();
+
+
+// "Ready to order": table QR codes carry ?table=<label>, remembered per
+// restaurant so the picks page can prefill it. Queued picks are sent first
+// so staff see the full list.
+document.addEventListener('DOMContentLoaded', () => {
+  const api = document.body.dataset.picksApi;
+  if (!api) return;
+  const key = `menuvi-table:${api}`;
+  const table = new URLSearchParams(location.search).get('table');
+  try {
+    if (table) localStorage.setItem(key, table.slice(0, 20));
+  } catch {
+    // not remembered; the field can still be filled in by hand
+  }
+
+  document.querySelectorAll('.ready-form').forEach(form => {
+    const input = form.querySelector('.ready-table');
+    if (input && !input.value) {
       try {
-        const resp = await fetch(form.action, {
-          method: 'POST',
-          headers: { 'X-Requested-With': 'XMLHttpRequest' },
-        });
-        const data = await resp.json();
-        if (data.ok) {
-          btn.textContent = 'Picked';
-          btn.classList.add('btn-picked');
-          btn.disabled = true;
-          // Update badge
-          document.querySelectorAll('.badge').forEach(b => {
-            b.textContent = data.count;
-          });
-          // If no badge yet, add one
-          if (!document.querySelector('.badge') && data.count > 0) {
-            document.querySelectorAll('.topbar-picks').forEach(el => {
-              const badge = document.createElement('span');
-              badge.className = 'badge';
-              badge.textContent = data.count;
-              el.appendChild(badge);
-            });
-          }
-        }
+        input.value = localStorage.getItem(key) || '';
       } catch {
-        form.submit(); // fallback to normal form submission
+        // ignore
       }
+    }
+    form.addEventListener('submit', async (e) => {
+      e.preventDefault();
+      if (Picks) await Picks.sync();
+      form.submit();
+    });
+  });
+});
+
+
+// Category pages rendered from the cached menu payload (api/menu.json),
+// so browsing a menu costs one request however many categories are opened
+document.addEventListener('DOMContentLoaded', () => {
+  const cards = document.querySelectorAll('.cat-card[data-category-id]');
+  const api = document.body.dataset.menuApi;
+  if (!cards.length || !api || !Picks) return;
+
+  const main = document.querySelector('main');
+  const title = document.querySelector('.topbar-title');
+  const back = document.querySelector('.topbar-back');
+  const menuView = {
+    html: main.innerHTML, title: title.textContent,
+    back: back.getAttribute('href'), backText: back.innerHTML, doc: document.title,
+  };
+  const menuUrl = location.href;
+  // Restaurant root ("/<slug>/"), for item and pick URLs
+  const base = new URL('../', new URL(document.body.dataset.picksApi, location.href)).pathname;
+  const menu = fetch(api).then(resp => resp.json()).catch(() => null);
+
+  const el = (tag, className, text) => {
+    const node = document.createElement(tag);
+    if (className) node.className = className;
+    if (text) node.textContent = text;
+    return node;
+  };
+
+  // Same markup as templates/public/_photo.html
+  const picture = (photos, [digest, width, height, placeholder]) => {
+    const widths = photos.widths.filter(w => w <= width);
+    if (!widths.length) widths.push(photos.widths[0]);
+    const srcset = ext => widths
+      .map(w => `${photos.url}${digest}-${w}.${ext} ${Math.min(w, width)}w`).join(', ');
+    const pic = el('picture', 'item-thumb');
+    const source = el('source');
+    source.type = 'image/webp';
+    source.srcset = srcset('webp');
+    source.sizes = '4.5rem';
+    const img = el('img');
+    img.src = `${photos.url}${digest}-${Math.max(...widths.filter(w => w <= 320))}.jpg`;
+    img.srcset = srcset('jpg');
+    img.sizes = '4.5rem';
+    img.width = width;
+    img.height = height;
+    img.alt = '';
+    img.loading = 'lazy';
+    img.decoding = 'async';
+    img.style.backgroundImage = `url(${placeholder})`;
+    pic.append(source, img);
+    return pic;
+  };
+
+  const itemRow = (data, row) => {
+    const item = Object.fromEntries(data.item_fields.map((f, i) => [f, row[i]]));
+    const wrap = el('div', 'item-row');
+    if (item.photo) {
+      const thumb = el('a');
+      thumb.href = `${base}item/${item.id}`;
+      thumb.tabIndex = -1;
+      thumb.appendChild(picture(data.photos, item.photo));
+      wrap.appendChild(thumb);
+    }
+    const info = el('div', 'item-info');
+    const name = el('div', 'item-name');
+    const link = el('a', '', item.name);
+    link.href = `${base}item/${item.id}`;
+    name.appendChild(link);
+    info.appendChild(name);
+    if (item.description) info.appendChild(el('div', 'item-desc', item.description));
+    if (item.tags) {
+      const labels = el('div', 'item-tags');
+      data.tags.filter(t => item.tags & (1 << t.bit))
+        .forEach(t => labels.appendChild(el('span', '', t.name)));
+      info.appendChild(labels);
+    }
+    const actions = el('div', 'item-actions');
+    if (item.price) actions.appendChild(el('span', 'item-price', item.price));
+    const form = el('form', 'pick-form');
+    form.method = 'post';
+    form.action = `${base}picks/add/${item.id}`;
+    form.dataset.itemId = item.id;
+    const btn = el('button', 'btn btn-sm', '+ Pick');
+    btn.type = 'submit';
+    form.appendChild(btn);
+    actions.appendChild(form);
+    wrap.append(info, actions);
+    return wrap;
+  };
+
+  // The ?tag= filter of *url* as a bitmask of data.tags (menuvi/tags.py)
+  const tagMask = (data, url) => {
+    const wanted = new URL(url, location.href).searchParams.getAll('tag');
+    return data.tags.filter(t => wanted.includes(t.slug)).reduce((mask, t) => mask | (1 << t.bit), 0);
+  };
+
+  const showCategory = (data, id, url) => {
+    const category = data.categories.find(c => c.id === id);
+    if (!category) return false;
+    const want = tagMask(data, url);
+    const tags = data.item_fields.indexOf('tags');
+    const list = el('div', 'items-list');
+    category.items.filter(row => (row[tags] & want) === want)
+      .forEach(row => list.appendChild(itemRow(data, row)));
+    main.replaceChildren(list);
+    title.textContent = category.name;
+    back.innerHTML = '&#8592; Back';
+    back.setAttribute('href', menuUrl);
+    document.title = `${category.name} — ${data.restaurant.name}`;
+    Picks.render(main);
+    window.scrollTo(0, 0);
+    return true;
+  };
+
+  const showMenu = () => {
+    main.innerHTML = menuView.html;
+    title.textContent = menuView.title;
+    back.setAttribute('href', menuView.back);
+    back.innerHTML = menuView.backText;
+    document.title = menuView.doc;
+    Picks.render(main);
+  };
+
+  main.addEventListener('click', async (e) => {
+    const card = e.target.closest('.cat-card[data-category-id]');
+    if (!card || e.metaKey || e.ctrlKey || e.shiftKey) return;
+    e.preventDefault();
+    const data = await menu;
+    const id = Number(card.dataset.categoryId);
+    if (data && showCategory(data, id, card.href)) {
+      history.pushState({ category: id }, '', card.href);
+    } else {
+      location.href = card.href;
+    }
+  });
+
+  window.addEventListener('popstate', async (e) => {
+    const data = await menu;
+    if (e.state && e.state.category && data) showCategory(data, e.state.category, location.href);
+    else showMenu();
+  });
+});
+
+
+// Search-as-you-type: debounce keystrokes against the suggest endpoint
+document.addEventListener('DOMContentLoaded', () => {
+  document.querySelectorAll('.search-input[data-suggest-url]').forEach(input => {
+    const list = document.createElement('ul');
+    list.className = 'suggest-list';
+    list.hidden = true;
+    input.insertAdjacentElement('afterend', list);
+
+    let timer = null;
+    let controller = null;
+
+    const render = (results) => {
+      list.replaceChildren(...results.map(r => {
+        const li = document.createElement('li');
+        const a = document.createElement('a');
+        a.href = r.url;
+        const name = document.createElement('span');
+        name.textContent = r.name;
+        const detail = document.createElement('span');
+        detail.className = 'suggest-detail';
+        detail.textContent = r.detail;
+        a.append(name, detail);
+        li.appendChild(a);
+        return li;
+      }));
+      list.hidden = results.length === 0;
+    };
+
+    input.addEventListener('input', () => {
+      clearTimeout(timer);
+      const q = input.value.trim();
+      if (!q) {
+        render([]);
+        return;
+      }
+      timer = setTimeout(async () => {
+        if (controller) controller.abort();
+        controller = new AbortController();
+        try {
+          const resp = await fetch(
+            `${input.dataset.suggestUrl}?q=${encodeURIComponent(q)}`,
+            { signal: controller.signal },
+          );
+          const data = await resp.json();
+          if (data.query === input.value.trim()) render(data.results);
+        } catch {
+          // aborted or offline: leave the plain search form to do its job
+        }
+      }, 150);
+    });
+
+    input.addEventListener('blur', () => {
+      // Delay so a tap on a suggestion still follows the link
+      setTimeout(() => { list.hidden = true; }, 200);
+    });
+    input.addEventListener('focus', () => {
+      list.hidden = list.children.length === 0;
     });
   });
 });
+
+
+// Offline support: the restaurant's service worker (see menuvi/pwa.py)
+if ('serviceWorker' in navigator && document.body.dataset.serviceWorker) {
+  window.addEventListener('load', () => {
+    navigator.serviceWorker.register(document.body.dataset.serviceWorker).catch(() => {});
+  });
+}
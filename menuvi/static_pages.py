@@ -0,0 +1,198 @@
+"""Pre-rendered ("baked") public pages served straight from nginx.
+
+Landing, menu, category and item pages depend only on the database apart
+from the picks badge, so they can be rendered once to HTML files under
+``STATIC_PAGES_FOLDER`` and served by nginx to visitors without a session
+cookie. ``flask render-static`` bakes everything; with
+``STATIC_PAGES_ENABLED`` set, admin and superadmin edits re-render just the
+pages they affect, in a background job (``menuvi/jobs.py``) so the save
+itself stays fast.
+
+Pages are rendered through the normal view functions using the test client,
+so baked output is byte-for-byte what the app would have served. Each page
+gets a gzipped ``.html.gz`` sibling for nginx's ``gzip_static``.
+Restaurants offering more than one language are left to the app, which
+picks each visitor's language (``menuvi/i18n.py``).
+"""
+
+import gzip
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from flask import current_app, url_for
+
+from .jobs import enqueue, task
+from .models import db, Category, MenuItem, Restaurant
+
+MENU_TYPES = ("dining", "beverages")
+
+
+def page_file(folder, path):
+    """Map a URL path to its baked file (``/a/`` -> ``a/index.html``)."""
+    rel = path.strip("/")
+    if path.endswith("/"):
+        rel = f"{rel}/index.html" if rel else "index.html"
+    else:
+        rel = f"{rel}.html"
+    return Path(folder) / rel
+
+
+def _write_atomic(target, data):
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=".tmp-")
+    with os.fdopen(fd, "wb") as fh:
+        fh.write(data)
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, target)
+
+
+def _gz_file(target):
+    return target.with_name(target.name + ".gz")
+
+
+def render_paths(app, paths):
+    """Render *paths* to disk; pages that no longer exist are removed.
+
+    Pages that vary by language (multilingual restaurants) are never baked,
+    so nginx passes them to the app to negotiate.
+
+    Returns the HTML files written.
+    """
+    folder = app.config["STATIC_PAGES_FOLDER"]
+    client = app.test_client(use_cookies=False)
+    written = []
+    for path in paths:
+        target = page_file(folder, path)
+        resp = client.get(path, base_url=app.config["SITE_URL"])
+        if resp.status_code == 200 and "Accept-Language" in resp.vary:
+            # Multilingual restaurant: the page depends on the visitor's language
+            target.unlink(missing_ok=True)
+            _gz_file(target).unlink(missing_ok=True)
+        elif resp.status_code == 200:
+            body = resp.get_data()
+            _write_atomic(target, body)
+            _write_atomic(_gz_file(target), gzip.compress(body, compresslevel=9, mtime=0))
+            written.append(target)
+        elif resp.status_code == 404:
+            target.unlink(missing_ok=True)
+            _gz_file(target).unlink(missing_ok=True)
+    return written
+
+
+# ── page sets ───────────────────────────────────────────────────────────────
+def menu_paths(slug):
+    paths = [url_for("public.landing", slug=slug)]
+    paths += [url_for("public.menu", slug=slug, menu_type=t) for t in MENU_TYPES]
+    return paths
+
+
+def category_path(slug, category_id):
+    return url_for("public.category", slug=slug, category_id=category_id)
+
+
+def item_path(slug, item_id):
+    return url_for("public.item_detail", slug=slug, item_id=item_id)
+
+
+def restaurant_paths(restaurant):
+    paths = menu_paths(restaurant.slug)
+    cat_ids = [
+        cid for (cid,) in
+        db.session.query(Category.id).filter_by(restaurant_id=restaurant.id)
+    ]
+    item_ids = [
+        iid for (iid,) in
+        db.session.query(MenuItem.id).join(Category)
+        .filter(Category.restaurant_id == restaurant.id)
+    ]
+    paths += [category_path(restaurant.slug, c) for c in cat_ids]
+    paths += [item_path(restaurant.slug, i) for i in item_ids]
+    return paths
+
+
+def render_all(app, slug=None):
+    """Bake every public page (or one restaurant's), pruning stale files."""
+    folder = Path(app.config["STATIC_PAGES_FOLDER"])
+    query = Restaurant.query.order_by(Restaurant.slug)
+    if slug:
+        query = query.filter_by(slug=slug)
+    written = []
+    with app.test_request_context(base_url=app.config["SITE_URL"]):
+        if slug is None:
+            written += render_paths(app, [url_for("public.directory")])
+        for restaurant in query:
+            rendered = render_paths(app, restaurant_paths(restaurant))
+            written += rendered
+            keep = set(rendered) | {_gz_file(t) for t in rendered}
+            for old in (folder / restaurant.slug).rglob("*.html*"):
+                if old not in keep:
+                    old.unlink()
+    return written
+
+
+# ── incremental regeneration ────────────────────────────────────────────────
+def _enabled():
+    return current_app.config["STATIC_PAGES_ENABLED"]
+
+
+@task("static_pages.render")
+def _render_task(paths):
+    render_paths(current_app._get_current_object(), paths)
+
+
+@task("static_pages.render_all")
+def _render_all_task(slug):
+    render_all(current_app._get_current_object(), slug=slug)
+
+
+@task("static_pages.remove")
+def _remove_task(slug):
+    folder = Path(current_app.config["STATIC_PAGES_FOLDER"]).resolve()
+    target = (folder / slug).resolve()
+    if target.parent == folder:
+        shutil.rmtree(target, ignore_errors=True)
+
+
+def _render_later(paths):
+    # Same page set queued twice before a worker gets to it renders once
+    digest = hashlib.sha1("\n".join(sorted(paths)).encode()).hexdigest()
+    enqueue(_render_task, key=f"pages:{digest}", paths=paths)
+
+
+def refresh_menu(slug, category_ids=(), item_ids=()):
+    """Re-render the menu pages of *slug* plus the given categories and items.
+
+    Call after the write has been committed. No-op unless baking is enabled.
+    """
+    if not _enabled():
+        return
+    paths = menu_paths(slug)
+    paths += [category_path(slug, c) for c in category_ids]
+    paths += [item_path(slug, i) for i in item_ids]
+    _render_later(paths)
+
+
+def refresh_all(slug):
+    """Re-bake every page of *slug*, pruning removed ones (e.g. after an import)."""
+    if not _enabled():
+        return
+    enqueue(_render_all_task, key=f"pages:{slug}:all", slug=slug)
+
+
+def refresh_restaurant(restaurant, old_slug=None):
+    """Re-render a restaurant after a branding/slug change, and the directory."""
+    if not _enabled():
+        return
+    if old_slug and old_slug != restaurant.slug:
+        enqueue(_remove_task, key=f"pages:{old_slug}:remove", slug=old_slug)
+    _render_later([url_for("public.directory")] + restaurant_paths(restaurant))
+
+
+def remove_restaurant(slug):
+    if not _enabled():
+        return
+    enqueue(_remove_task, key=f"pages:{slug}:remove", slug=slug)
+    _render_later([url_for("public.directory")])
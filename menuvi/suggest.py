@@ -0,0 +1,86 @@
+"""In-memory prefix index for search-as-you-type suggestions.
+
+The index is a sorted list of normalised name keys (one per word start, so
+"chi" finds "Butter Chicken") searched with ``bisect``. It is built from a
+menu snapshot and stored on it, which means it is rebuilt lazily the first
+time suggestions are requested after an admin edit bumps the menu version.
+"""
+
+import unicodedata
+from bisect import bisect_left
+from dataclasses import dataclass
+
+MAX_SUGGESTIONS = 8
+# Upper bound on candidates gathered before ranking
+_CANDIDATE_LIMIT = 64
+
+
+def normalise(s):
+    decomposed = unicodedata.normalize("NFKD", s.casefold())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).strip()
+
+
+@dataclass(slots=True, frozen=True)
+class Suggestion:
+    kind: str  # "item" or "category"
+    id: int
+    name: str
+    detail: str
+
+
+class PrefixIndex:
+    def __init__(self, entries):
+        # keys and postings are parallel lists sorted by key
+        pairs = []
+        for suggestion in entries:
+            words = normalise(suggestion.name).split()
+            for position in range(len(words)):
+                pairs.append((" ".join(words[position:]), position, suggestion))
+        pairs.sort(key=lambda p: (p[0], p[1]))
+        self.keys = [p[0] for p in pairs]
+        self.postings = [(p[1], p[2]) for p in pairs]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def lookup(self, prefix, limit=MAX_SUGGESTIONS) -> list[Suggestion]:
+        prefix = normalise(prefix)
+        if not prefix:
+            return []
+        candidates = {}
+        i = bisect_left(self.keys, prefix)
+        while (
+            i < len(self.keys)
+            and self.keys[i].startswith(prefix)
+            and len(candidates) < _CANDIDATE_LIMIT
+        ):
+            position, suggestion = self.postings[i]
+            best = candidates.get(suggestion)
+            if best is None or position < best:
+                candidates[suggestion] = position
+            i += 1
+        # Whole-name prefix matches first, then categories before items
+        ranked = sorted(
+            candidates.items(),
+            key=lambda c: (c[1] > 0, c[0].kind != "category", c[0].name),
+        )
+        return [suggestion for suggestion, _ in ranked[:limit]]
+
+
+def build_index(menu) -> PrefixIndex:
+    entries = []
+    for cat in menu.categories:
+        available = cat.available_items
+        if not available:
+            continue
+        entries.append(Suggestion("category", cat.id, cat.name, f"{len(available)} items"))
+        for item in available:
+            entries.append(Suggestion("item", item.id, item.name, cat.name))
+    return PrefixIndex(entries)
+
+
+def get_index(menu) -> PrefixIndex:
+    """Return the prefix index of a menu snapshot, building it on first use."""
+    if menu.prefix_index is None:
+        menu.prefix_index = build_index(menu)
+    return menu.prefix_index
@@ -0,0 +1,269 @@
+"""Deterministic synthetic tenants for capacity and performance testing.
+
+``generate()`` creates N restaurants, each with dining and beverage
+categories, menu items with realistic name/description lengths, prices,
+a share of unavailable and unpriced items, and an owner account. The same
+``SyntheticSpec`` (including its seed) always produces the same rows.
+
+Rows are written with Core ``insert()`` executemany batches and explicit
+primary keys, so no per-row ORM work or RETURNING round trips are needed;
+the search index is rebuilt once at the end. Restaurant ids start past
+SQLite's AUTOINCREMENT sequence, so ids of deleted restaurants are never
+handed out again (their purge job may still be queued).
+"""
+
+import random
+from dataclasses import dataclass
+
+from sqlalchemy import delete, func, insert, select, text
+from werkzeug.security import generate_password_hash
+
+from .models import db, Category, MenuItem, Restaurant, User
+from .tenants import mark_changed
+
+BATCH_SIZE = 5000
+_POOL_SIZE = 4096
+
+_ADJECTIVES = [
+    "Copper", "Golden", "Velvet", "Rustic", "Saffron", "Olive", "Crimson",
+    "Silver", "Little", "Grand", "Hidden", "Salty", "Smoky", "Wild", "Blue",
+]
+_NOUNS = [
+    "Lantern", "Table", "Spoon", "Garden", "Harbour", "Kitchen", "Fig",
+    "Orchard", "Ember", "Pantry", "Terrace", "Market", "Oven", "Vine",
+]
+_TAGLINES = [
+    "Seasonal plates and natural wine", "Wood-fired cooking since 1998",
+    "Modern bistro fare", "Family recipes, fresh every day",
+    "Coastal seafood and share plates", "Street food from across Asia",
+]
+_BRAND_COLORS = [
+    ("#c9a84c", "#a68939"), ("#c0392b", "#962d22"), ("#2e86ab", "#236a87"),
+    ("#6a994e", "#527a3c"), ("#b56576", "#8f4f5d"), ("#e09f3e", "#b87f2f"),
+]
+
+_DINING_CATEGORIES = [
+    "Starters", "Small Plates", "Soups", "Salads", "Mains", "Grill",
+    "Curries", "Pasta", "Seafood", "Vegetarian", "Sides", "Breads",
+    "Rice", "Desserts", "Kids", "Specials",
+]
+_BEVERAGE_CATEGORIES = [
+    "Red Wine", "White Wine", "Sparkling", "Beer", "Cocktails", "Spirits",
+    "Soft Drinks", "Hot Drinks", "Juices",
+]
+_DISH_STYLES = [
+    "Grilled", "Braised", "Crispy", "Roasted", "Smoked", "Pan-fried",
+    "Slow-cooked", "Charred", "Spiced", "Steamed", "Tandoori", "Glazed",
+]
+_DISH_BASES = [
+    "Chicken", "Lamb Shoulder", "Pork Belly", "Barramundi", "Prawns",
+    "Cauliflower", "Eggplant", "Beef Short Rib", "Duck Breast", "Tofu",
+    "Squid", "Mushrooms", "Halloumi", "Salmon", "Paneer", "Gnocchi",
+]
+_DISH_EXTRAS = [
+    "with Salsa Verde", "with Chilli Jam", "and Herb Salad", "with Miso Butter",
+    "and Pickled Onion", "with Romesco", "with Garlic Yoghurt", "", "", "",
+]
+_DRINK_STYLES = [
+    "Shiraz", "Pinot Noir", "Cabernet", "Chardonnay", "Riesling", "Prosecco",
+    "Pale Ale", "Lager", "Negroni", "Margarita", "Gin & Tonic", "Espresso",
+    "Lemonade", "Sauvignon Blanc", "Rosé", "Old Fashioned",
+]
+_DRINK_ORIGINS = [
+    "Barossa", "Yarra Valley", "Marlborough", "Margaret River", "Clare Valley",
+    "House", "Local", "Tasmanian", "Hunter Valley", "Adelaide Hills",
+]
+_DESCRIPTION_WORDS = (
+    "served with house-made sauce fresh herbs toasted seeds charred lemon "
+    "seasonal greens crunchy shallots garlic butter smoked paprika aioli "
+    "pickled chilli coriander lime roasted tomato cumin yoghurt crisp "
+    "potatoes slow cooked overnight finished on the grill light and fresh "
+    "rich and warming notes of dark cherry citrus oak vanilla dry finish"
+).split()
+
+
+@dataclass(frozen=True)
+class SyntheticSpec:
+    restaurants: int = 100
+    items_per_menu: int = 150
+    dining_categories: int = 8
+    beverage_categories: int = 4
+    unavailable_ratio: float = 0.05
+    unpriced_ratio: float = 0.03
+    users_per_restaurant: int = 1
+    seed: int = 0
+    prefix: str = "synthetic"
+    password: str = "synthetic"
+
+
+@dataclass
+class SyntheticResult:
+    restaurants: int = 0
+    categories: int = 0
+    items: int = 0
+    users: int = 0
+
+
+class _Writer:
+    """Buffers rows per table and flushes them as executemany batches."""
+
+    def __init__(self):
+        self.buffers = {table: [] for table in (
+            Restaurant.__table__, Category.__table__,
+            MenuItem.__table__, User.__table__,
+        )}
+
+    def add(self, table, row):
+        self.buffers[table].append(row)
+        if len(self.buffers[table]) >= BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        # Parents first, so each batch only references rows already written
+        for table, rows in self.buffers.items():
+            if rows:
+                db.session.execute(insert(table), rows)
+                rows.clear()
+
+
+def _next_id(model):
+    last = db.session.execute(select(func.coalesce(func.max(model.id), 0))).scalar_one()
+    connection = db.session.connection()
+    if model.__table__.kwargs.get("sqlite_autoincrement") and connection.dialect.name == "sqlite":
+        # Rows inserted with explicit ids still advance the sequence
+        seq = connection.execute(
+            text("SELECT seq FROM sqlite_sequence WHERE name = :name"),
+            {"name": model.__tablename__},
+        ).scalar()
+        last = max(last, seq or 0)
+    return last + 1
+
+
+def _description(rng):
+    words = rng.choices(_DESCRIPTION_WORDS, k=rng.randint(0, 22))
+    return " ".join(words).capitalize()
+
+
+def _dish_name(rng):
+    name = f"{rng.choice(_DISH_STYLES)} {rng.choice(_DISH_BASES)}"
+    extra = rng.choice(_DISH_EXTRAS)
+    return f"{name} {extra}" if extra else name
+
+
+def _drink_name(rng):
+    return f"{rng.choice(_DRINK_ORIGINS)} {rng.choice(_DRINK_STYLES)}"
+
+
+class _Pools:
+    """Pre-generated names, descriptions and prices.
+
+    Items draw from these with a single ``rng.random()`` per field, which
+    keeps generation cheap next to the inserts themselves.
+    """
+
+    def __init__(self, rng, spec):
+        self.rng = rng
+        self.unpriced_ratio = spec.unpriced_ratio
+        self.unavailable_ratio = spec.unavailable_ratio
+        self.descriptions = [_description(rng) for _ in range(_POOL_SIZE)]
+        self.dishes = [_dish_name(rng) for _ in range(_POOL_SIZE)]
+        self.drinks = [_drink_name(rng) for _ in range(_POOL_SIZE)]
+        cents = (0, 50, 90)
+        self.dish_prices = [d * 100 + c for d in range(12, 46) for c in cents]
+        self.drink_prices = [d * 100 + c for d in range(8, 19) for c in cents]
+
+    def pick(self, pool):
+        return pool[int(self.rng.random() * len(pool))]
+
+    def item(self, beverage):
+        rng = self.rng
+        if rng.random() < self.unpriced_ratio:
+            price = None
+        else:
+            price = self.pick(self.drink_prices if beverage else self.dish_prices)
+        return {
+            "name": self.pick(self.drinks if beverage else self.dishes),
+            "description": self.pick(self.descriptions),
+            "price_cents": price,
+            "available": rng.random() >= self.unavailable_ratio,
+        }
+
+
+def clear(prefix):
+    """Delete every synthetic restaurant created with *prefix* and its owners.
+
+    Their menus and other rows go through the same purge as a restaurant
+    deleted by the superadmin. Commits.
+    """
+    from .blueprints.superadmin import purge_restaurant
+
+    rids = db.session.execute(
+        select(Restaurant.id).where(Restaurant.slug.like(f"{prefix}-%"))
+    ).scalars().all()
+    db.session.execute(delete(User).where(User.restaurant_id.in_(rids)))
+    db.session.execute(delete(Restaurant).where(Restaurant.id.in_(rids)))
+    mark_changed()
+    db.session.commit()
+    for rid in rids:
+        purge_restaurant(rid)
+    return len(rids)
+
+
+def generate(spec: SyntheticSpec) -> SyntheticResult:
+    """Write the dataset described by *spec* in the caller's transaction."""
+    rng = random.Random(spec.seed)
+    pools = _Pools(rng, spec)
+    password_hash = generate_password_hash(spec.password)
+    rid, cid, iid, uid = (_next_id(m) for m in (Restaurant, Category, MenuItem, User))
+    writer = _Writer()
+    result = SyntheticResult()
+
+    for n in range(spec.restaurants):
+        color, color_dim = rng.choice(_BRAND_COLORS)
+        writer.add(Restaurant.__table__, {
+            "id": rid,
+            "name": f"The {rng.choice(_ADJECTIVES)} {rng.choice(_NOUNS)} {n + 1}",
+            "slug": f"{spec.prefix}-{n + 1:05d}",
+            "tagline": rng.choice(_TAGLINES),
+            "brand_color": color,
+            "brand_color_dim": color_dim,
+        })
+        for u in range(spec.users_per_restaurant):
+            writer.add(User.__table__, {
+                "id": uid,
+                "email": f"owner{u + 1}@{spec.prefix}-{n + 1:05d}.example",
+                "password_hash": password_hash,
+                "role": "owner",
+                "restaurant_id": rid,
+            })
+            uid += 1
+
+        dining = rng.sample(_DINING_CATEGORIES, min(spec.dining_categories, len(_DINING_CATEGORIES)))
+        drinks = rng.sample(_BEVERAGE_CATEGORIES, min(spec.beverage_categories, len(_BEVERAGE_CATEGORIES)))
+        categories = [(name, "dining") for name in dining] + [(name, "beverages") for name in drinks]
+        per_category, remainder = divmod(spec.items_per_menu, max(len(categories), 1))
+        for order, (name, menu_type) in enumerate(categories):
+            writer.add(Category.__table__, {
+                "id": cid, "restaurant_id": rid, "name": name,
+                "menu_type": menu_type, "sort_order": order,
+            })
+            beverage = menu_type == "beverages"
+            for item_order in range(per_category + (order < remainder)):
+                row = pools.item(beverage)
+                row.update(id=iid, category_id=cid, sort_order=item_order)
+                writer.add(MenuItem.__table__, row)
+                iid += 1
+                result.items += 1
+            cid += 1
+        result.categories += len(categories)
+        result.users += spec.users_per_restaurant
+        result.restaurants += 1
+        rid += 1
+    writer.flush()
+
+    connection = db.session.connection()
+    if connection.dialect.name == "sqlite":
+        from .search import rebuild_index
+        rebuild_index(connection)
+    mark_changed()
+    return result
@@ -0,0 +1,187 @@
+"""Allergen and dietary tags stored as an integer bitmask per menu item.
+
+Each restaurant keeps its own registry of tags (``Tag``: "Vegan",
+"Gluten-free", "Nut-free", ...), each owning one bit. An item's ``tags``
+column is the OR of its tags' bits, so "vegan + gluten-free + nut-free" is
+the single test ``tags & want = want`` with no join through a tags table.
+
+``Category.tag_mask`` holds the OR of its items' tags and is kept up to
+date by ORM events on ``MenuItem``, like the search index. A filtered menu
+drops every category whose mask lacks a wanted bit without looking at its
+items; the rest are checked item by item on the cached snapshot. Search
+adds the same predicate to its SQL (``menuvi/search.py``).
+
+Bits stop at 31 so masks survive JavaScript's 32-bit bitwise operators in
+``app.js``.
+"""
+
+import re
+from dataclasses import dataclass, field
+
+from sqlalchemy import event, func, inspect, select, update
+
+from .models import db, Category, MenuItem, Tag
+
+MAX_TAGS = 32
+
+
+class TagError(ValueError):
+    pass
+
+
+def _slugify(name):
+    slug = re.sub(r"[^\w\s-]", "", name.lower())
+    return re.sub(r"[\s_]+", "-", slug).strip("-")
+
+
+# ── registry ────────────────────────────────────────────────────────────────
+def restaurant_tags(restaurant_id) -> list[Tag]:
+    return db.session.execute(
+        select(Tag).where(Tag.restaurant_id == restaurant_id).order_by(Tag.name)
+    ).scalars().all()
+
+
+def _check_name(restaurant_id, name, tag=None):
+    name = name.strip()
+    slug = _slugify(name)
+    if not slug:
+        raise TagError("Name is required.")
+    clash = db.session.execute(
+        select(Tag.id).where(Tag.restaurant_id == restaurant_id, Tag.slug == slug)
+    ).scalar()
+    if clash is not None and (tag is None or clash != tag.id):
+        raise TagError(f"There is already a tag called '{name}'.")
+    return name, slug
+
+
+def add_tag(restaurant_id, name) -> Tag:
+    """Register a tag on the lowest free bit. Does not commit."""
+    name, slug = _check_name(restaurant_id, name)
+    used = set(db.session.execute(
+        select(Tag.bit).where(Tag.restaurant_id == restaurant_id)
+    ).scalars())
+    free = [bit for bit in range(MAX_TAGS) if bit not in used]
+    if not free:
+        raise TagError(f"A restaurant can have at most {MAX_TAGS} tags.")
+    tag = Tag(restaurant_id=restaurant_id, bit=free[0], name=name, slug=slug)
+    db.session.add(tag)
+    return tag
+
+
+def rename_tag(tag, name):
+    tag.name, tag.slug = _check_name(tag.restaurant_id, name, tag)
+
+
+def delete_tag(tag):
+    """Remove *tag* and clear its bit everywhere, so it can be reused. Does not commit."""
+    cleared = ~tag.mask
+    cids = select(Category.id).where(Category.restaurant_id == tag.restaurant_id)
+    db.session.execute(
+        update(MenuItem).where(MenuItem.category_id.in_(cids), MenuItem.tags.op("&")(tag.mask) != 0)
+        .values(tags=MenuItem.tags.op("&")(cleared))
+        .execution_options(synchronize_session=False)
+    )
+    db.session.execute(
+        update(Category).where(Category.restaurant_id == tag.restaurant_id)
+        .values(tag_mask=Category.tag_mask.op("&")(cleared))
+        .execution_options(synchronize_session=False)
+    )
+    db.session.delete(tag)
+
+
+def form_mask(form, tags) -> int:
+    """The item form's ticked ``tags`` checkboxes as a bitmask of *tags*."""
+    ticked = set(form.getlist("tags"))
+    return sum(tag.mask for tag in tags if str(tag.bit) in ticked)
+
+
+# ── category masks ──────────────────────────────────────────────────────────
+def _refresh_mask(connection, category_id):
+    mask = 0
+    for (tags,) in connection.execute(
+        select(MenuItem.tags).where(MenuItem.category_id == category_id, MenuItem.tags != 0)
+    ):
+        mask |= tags
+    connection.execute(
+        update(Category.__table__).where(Category.id == category_id).values(tag_mask=mask)
+    )
+
+
+def rebuild_tag_masks(connection, restaurant_id=None):
+    """Recompute ``Category.tag_mask`` (for one restaurant, or all) after bulk writes."""
+    categories = select(Category.id)
+    if restaurant_id is not None:
+        categories = categories.where(Category.restaurant_id == restaurant_id)
+    masks = dict.fromkeys(connection.execute(categories).scalars(), 0)
+    for cid, tags in connection.execute(
+        select(MenuItem.category_id, MenuItem.tags)
+        .where(MenuItem.category_id.in_(categories), MenuItem.tags != 0)
+    ):
+        masks[cid] |= tags
+    for cid, mask in masks.items():
+        connection.execute(
+            update(Category.__table__).where(Category.id == cid).values(tag_mask=mask)
+        )
+    return len(masks)
+
+
+@event.listens_for(MenuItem, "after_insert")
+@event.listens_for(MenuItem, "after_delete")
+def _item_written(mapper, connection, item):
+    if item.tags:
+        _refresh_mask(connection, item.category_id)
+
+
+@event.listens_for(MenuItem, "after_update")
+def _item_updated(mapper, connection, item):
+    state = inspect(item)
+    if state.attrs.category_id.history.has_changes():
+        # Moved: the old category is not recorded if the attribute was
+        # expired when set, so redo the whole restaurant (a rare admin edit)
+        restaurant_id = connection.execute(
+            select(Category.restaurant_id).where(Category.id == item.category_id)
+        ).scalar()
+        rebuild_tag_masks(connection, restaurant_id)
+    elif state.attrs.tags.history.has_changes():
+        _refresh_mask(connection, item.category_id)
+
+
+# ── public filter ───────────────────────────────────────────────────────────
+@dataclass(slots=True)
+class TagFilter:
+    """The ``?tag=`` filter of a public page, resolved against the menu."""
+
+    tags: list = field(default_factory=list)  # the restaurant's registry
+    selected: list[str] = field(default_factory=list)  # known slugs, registry order
+    mask: int = 0
+
+    def toggled(self, slug) -> list[str]:
+        """``selected`` with *slug* switched on or off, for the filter links."""
+        if slug in self.selected:
+            return [s for s in self.selected if s != slug]
+        return [t.slug for t in self.tags if t.slug in self.selected or t.slug == slug]
+
+
+def tag_filter(menu, slugs) -> TagFilter:
+    """Resolve ``?tag=`` values; tags that no longer exist are ignored."""
+    wanted = set(slugs)
+    selected = [t for t in menu.tags if t.slug in wanted]
+    return TagFilter(
+        tags=menu.tags, selected=[t.slug for t in selected],
+        mask=sum(1 << t.bit for t in selected),
+    )
+
+
+def count_tagged(restaurant_id) -> dict[int, int]:
+    """Items carrying each tag bit, for the admin tag list."""
+    rows = db.session.execute(
+        select(MenuItem.tags, func.count())
+        .join(Category).where(Category.restaurant_id == restaurant_id, MenuItem.tags != 0)
+        .group_by(MenuItem.tags)
+    )
+    counts = {}
+    for tags, n in rows:
+        for bit in range(MAX_TAGS):
+            if tags >> bit & 1:
+                counts[bit] = counts.get(bit, 0) + n
+    return counts
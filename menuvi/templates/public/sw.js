@@ -0,0 +1,109 @@
+// Service worker for one restaurant (see menuvi/pwa.py). Regenerated
+// whenever the menu, templates or assets change.
+const PREFIX = 'menuvi-' + {{ restaurant_id|tojson }} + '-';
+const CACHE = PREFIX + {{ version|tojson }};
+const SHELL = {{ shell|tojson }};
+const ITEMS = {{ items|tojson }};
+const PICKS = {{ url_for('public.picks', slug=restaurant_slug)|tojson }};
+const SCOPE = {{ url_for('public.landing', slug=restaurant_slug)|tojson }};
+const PICKS_API = {{ url_for('public.api_picks', slug=restaurant_slug)|tojson }};
+const SKIP = ['admin/', 'search', 'sw.js', 'api/picks'];
+const ITEM_BATCH = 6;
+// Public pages vary on Cookie; this cache only ever holds this visitor's copies
+const MATCH = { ignoreVary: true };
+
+// Install: the shell must cache; item pages are best effort, a few at a time
+self.addEventListener('install', (event) => {
+  event.waitUntil((async () => {
+    const cache = await caches.open(CACHE);
+    await cache.addAll(SHELL);
+    for (let i = 0; i < ITEMS.length; i += ITEM_BATCH) {
+      await Promise.all(ITEMS.slice(i, i + ITEM_BATCH).map(
+        (url) => cache.add(url).catch(() => {})
+      ));
+    }
+    await self.skipWaiting();
+  })());
+});
+
+// Activate: drop this restaurant's caches from older menu versions
+self.addEventListener('activate', (event) => {
+  event.waitUntil((async () => {
+    for (const key of await caches.keys()) {
+      if (key !== CACHE && key.startsWith(PREFIX)) {
+        await caches.delete(key);
+      }
+    }
+    await self.clients.claim();
+  })());
+});
+
+async function refreshPicks() {
+  try {
+    const resp = await fetch(PICKS, { credentials: 'same-origin' });
+    if (resp.ok) await (await caches.open(CACHE)).put(PICKS, resp);
+  } catch {
+    // offline: keep the last copy
+  }
+}
+
+// Picks: network first so the list is current, cached copy when offline
+async function networkFirst(request) {
+  const cache = await caches.open(CACHE);
+  try {
+    const resp = await fetch(request);
+    if (resp.ok) await cache.put(PICKS, resp.clone());
+    return resp;
+  } catch {
+    return (await cache.match(PICKS, MATCH)) || Response.error();
+  }
+}
+
+// Menu pages and assets: answer from cache, refresh in the background
+async function staleWhileRevalidate(event) {
+  const cache = await caches.open(CACHE);
+  const cached = await cache.match(event.request, MATCH);
+  const network = fetch(event.request).then((resp) => {
+    if (resp.ok) cache.put(event.request, resp.clone());
+    return resp;
+  });
+  if (cached) {
+    event.waitUntil(network.catch(() => {}));
+    return cached;
+  }
+  try {
+    return await network;
+  } catch {
+    // Offline and never visited: the landing page is the best we have
+    return (await cache.match(SCOPE, MATCH)) || Response.error();
+  }
+}
+
+self.addEventListener('fetch', (event) => {
+  const request = event.request;
+  const url = new URL(request.url);
+  if (url.origin !== self.location.origin) return;
+
+  if (request.method === 'POST') {
+    // Picks sync or add/remove/clear: update the offline copy of the picks page
+    if (url.pathname === PICKS_API || url.pathname.startsWith(PICKS + '/')) {
+      event.respondWith(fetch(request).then((resp) => {
+        event.waitUntil(refreshPicks());
+        return resp;
+      }));
+    }
+    return;
+  }
+  if (request.method !== 'GET') return;
+
+  if (url.pathname === PICKS) {
+    event.respondWith(networkFirst(request));
+    return;
+  }
+  const inScope = url.pathname.startsWith(SCOPE)
+    && !SKIP.some((part) => url.pathname.startsWith(SCOPE + part));
+  // Item photos too, so a menu browsed online keeps its pictures offline
+  if (inScope || url.pathname.startsWith('/static/') || url.pathname.startsWith('/media/')) {
+    event.respondWith(staleWhileRevalidate(event));
+  }
+});
@@ -0,0 +1,179 @@
+"""Slug -> restaurant resolution shared by the public and admin blueprints.
+
+Every tenant-scoped request starts by resolving ``<slug>``. Resolved
+restaurants are cached per worker as immutable ``Tenant`` snapshots, and
+unknown slugs (scanners, typos) are cached as misses, so steady-state
+routing never touches the database.
+
+Workers stay coherent through a stamp file: any commit that changes a
+restaurant (branding, slug, menu version, create/delete) atomically
+replaces it, and each lookup compares the file's ``(inode, mtime)`` with
+the generation the cache was filled under -- one ``stat()`` per request.
+"""
+
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from flask import abort, current_app, g, has_app_context
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from .models import db, utcnow, Restaurant
+
+# Cached marker for slugs that do not exist
+_MISSING = object()
+
+
+@dataclass(frozen=True, slots=True)
+class Tenant:
+    id: int
+    name: str
+    slug: str
+    tagline: str
+    brand_color: str
+    brand_color_dim: str
+    menu_version: int
+    updated_at: datetime
+    timezone: str = "UTC"
+    # When a scheduled item next appears or disappears (see menuvi/schedule.py)
+    next_transition: datetime | None = None
+    # Languages offered, default first (see menuvi/i18n.py)
+    locales: tuple[str, ...] = ("en",)
+
+
+class TenantCache:
+    """Bounded LRU of slug -> Tenant (or miss), reset when the stamp moves."""
+
+    def __init__(self, stamp_path, max_entries):
+        self.stamp_path = Path(stamp_path)
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, object] = OrderedDict()
+        self._generation = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def generation(self):
+        """Identity of the current stamp file; changes on every touch()."""
+        try:
+            st = os.stat(self.stamp_path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns)
+
+    def get(self, slug):
+        """Return a Tenant, ``_MISSING`` for a cached 404, or None if unknown."""
+        generation = self.generation()
+        with self._lock:
+            if generation != self._generation:
+                self._entries.clear()
+                self._generation = generation
+                return None
+            entry = self._entries.get(slug)
+            if entry is not None:
+                self._entries.move_to_end(slug)
+            return entry
+
+    def put(self, slug, entry):
+        with self._lock:
+            self._entries[slug] = entry
+            self._entries.move_to_end(slug)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def touch(self):
+        """Publish a new generation to every worker."""
+        self.stamp_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.stamp_path.parent, prefix=".stamp-")
+        os.close(fd)
+        os.replace(tmp, self.stamp_path)
+        self.clear()
+
+
+def init_app(app):
+    app.extensions["tenant_cache"] = TenantCache(
+        app.config["TENANT_STAMP_FILE"], app.config["TENANT_CACHE_SIZE"],
+    )
+
+
+def get_cache() -> TenantCache:
+    return current_app.extensions["tenant_cache"]
+
+
+def content_generation():
+    """Global content version: changes whenever any restaurant changes."""
+    return get_cache().generation()
+
+
+def _fetch(slug):
+    row = db.session.execute(
+        select(
+            Restaurant.id, Restaurant.name, Restaurant.slug, Restaurant.tagline,
+            Restaurant.brand_color, Restaurant.brand_color_dim,
+            Restaurant.menu_version, Restaurant.updated_at,
+            Restaurant.timezone, Restaurant.next_transition, Restaurant.locales,
+        ).where(Restaurant.slug == slug)
+    ).first()
+    if row is None:
+        return _MISSING
+    return Tenant(
+        id=row.id, name=row.name, slug=row.slug, tagline=row.tagline or "",
+        brand_color=row.brand_color, brand_color_dim=row.brand_color_dim,
+        menu_version=row.menu_version, updated_at=row.updated_at,
+        timezone=row.timezone, next_transition=row.next_transition,
+        locales=tuple((row.locales or "en").split(",")),
+    )
+
+
+def load_restaurant(slug) -> Tenant:
+    """Resolve *slug* to a Tenant (404 if unknown) and make it ``g.restaurant``."""
+    cache = get_cache()
+    entry = cache.get(slug)
+    if entry is None:
+        entry = _fetch(slug)
+        cache.put(slug, entry)
+    if (
+        entry is not _MISSING and entry.next_transition is not None
+        and entry.next_transition <= utcnow()
+    ):
+        # A scheduled item's window opened or closed and the worker has not
+        # caught up yet: apply it before serving anything
+        from .schedule import apply_schedule
+
+        apply_schedule(entry.id)
+        entry = _fetch(slug)
+        cache.put(slug, entry)
+    if entry is _MISSING:
+        abort(404)
+    g.restaurant = entry
+    return entry
+
+
+def mark_changed():
+    """Flag that the current transaction changes a restaurant.
+
+    The tenant stamp is replaced once the transaction commits, so other
+    workers never re-read the row before the change is visible.
+    """
+    db.session.info["tenants_changed"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_changes(session):
+    if session.info.pop("tenants_changed", False) and has_app_context():
+        get_cache().touch()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    session.info.pop("tenants_changed", None)
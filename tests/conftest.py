@@ -1,8 +1,44 @@
+from contextlib import contextmanager
+from pathlib import Path
+
 import pytest
 
 from menuvi import create_app
 from menuvi.config import Config
 from menuvi.models import db as _db, Restaurant, User
+from menuvi.querycount import count_queries
+
+BASELINE_FILE = Path(__file__).parent / "benchmark_baseline.json"
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmark", "route benchmarks (tests/test_benchmarks.py)")
+    group.addoption("--benchmark", action="store_true",
+                    help="Run the route benchmarks (skipped by default).")
+    group.addoption("--benchmark-baseline", default=str(BASELINE_FILE),
+                    help="JSON baseline to compare against (default: %(default)s).")
+    group.addoption("--benchmark-save", action="store_true",
+                    help="Write this run's results as the new baseline.")
+    group.addoption("--benchmark-tolerance", type=float, default=25.0,
+                    help="Allowed median latency regression in percent (default: 25).")
+    group.addoption("--benchmark-slack", type=float, default=1.0,
+                    help="Absolute latency slack in milliseconds on top of the "
+                         "tolerance (default: 1).")
+    group.addoption("--benchmark-sizes", default="small,large",
+                    help="Comma-separated dataset sizes to run (default: small,large).")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark: route benchmark, needs --benchmark")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--benchmark"):
+        return
+    skip = pytest.mark.skip(reason="benchmarks run with --benchmark")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
 
 
 class TestConfig(Config):
@@ -10,6 +46,16 @@ class TestConfig(Config):
     SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
     SECRET_KEY = "test-secret"
     LOGIN_DISABLED = False
+    JOBS_INLINE = True
+
+
+@pytest.fixture(scope="session", autouse=True)
+def instance_dir(tmp_path_factory):
+    """Keep files the app writes at startup out of the repo's ``instance/``."""
+    path = tmp_path_factory.mktemp("instance")
+    TestConfig.TENANT_STAMP_FILE = str(path / "tenants.stamp")
+    TestConfig.UPLOAD_FOLDER = str(path / "uploads")
+    return path
 
 
 @pytest.fixture()
@@ -62,3 +108,16 @@ def superadmin_user(db):
     db.session.add(user)
     db.session.commit()
     return user
+
+
+@pytest.fixture()
+def query_budget(app):
+    """Assert that a block issues at most ``n`` SQL statements."""
+    @contextmanager
+    def budget(n):
+        with count_queries() as counter:
+            yield counter
+        assert counter.count <= n, (
+            f"{counter.count} queries (budget {n}):\n" + "\n".join(counter.statements)
+        )
+    return budget
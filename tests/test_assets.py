@@ -0,0 +1,118 @@
+import gzip
+import shutil
+from pathlib import Path
+
+import pytest
+
+from menuvi.assets import (
+    CRITICAL_SECTIONS, IMMUTABLE, build, css_sections, load_manifest, minify_css,
+    minify_js, use_manifest,
+)
+
+SOURCE_STATIC = Path(__file__).resolve().parent.parent / "menuvi" / "static"
+
+
+@pytest.fixture()
+def static(tmp_path):
+    folder = tmp_path / "static"
+    shutil.copytree(SOURCE_STATIC, folder, ignore=shutil.ignore_patterns("dist"))
+    return folder
+
+
+@pytest.fixture()
+def built(app, static):
+    app.static_folder = str(static)
+    manifest = build(static)
+    use_manifest(app, manifest)
+    return manifest
+
+
+def test_minify_css():
+    source = "/* note */\na:hover ,  b > c {\n  color: red;\n  margin: 0 auto;\n}\n"
+    assert minify_css(source) == "a:hover,b>c{color:red;margin:0 auto}"
+
+
+def test_minify_js_keeps_code():
+    source = "// comment\nconst a = 1;\n\n    if (a) {\n      go(`${a} x`);\n    }\n"
+    assert minify_js(source) == "const a = 1;\nif (a) {\ngo(`${a} x`);\n}\n"
+
+
+def test_build_writes_hashed_files_and_manifest(static):
+    manifest = build(static)
+    hashed = manifest["files"]["css/style.css"]
+    assert hashed.startswith("dist/css/style.") and hashed.endswith(".css")
+    data = (static / hashed).read_bytes()
+    assert len(data) < (static / "css" / "style.css").stat().st_size
+    assert gzip.decompress((static / (hashed + ".gz")).read_bytes()) == data
+    assert "js/app.js" in manifest["files"]
+    assert load_manifest(static) == manifest
+
+    # Same content, same name; an edit gets a new name and keeps the old file
+    assert build(static)["files"] == manifest["files"]
+    style = static / "css" / "style.css"
+    style.write_text(style.read_text() + "\n.extra { color: red; }\n")
+    changed = build(static)["files"]["css/style.css"]
+    assert changed != hashed
+    assert (static / hashed).exists() and (static / changed).exists()
+
+    # ...until a second build no longer references it
+    style.write_text(style.read_text() + "\n.more { color: blue; }\n")
+    build(static)
+    assert not (static / hashed).exists()
+    assert not (static / (hashed + ".gz")).exists()
+
+
+def test_critical_css_uses_named_sections(static):
+    manifest = build(static)
+    sections = css_sections((static / "css" / "style.css").read_text())
+    for page, names in CRITICAL_SECTIONS.items():
+        assert set(names) <= set(sections)
+        critical = manifest["critical"][page]
+        assert ".landing-btn" in critical if page == "landing" else ".cat-card" in critical
+        assert ".admin" not in critical
+        assert len(critical) < len(minify_css("".join(sections.values())))
+
+
+def test_templates_fall_back_to_plain_assets(client, restaurant):
+    html = client.get("/test-restaurant/").get_data(as_text=True)
+    assert 'href="/static/css/style.css"' in html
+    assert 'src="/static/js/app.js"' in html
+    assert 'rel="preload"' not in html
+
+
+def test_templates_use_manifest(client, restaurant, built):
+    style = built["files"]["css/style.css"]
+    html = client.get("/test-restaurant/").get_data(as_text=True)
+    assert f'href="/static/{style}"' in html
+    assert f'src="/static/{built["files"]["js/app.js"]}"' in html
+    # Landing page: critical rules inline, full stylesheet preloaded
+    assert f"<style>{built['critical']['landing']}</style>" in html
+    assert 'rel="preload"' in html and "<noscript>" in html
+
+    html = client.get("/test-restaurant/menu/dining").get_data(as_text=True)
+    assert built["critical"]["menu"] in html
+
+    # Pages without a critical set keep the blocking stylesheet
+    html = client.get("/test-restaurant/search?q=x").get_data(as_text=True)
+    assert f'<link rel="stylesheet" href="/static/{style}">' in html
+    assert 'rel="preload"' not in html
+
+
+def test_hashed_assets_are_immutable(client, built):
+    resp = client.get(f"/static/{built['files']['css/style.css']}")
+    assert resp.status_code == 200
+    assert resp.headers["Cache-Control"] == IMMUTABLE
+    resp.close()
+
+    resp = client.get("/static/css/style.css")
+    assert resp.status_code == 200
+    assert "immutable" not in resp.headers.get("Cache-Control", "")
+    resp.close()
+
+
+def test_etag_changes_with_asset_build(app, static):
+    from menuvi.http_cache import _template_fingerprint
+
+    before = _template_fingerprint(app)
+    use_manifest(app, build(static))
+    assert _template_fingerprint(app) != before
@@ -0,0 +1,186 @@
+"""Route latency and query-count benchmarks over synthetic datasets.
+
+Skipped unless pytest is run with ``--benchmark``::
+
+    python -m pytest tests/test_benchmarks.py --benchmark
+    python -m pytest tests/test_benchmarks.py --benchmark --benchmark-save
+
+Each route is timed in steady state (tenant and menu caches warm) against
+every dataset size. Results are compared with the JSON baseline: a route
+fails if it issues more queries than before, or if its median latency,
+measured relative to ``/robots.txt`` timed in the same run, grew by more
+than ``--benchmark-tolerance`` percent plus ``--benchmark-slack``
+milliseconds. The calibration route goes through the same request
+handling without touching the database, so scaling by it cancels out
+most of the difference between machines and between runs.
+``--benchmark-save`` writes the run as the new baseline.
+"""
+
+import json
+import statistics
+import time
+from pathlib import Path
+
+import pytest
+
+from menuvi import create_app
+from menuvi.models import db, Category, MenuItem, Restaurant, User
+from menuvi.querycount import count_queries
+from menuvi.synthetic import SyntheticSpec, generate
+
+from .conftest import TestConfig
+
+pytestmark = pytest.mark.benchmark
+
+SIZES = {
+    "small": SyntheticSpec(restaurants=20, items_per_menu=40),
+    "large": SyntheticSpec(restaurants=500, items_per_menu=150),
+}
+WARMUP = 3
+ROUNDS = 30
+SLUG = "synthetic-00001"
+CALIBRATION = "/robots.txt"
+
+ROUTES = [
+    "directory", "menu", "category", "item_detail", "search", "picks",
+    "sitemap", "admin_dashboard", "superadmin_dashboard",
+]
+
+
+def _sizes(config):
+    return [s.strip() for s in config.getoption("--benchmark-sizes").split(",") if s.strip()]
+
+
+def pytest_generate_tests(metafunc):
+    if "size" in metafunc.fixturenames:
+        metafunc.parametrize("size", _sizes(metafunc.config), scope="module")
+
+
+@pytest.fixture(scope="session")
+def results(request):
+    config = request.config
+    collected = {}
+    yield collected
+    if config.getoption("--benchmark-save") and collected:
+        path = Path(config.getoption("--benchmark-baseline"))
+        baseline = json.loads(path.read_text()) if path.exists() else {}
+        baseline.update(collected)
+        path.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+
+
+@pytest.fixture(scope="module")
+def bench(size, tmp_path_factory):
+    """An app over a synthetic dataset of *size*, plus the ids routes need."""
+    folder = tmp_path_factory.mktemp(f"bench-{size}")
+
+    class BenchConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{folder / 'bench.db'}"
+        TENANT_STAMP_FILE = folder / "tenants.stamp"
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+        generate(SIZES[size])
+        superadmin = User(email="super@bench.example", role="superadmin")
+        superadmin.set_password("bench")
+        db.session.add(superadmin)
+        db.session.commit()
+
+        restaurant = Restaurant.query.filter_by(slug=SLUG).one()
+        category = Category.query.filter_by(restaurant_id=restaurant.id).first()
+        items = (
+            MenuItem.query.join(Category)
+            .filter(Category.restaurant_id == restaurant.id)
+            .order_by(MenuItem.id).limit(5).all()
+        )
+        ids = {"category": category.id, "items": [i.id for i in items]}
+        search_term = items[0].name.split()[0]
+    yield app, ids, search_term
+    with app.app_context():
+        db.engine.dispose()
+
+
+def _client_for(app, ids, route):
+    client = app.test_client()
+    if route == "picks":
+        for item_id in ids["items"]:
+            client.post(f"/{SLUG}/picks/add/{item_id}")
+    elif route == "admin_dashboard":
+        client.post(f"/{SLUG}/admin/login",
+                    data={"email": f"owner1@{SLUG}.example", "password": "synthetic"})
+    elif route == "superadmin_dashboard":
+        client.post("/superadmin/login",
+                    data={"email": "super@bench.example", "password": "bench"})
+    return client
+
+
+def _path(route, ids, search_term):
+    return {
+        "directory": "/",
+        "menu": f"/{SLUG}/menu/dining",
+        "category": f"/{SLUG}/category/{ids['category']}",
+        "item_detail": f"/{SLUG}/item/{ids['items'][0]}",
+        "search": f"/{SLUG}/search?q={search_term}",
+        "picks": f"/{SLUG}/picks",
+        "sitemap": "/sitemap.xml",
+        "admin_dashboard": f"/{SLUG}/admin/",
+        "superadmin_dashboard": "/superadmin/",
+    }[route]
+
+
+def _time(client, path):
+    started = time.perf_counter()
+    client.get(path).close()
+    return (time.perf_counter() - started) * 1000
+
+
+@pytest.mark.parametrize("route", ROUTES)
+def test_route_benchmark(bench, size, route, results, request):
+    app, ids, search_term = bench
+    client = _client_for(app, ids, route)
+    path = _path(route, ids, search_term)
+
+    for _ in range(WARMUP):
+        assert client.get(CALIBRATION).status_code == 200
+        assert client.get(path).status_code == 200
+    with app.app_context(), count_queries() as counter:
+        client.get(path)
+    # Interleaved, so both see the same machine load
+    calibrations, timings = [], []
+    for _ in range(ROUNDS):
+        calibrations.append(_time(client, CALIBRATION))
+        timings.append(_time(client, path))
+    calibration = statistics.median(calibrations)
+
+    timings.sort()
+    median = statistics.median(timings)
+    entry = {
+        "median_ms": round(median, 3),
+        "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 3),
+        "max_ms": round(timings[-1], 3),
+        "relative": round(median / calibration, 2),
+        "queries": counter.count,
+    }
+    key = f"{size}/{route}"
+    results[key] = entry
+
+    baseline_path = Path(request.config.getoption("--benchmark-baseline"))
+    if request.config.getoption("--benchmark-save") or not baseline_path.exists():
+        return
+    previous = json.loads(baseline_path.read_text()).get(key)
+    if previous is None:
+        return
+    assert entry["queries"] <= previous["queries"], (
+        f"{key}: {entry['queries']} queries, baseline {previous['queries']}"
+    )
+    if "relative" not in previous:
+        return  # recorded before calibration; only the query count compares
+    tolerance = request.config.getoption("--benchmark-tolerance")
+    slack = request.config.getoption("--benchmark-slack")
+    expected = previous["relative"] * calibration
+    limit = expected * (1 + tolerance / 100) + slack
+    assert median <= limit, (
+        f"{key}: median {median:.2f}ms exceeds {expected:.2f}ms "
+        f"({previous['relative']:g}x {CALIBRATION} at {calibration:.2f}ms) "
+        f"by more than {tolerance:g}% + {slack:g}ms"
+    )
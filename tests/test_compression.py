@@ -0,0 +1,108 @@
+import gzip
+
+import pytest
+
+from menuvi.compression import available_encodings
+from menuvi.menu_cache import bump_menu_version
+from menuvi.models import Category, MenuItem, db
+
+SLUG = "test-restaurant"
+GZIP = {"Accept-Encoding": "gzip, deflate"}
+
+
+def _seed(db_session, restaurant):
+    cat = Category(restaurant_id=restaurant.id, name="Mains", menu_type="dining")
+    db_session.add(cat)
+    db_session.flush()
+    db_session.add(MenuItem(category_id=cat.id, name="Butter Chicken", description="Creamy"))
+    db_session.commit()
+
+
+def _cache(app):
+    return app.extensions["compression_cache"]
+
+
+def test_gzip_negotiated(client, app, restaurant):
+    with app.app_context():
+        _seed(db.session, restaurant)
+    plain = client.get(f"/{SLUG}/menu/dining")
+    assert "Content-Encoding" not in plain.headers
+    assert "Accept-Encoding" in plain.headers["Vary"]
+
+    resp = client.get(f"/{SLUG}/menu/dining", headers=GZIP)
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in resp.headers["Vary"]
+    assert gzip.decompress(resp.data) == plain.data
+    assert resp.headers["ETag"] == "W/" + plain.headers["ETag"]
+
+
+def test_compressed_page_cached_per_menu_version(client, app, restaurant):
+    with app.app_context():
+        _seed(db.session, restaurant)
+    client.get(f"/{SLUG}/menu/dining", headers=GZIP)
+    client.get(f"/{SLUG}/menu/dining", headers=GZIP)
+    assert (_cache(app).misses, _cache(app).hits) == (1, 1)
+
+    with app.app_context():
+        bump_menu_version(restaurant.id)
+        db.session.commit()
+    client.get(f"/{SLUG}/menu/dining", headers=GZIP)
+    assert _cache(app).misses == 2
+
+
+def test_compressed_page_cached_per_host(client, app, restaurant):
+    with app.app_context():
+        _seed(db.session, restaurant)
+    client.get(f"/{SLUG}/menu/dining", headers=GZIP)
+    resp = client.get(f"/{SLUG}/menu/dining", headers=GZIP, base_url="https://menus.example")
+    assert (_cache(app).misses, _cache(app).hits) == (2, 0)
+    assert b'href="https://menus.example/' in gzip.decompress(resp.data)
+
+
+def test_pages_with_picks_not_cached(client, app, restaurant):
+    with app.app_context():
+        _seed(db.session, restaurant)
+        item_id = MenuItem.query.one().id
+    client.post(f"/{SLUG}/api/picks", json={"add": [item_id]})
+    for _ in range(2):
+        resp = client.get(f"/{SLUG}/menu/dining", headers=GZIP)
+        assert resp.headers["Content-Encoding"] == "gzip"
+        assert b'data-picks-at="0"' not in gzip.decompress(resp.data)
+    assert len(_cache(app)) == 0
+
+
+def test_weak_etag_revalidates(client, app, restaurant):
+    with app.app_context():
+        _seed(db.session, restaurant)
+    etag = client.get(f"/{SLUG}/", headers=GZIP).headers["ETag"]
+    assert etag.startswith("W/")
+    resp = client.get(f"/{SLUG}/", headers={**GZIP, "If-None-Match": etag})
+    assert resp.status_code == 304
+
+
+def test_uncacheable_pages_still_compressed(client, app, restaurant):
+    resp = client.get("/", headers=GZIP)
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert len(_cache(app)) == 0
+
+
+@pytest.mark.parametrize("headers", [{}, {"Accept-Encoding": "gzip;q=0"}])
+def test_identity_when_not_accepted(client, restaurant, headers):
+    resp = client.get(f"/{SLUG}/", headers=headers)
+    assert "Content-Encoding" not in resp.headers
+
+
+def test_small_and_binary_responses_skipped(client, app, restaurant):
+    assert "Content-Encoding" not in client.get("/robots.txt", headers=GZIP).headers
+    app.config["COMPRESS_MIN_SIZE"] = 10
+    assert client.get("/robots.txt", headers=GZIP).headers["Content-Encoding"] == "gzip"
+    app.config["COMPRESS_ENABLED"] = False
+    assert "Content-Encoding" not in client.get("/", headers=GZIP).headers
+
+
+def test_brotli_preferred_when_installed(client, restaurant):
+    brotli = pytest.importorskip("brotli")
+    assert "br" in available_encodings()
+    resp = client.get(f"/{SLUG}/", headers={"Accept-Encoding": "gzip, br"})
+    assert resp.headers["Content-Encoding"] == "br"
+    assert b"Test Restaurant" in brotli.decompress(resp.data)
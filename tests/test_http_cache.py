@@ -0,0 +1,86 @@
+from menuvi.models import Category, MenuItem, Restaurant, db
+
+SLUG = "test-restaurant"
+
+
+def _seed(db_session, restaurant):
+    cat = Category(
+        restaurant_id=restaurant.id, name="Mains", menu_type="dining", sort_order=0,
+    )
+    db_session.add(cat)
+    db_session.flush()
+    item = MenuItem(category_id=cat.id, name="Butter Chicken", sort_order=0)
+    db_session.add(item)
+    db_session.commit()
+    return cat.id, item.id
+
+
+def test_public_pages_send_validators(client, app, restaurant):
+    with app.app_context():
+        cat_id, item_id = _seed(db.session, restaurant)
+    for path in (f"/{SLUG}/", f"/{SLUG}/menu/dining",
+                 f"/{SLUG}/category/{cat_id}", f"/{SLUG}/item/{item_id}"):
+        resp = client.get(path)
+        assert resp.headers["ETag"]
+        assert resp.headers["Last-Modified"]
+        assert resp.headers["Cache-Control"] == "private, no-cache"
+
+
+def test_if_none_match_short_circuits(client, app, restaurant, query_budget):
+    with app.app_context():
+        cat_id, _ = _seed(db.session, restaurant)
+    etag = client.get(f"/{SLUG}/category/{cat_id}").headers["ETag"]
+    with query_budget(1):
+        resp = client.get(f"/{SLUG}/category/{cat_id}", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.data == b""
+    assert resp.headers["ETag"] == etag
+
+
+def test_if_modified_since(client, restaurant):
+    last_modified = client.get(f"/{SLUG}/").headers["Last-Modified"]
+    resp = client.get(f"/{SLUG}/", headers={"If-Modified-Since": last_modified})
+    assert resp.status_code == 304
+
+
+def test_admin_write_changes_etag(client, app, restaurant, admin_user):
+    with app.app_context():
+        cat_id, item_id = _seed(db.session, restaurant)
+    etag = client.get(f"/{SLUG}/category/{cat_id}").headers["ETag"]
+    client.post(
+        f"/{SLUG}/admin/login",
+        data={"email": "admin@test.com", "password": "testpass"},
+    )
+    client.post(f"/{SLUG}/admin/item/{item_id}/toggle")
+    client.get(f"/{SLUG}/admin/logout")
+    resp = client.get(f"/{SLUG}/category/{cat_id}", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+
+
+def test_superadmin_edit_changes_etag(client, app, restaurant, superadmin_user):
+    etag = client.get(f"/{SLUG}/").headers["ETag"]
+    client.post("/superadmin/login", data={"email": "super@test.com", "password": "superpass"})
+    client.post(f"/superadmin/restaurant/{restaurant.id}/edit", data={
+        "name": "Renamed Restaurant", "slug": SLUG,
+    })
+    resp = client.get(f"/{SLUG}/", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert b"Renamed Restaurant" in resp.data
+    with app.app_context():
+        assert db.session.get(Restaurant, restaurant.id).menu_version == 2
+
+
+def test_picks_change_etag(client, app, restaurant):
+    with app.app_context():
+        cat_id, item_id = _seed(db.session, restaurant)
+    etag = client.get(f"/{SLUG}/category/{cat_id}").headers["ETag"]
+    client.post(f"/{SLUG}/picks/add/{item_id}")
+    resp = client.get(f"/{SLUG}/category/{cat_id}", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert "Last-Modified" not in resp.headers
+
+
+def test_cache_control_per_endpoint(client, app, restaurant):
+    app.config["CACHE_CONTROL"] = {"public.landing": "public, max-age=300"}
+    assert client.get(f"/{SLUG}/").headers["Cache-Control"] == "public, max-age=300"
+    assert client.get(f"/{SLUG}/menu/dining").headers["Cache-Control"] == "private, no-cache"
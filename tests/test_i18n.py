@@ -0,0 +1,179 @@
+import pytest
+
+from menuvi.i18n import LocaleError, parse_locales, save_translations
+from menuvi.menu_cache import bump_menu_version, get_menu
+from menuvi.models import Category, MenuItem, Translation, db
+from menuvi.static_pages import render_all
+
+SLUG = "test-restaurant"
+
+
+@pytest.fixture()
+def menu(restaurant):
+    """An English/French/Japanese restaurant with part of its menu in French."""
+    restaurant.locales = "en,fr,ja"
+    mains = Category(restaurant_id=restaurant.id, name="Mains", menu_type="dining", sort_order=0)
+    db.session.add(mains)
+    db.session.flush()
+    chicken = MenuItem(category_id=mains.id, name="Butter Chicken",
+                       description="Creamy tomato sauce", sort_order=0)
+    dal = MenuItem(category_id=mains.id, name="Dal Curry", sort_order=1)
+    db.session.add_all([chicken, dal])
+    db.session.flush()
+    save_translations(restaurant.id, "fr", {
+        f"t-restaurant-{restaurant.id}-tagline": "Slogan de test",
+        f"t-category-{mains.id}-name": "Plats",
+        f"t-item-{chicken.id}-name": "Poulet au beurre",
+    }, [("restaurant", restaurant.id), ("category", mains.id), ("item", chicken.id)])
+    db.session.commit()
+    return mains, chicken, dal
+
+
+def test_parse_locales():
+    assert parse_locales(" en, FR ,pt_BR,fr") == "en,fr,pt-br"
+    with pytest.raises(LocaleError, match="not a language code"):
+        parse_locales("en,french")
+    with pytest.raises(LocaleError, match="At least one"):
+        parse_locales(" , ")
+
+
+def test_snapshot_falls_back_to_default(menu, restaurant):
+    mains, chicken, dal = menu
+    fr = get_menu(restaurant, "fr")
+    assert (fr.name, fr.tagline) == ("Test Restaurant", "Slogan de test")
+    assert fr.categories_by_id[mains.id].name == "Plats"
+    item = fr.items_by_id[chicken.id]
+    assert (item.name, item.description) == ("Poulet au beurre", "Creamy tomato sauce")
+    assert fr.items_by_id[dal.id].name == "Dal Curry"
+
+    # The default language, and languages not offered, share one snapshot
+    assert get_menu(restaurant, "en") is get_menu(restaurant, "de") is get_menu(restaurant)
+    assert get_menu(restaurant).items_by_id[chicken.id].name == "Butter Chicken"
+
+
+def test_negotiation(client, menu):
+    page = f"/{SLUG}/category/{menu[0].id}"
+    assert b"Butter Chicken" in client.get(page).data
+    resp = client.get(page, headers={"Accept-Language": "de;q=1, fr;q=0.8"})
+    assert b"Poulet au beurre" in resp.data and b'<html lang="fr">' in resp.data
+    assert {"Accept-Language", "Cookie"} <= set(resp.vary)
+
+    # ?lang= beats Accept-Language and is remembered in a cookie
+    resp = client.get(f"{page}?lang=ja", headers={"Accept-Language": "fr"})
+    assert b'<html lang="ja">' in resp.data and b"Butter Chicken" in resp.data
+    assert "lang=ja" in resp.headers["Set-Cookie"]
+    resp = client.get(page, headers={"Accept-Language": "fr"})
+    assert b'<html lang="ja">' in resp.data and "Set-Cookie" not in resp.headers
+
+
+def test_landing_switcher_and_etag(client, menu):
+    resp = client.get(f"/{SLUG}/?lang=fr")
+    html = resp.get_data(as_text=True)
+    assert "Slogan de test" in html
+    assert f'href="/{SLUG}/?lang=ja"' in html and "日本語" in html
+    assert resp.headers["ETag"].endswith('-fr"')
+
+    # Each language validates separately
+    etag = resp.headers["ETag"]
+    assert client.get(f"/{SLUG}/", headers={"If-None-Match": etag}).status_code == 304
+    resp = client.get(f"/{SLUG}/?lang=en", headers={"If-None-Match": etag})
+    assert resp.status_code == 200 and b"Test Tagline" in resp.data
+
+
+def test_monolingual_pages_unchanged(client, restaurant):
+    resp = client.get(f"/{SLUG}/")
+    assert "Accept-Language" not in resp.vary and "lang-switch" not in resp.get_data(as_text=True)
+    assert b'<html lang="en">' in resp.data
+
+
+def test_locale_page_costs_no_more(client, menu, query_budget):
+    page = f"/{SLUG}/category/{menu[0].id}"
+    client.get(page)
+    client.get(page, headers={"Accept-Language": "fr"})
+    # Warm snapshots: neither language touches the database
+    with query_budget(0):
+        assert b"Mains" in client.get(page).data
+    with query_budget(0):
+        assert b"Plats" in client.get(page, headers={"Accept-Language": "fr"}).data
+
+
+def test_menu_payload_per_locale(client, menu, restaurant):
+    version = restaurant.menu_version
+    data = client.get(f"/{SLUG}/api/menu.json?v={version}&lang=fr").get_json()
+    assert data["restaurant"]["tagline"] == "Slogan de test"
+    assert data["categories"][0]["name"] == "Plats"
+    html = client.get(f"/{SLUG}/menu/dining?lang=fr").get_data(as_text=True)
+    assert f"/api/menu.json?v={version}&amp;lang=fr" in html
+    # Without a language the payload depends on the request, so it is not immutable
+    resp = client.get(f"/{SLUG}/api/menu.json?v={version}")
+    assert "immutable" not in resp.headers["Cache-Control"]
+
+
+def test_search_in_translation(client, menu, restaurant, query_budget):
+    _, chicken, _ = menu
+    form = {f"t-item-{chicken.id}-description": "Sauce tomate crémeuse"}
+    save_translations(restaurant.id, "fr", form, [("item", chicken.id)])
+    bump_menu_version(restaurant.id)
+    db.session.commit()
+
+    html = client.get(f"/{SLUG}/search?q=poulet&lang=fr").get_data(as_text=True)
+    assert "Poulet au beurre" in html and "Creamy" not in html
+    # Accents are optional, and the snippet is the translated description
+    html = client.get(f"/{SLUG}/search?q=cremeuse").get_data(as_text=True)
+    assert "<mark>crémeuse</mark>" in html and "Creamy" not in html
+    # Untranslated text shows, and is searched, as it does on the page
+    assert "Dal Curry" in client.get(f"/{SLUG}/search?q=curry").get_data(as_text=True)
+    with query_budget(0):
+        assert b"No items found" in client.get(f"/{SLUG}/search?q=butter").data
+    # The default language still goes through the index
+    assert b"Butter Chicken" in client.get(f"/{SLUG}/search?q=butter&lang=en").data
+
+
+def test_deleted_rows_drop_translations(menu):
+    _, chicken, _ = menu
+    db.session.delete(chicken)
+    db.session.commit()
+    assert Translation.query.filter_by(kind="item").count() == 0
+    assert Translation.query.filter_by(kind="category").count() == 1
+
+
+def test_admin_translations(client, menu, restaurant, admin_user):
+    mains, chicken, dal = menu
+    client.post(f"/{SLUG}/admin/login", data={"email": "admin@test.com", "password": "testpass"})
+    resp = client.get(f"/{SLUG}/admin/translations")
+    assert resp.headers["Location"].endswith(f"/{SLUG}/admin/translations/fr")
+    html = client.get(f"/{SLUG}/admin/translations/fr").get_data(as_text=True)
+    assert 'value="Poulet au beurre"' in html and "Creamy tomato sauce" in html
+    assert client.get(f"/{SLUG}/admin/translations/en").status_code == 404
+
+    version = restaurant.menu_version
+    client.post(f"/{SLUG}/admin/translations/fr", data={
+        f"t-item-{chicken.id}-name": "",  # back to English
+        f"t-item-{dal.id}-name": "Curry de lentilles",
+    })
+    db.session.refresh(restaurant)
+    assert restaurant.menu_version > version
+    fr = get_menu(restaurant, "fr")
+    assert fr.items_by_id[chicken.id].name == "Butter Chicken"
+    assert fr.items_by_id[dal.id].name == "Curry de lentilles"
+    assert fr.categories_by_id[mains.id].name == "Plats"  # not in the form: untouched
+
+
+def test_superadmin_languages(client, restaurant, superadmin_user):
+    client.post("/superadmin/login", data={"email": "super@test.com", "password": "superpass"})
+    form = {"name": "Test Restaurant", "slug": SLUG}
+    resp = client.post(f"/superadmin/restaurant/{restaurant.id}/edit",
+                       data={**form, "locales": "en, klingon"})
+    assert b"not a language code" in resp.data
+    client.post(f"/superadmin/restaurant/{restaurant.id}/edit", data={**form, "locales": "EN, es"})
+    db.session.refresh(restaurant)
+    assert restaurant.locales == "en,es"
+    assert b'hreflang="es"' in client.get(f"/{SLUG}/").data
+
+
+def test_multilingual_pages_not_baked(app, tmp_path, menu):
+    app.config["STATIC_PAGES_FOLDER"] = str(tmp_path)
+    render_all(app)
+    assert (tmp_path / "index.html").exists()
+    assert not (tmp_path / SLUG / "index.html").exists()
+    assert not (tmp_path / SLUG / "category" / f"{menu[0].id}.html").exists()
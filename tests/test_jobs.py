@@ -0,0 +1,237 @@
+import threading
+import time
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import text
+
+from menuvi import create_app
+from menuvi.jobs import Worker, claim, enqueue, finish, retry_failed, task
+from menuvi.models import Category, Job, MenuItem, PickSet, ReadySignal, Restaurant, User, db, utcnow
+
+from .conftest import TestConfig
+
+SLUG = "test-restaurant"
+calls = []
+release = threading.Event()
+
+
+@task("tests.record")
+def record(value):
+    calls.append(value)
+
+
+@task("tests.fail", max_attempts=2)
+def fail():
+    raise ValueError("boom")
+
+
+@task("tests.touch")
+def touch(path):
+    with open(path, "w") as fh:
+        fh.write("done")
+
+
+@task("tests.wait")
+def wait_for_release():
+    calls.append("started")
+    release.wait(5)
+
+
+@pytest.fixture()
+def queue(app):
+    app.config["JOBS_INLINE"] = False
+    calls.clear()
+    release.clear()
+    return app
+
+
+def test_enqueue_dedupes_queued_keys(queue):
+    assert enqueue(record, key="k", value=1)
+    assert not enqueue(record, key="k", value=2)
+    assert enqueue(record, value=3) and enqueue(record, value=4)
+    assert Job.query.count() == 3
+    assert not calls
+
+    # Once a worker has it, the same key can be queued again
+    job = claim(lease=600)
+    assert (job.name, job.args, job.attempts) == ("tests.record", '{"value":1}', 1)
+    assert enqueue(record, key="k", value=5)
+
+
+def test_inline(app):
+    enqueue(record, key="k", value=1)
+    enqueue(fail)  # logged, not raised
+    assert calls[-1:] == [1]
+    assert Job.query.count() == 0
+
+
+def test_worker_runs_jobs(queue):
+    for value in range(5):
+        enqueue(record, value=value)
+    assert Worker(queue, concurrency=2, mode="thread").run(once=True) == 5
+    assert sorted(calls) == [0, 1, 2, 3, 4]
+    assert Job.query.count() == 0
+
+
+def test_retries_with_backoff_then_fails(queue):
+    queue.config["JOBS_RETRY_DELAY"] = 10
+    enqueue(fail)
+    worker = Worker(queue, concurrency=1)
+    assert worker.run(once=True) == 1
+
+    job = Job.query.one()
+    assert (job.status, job.attempts) == ("queued", 1)
+    assert "ValueError: boom" in job.last_error
+    delay = (job.run_at - utcnow()).total_seconds()
+    assert 8 < delay <= 10
+    assert worker.run(once=True) == 0  # not due yet
+
+    job.run_at = utcnow()
+    db.session.commit()
+    assert worker.run(once=True) == 1
+    db.session.refresh(job)
+    assert (job.status, job.attempts) == ("failed", 2)
+
+    assert retry_failed() == 1
+    db.session.refresh(job)
+    assert (job.status, job.attempts) == ("queued", 0)
+
+
+def test_failed_retry_yields_to_newer_copy(queue):
+    enqueue(fail, key="k")
+    job = claim(lease=600)
+    enqueue(fail, key="k")
+    finish(job, "Traceback: boom")
+    assert [(j.status, j.attempts) for j in Job.query] == [("queued", 0)]
+
+
+def test_expired_lease_is_reclaimed(queue):
+    enqueue(record, value="again")
+    assert claim(lease=600)
+    assert claim(lease=600) is None
+    Job.query.update({"locked_at": utcnow() - timedelta(seconds=601)})
+    db.session.commit()
+
+    assert Worker(queue, concurrency=1).run(once=True) == 1
+    assert calls == ["again"]
+    assert Job.query.count() == 0
+
+    # A job that keeps outliving its lease is given up on
+    enqueue(fail)
+    claim(lease=600)
+    Job.query.update({"attempts": 2, "locked_at": utcnow() - timedelta(seconds=601)})
+    db.session.commit()
+    Worker(queue, concurrency=1).run(once=True)
+    job = Job.query.one()
+    assert job.status == "failed" and "Lease expired" in job.last_error
+
+
+def test_stop_finishes_running_jobs(queue):
+    enqueue(wait_for_release)
+    worker = Worker(queue, concurrency=1)
+    ran = []
+    thread = threading.Thread(target=lambda: ran.append(worker.run()))
+    thread.start()
+    for _ in range(500):
+        if calls:
+            break
+        time.sleep(0.01)
+    worker.stop()
+    release.set()
+    thread.join(5)
+    assert ran == [1]
+    assert Job.query.count() == 0
+
+
+def test_process_pool(tmp_path):
+    class FileConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'menuvi.db'}"
+        TENANT_STAMP_FILE = str(tmp_path / "tenants.stamp")
+        JOBS_INLINE = False
+
+    app = create_app(FileConfig)
+    with app.app_context():
+        targets = [tmp_path / f"out-{n}.txt" for n in range(3)]
+        for target in targets:
+            enqueue(touch, path=str(target))
+        assert Worker(app, concurrency=2, mode="process").run(once=True) == 3
+        assert all(t.read_text() == "done" for t in targets)
+        assert Job.query.count() == 0
+        db.engine.dispose()
+
+
+# ── queued work ─────────────────────────────────────────────────────────────
+def test_restaurant_purge(client, restaurant, admin_user, superadmin_user):
+    other = Restaurant(name="Other", slug="other")
+    db.session.add(other)
+    db.session.flush()
+    for r in (restaurant, other):
+        cat = Category(restaurant_id=r.id, name="Mains", menu_type="dining")
+        db.session.add(cat)
+        db.session.flush()
+        db.session.add_all(MenuItem(category_id=cat.id, name=f"Curry {n}") for n in range(5))
+        db.session.add(ReadySignal(restaurant_id=r.id, session_id="s"))
+        db.session.add(PickSet(session_id="s", restaurant_id=r.id, items=b"", expires_at=0))
+    db.session.commit()
+    rid = restaurant.id
+
+    client.application.config["JOBS_INLINE"] = False
+    client.post("/superadmin/login", data={"email": "super@test.com", "password": "superpass"})
+    client.post(f"/superadmin/restaurant/{rid}/delete")
+    assert db.session.get(Restaurant, rid) is None
+    assert db.session.get(User, admin_user.id).restaurant_id is None
+    assert MenuItem.query.count() == 10  # not yet purged
+
+    assert Worker(client.application, concurrency=1).run(once=True) == 1
+    for model in (Category, ReadySignal, PickSet):
+        assert model.query.filter_by(restaurant_id=rid).count() == 0
+        assert model.query.filter_by(restaurant_id=other.id).count() == 1
+    assert MenuItem.query.count() == 5
+    fts = db.session.execute(text("SELECT count(*) FROM menu_items_fts")).scalar()
+    assert fts == 5
+
+
+def test_purge_spares_restaurant_created_meanwhile(client, restaurant, superadmin_user):
+    cat = Category(restaurant_id=restaurant.id, name="OldCat", menu_type="dining")
+    db.session.add(cat)
+    db.session.flush()
+    db.session.add(MenuItem(category_id=cat.id, name="Old Curry"))
+    db.session.commit()
+    old_id = restaurant.id
+
+    client.application.config["JOBS_INLINE"] = False
+    client.post("/superadmin/login", data={"email": "super@test.com", "password": "superpass"})
+    client.post(f"/superadmin/restaurant/{old_id}/delete")
+    client.post("/superadmin/restaurant/new", data={"name": "New Place", "slug": "new-place"})
+    new = Restaurant.query.filter_by(slug="new-place").one()
+    assert new.id != old_id
+    cat = Category(restaurant_id=new.id, name="NewCat", menu_type="dining")
+    db.session.add(cat)
+    db.session.flush()
+    db.session.add(MenuItem(category_id=cat.id, name="New Curry"))
+    db.session.commit()
+    assert b"OldCat" not in client.get("/new-place/menu/dining").data
+
+    assert Worker(client.application, concurrency=1).run(once=True) == 1
+    assert [c.name for c in Category.query.all()] == ["NewCat"]
+    assert [i.name for i in MenuItem.query.all()] == ["New Curry"]
+    assert b"NewCat" in client.get("/new-place/menu/dining").data
+
+
+def test_qr_tables_wait_for_worker(client, restaurant, admin_user, tmp_path):
+    app = client.application
+    app.config.update(JOBS_INLINE=False, UPLOAD_FOLDER=str(tmp_path), QR_POOL_WORKERS=1)
+    client.post(f"/{SLUG}/admin/login", data={"email": "admin@test.com", "password": "testpass"})
+    url = f"/{SLUG}/admin/qr/tables?count=3&format=zip"
+
+    resp = client.get(url)
+    assert resp.status_code == 200
+    assert b"Preparing QR Codes" in resp.data and b'http-equiv="refresh"' in resp.data
+    client.get(url)
+    assert Job.query.one().key == f"qr:{SLUG}:3"
+
+    Worker(app, concurrency=1).run(once=True)
+    resp = client.get(url)
+    assert resp.mimetype == "application/zip"
+    assert Job.query.count() == 0
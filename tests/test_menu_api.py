@@ -0,0 +1,103 @@
+import json
+
+from menuvi.menu_api import ITEM_FIELDS, MAX_PICK_OPS
+from menuvi.menu_cache import bump_menu_version
+from menuvi.models import Category, MenuItem, db
+
+SLUG = "test-restaurant"
+API = f"/{SLUG}/api/picks"
+
+
+def _seed(restaurant):
+    drinks = Category(restaurant_id=restaurant.id, name="Drinks", menu_type="beverages", sort_order=1)
+    mains = Category(restaurant_id=restaurant.id, name="Mains", menu_type="dining", sort_order=0)
+    db.session.add_all([drinks, mains])
+    db.session.flush()
+    items = [
+        MenuItem(category_id=mains.id, name="Curry", description="Hot", price_cents=1890, sort_order=0),
+        MenuItem(category_id=mains.id, name="Gone", sort_order=1, available=False),
+        MenuItem(category_id=drinks.id, name="Lassi", sort_order=0),
+    ]
+    db.session.add_all(items)
+    db.session.commit()
+    return [i.id for i in items]
+
+
+def test_menu_payload(client, restaurant):
+    curry, gone, lassi = _seed(restaurant)
+    resp = client.get(f"/{SLUG}/api/menu.json")
+    assert resp.status_code == 200
+    data = resp.get_json()
+    assert data["version"] == restaurant.menu_version
+    assert data["restaurant"]["name"] == "Test Restaurant"
+    assert data["item_fields"] == list(ITEM_FIELDS)
+    assert [(c["name"], c["type"]) for c in data["categories"]] == [
+        ("Mains", "dining"), ("Drinks", "beverages"),
+    ]
+    assert data["categories"][0]["items"] == [[curry, "Curry", "Hot", "$18.90", None, 0]]
+    assert data["categories"][1]["items"] == [[lassi, "Lassi", "", "", None, 0]]
+    assert data["photos"]["url"] == "/media/photos/"
+    # Compact encoding
+    assert b", " not in resp.data and b": " not in resp.data
+
+
+def test_menu_payload_caching(client, restaurant, query_budget):
+    _seed(restaurant)
+    version = restaurant.menu_version
+    unversioned = client.get(f"/{SLUG}/api/menu.json")
+    assert "immutable" not in unversioned.headers["Cache-Control"]
+    etag = unversioned.headers["ETag"]
+    resp = client.get(f"/{SLUG}/api/menu.json", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+
+    versioned = client.get(f"/{SLUG}/api/menu.json?v={version}")
+    assert versioned.headers["Cache-Control"] == "public, max-age=31536000, immutable"
+    assert versioned.data == unversioned.data
+    # Warm snapshot: the payload is served without touching the database
+    with query_budget(0):
+        client.get(f"/{SLUG}/api/menu.json?v={version}")
+
+    bump_menu_version(restaurant.id)
+    db.session.commit()
+    stale = client.get(f"/{SLUG}/api/menu.json?v={version}")
+    assert "immutable" not in stale.headers["Cache-Control"]
+    assert stale.get_json()["version"] == version + 1
+
+
+def test_pages_link_versioned_menu(client, restaurant):
+    html = client.get(f"/{SLUG}/menu/dining").get_data(as_text=True)
+    assert f'data-menu-api="/{SLUG}/api/menu.json?v={restaurant.menu_version}"' in html
+    assert f'data-picks-api="{API}"' in html
+    assert 'data-picks="[]" data-picks-at="0"' in html
+
+
+def test_batched_picks_sync(client, restaurant):
+    curry, gone, lassi = _seed(restaurant)
+    resp = client.post(API, json={})
+    assert resp.get_json() == {"ok": True, "items": [], "count": 0, "at": 0}
+    with client.session_transaction() as sess:
+        assert "sid" not in sess
+
+    resp = client.post(API, json={"add": [curry, lassi, 999999]})
+    data = resp.get_json()
+    assert data["items"] == sorted([curry, lassi]) and data["count"] == 2
+    assert data["at"] > 0
+
+    data = client.post(API, json={"add": [gone], "remove": [lassi]}).get_json()
+    assert data["items"] == sorted([curry, gone])
+
+    # Server-rendered pages see the same set and change time
+    html = client.get(f"/{SLUG}/category/{Category.query.filter_by(name='Mains').one().id}").get_data(as_text=True)
+    assert f'data-picks="{json.dumps(sorted([curry, gone]))}" data-picks-at="{data["at"]}"' in html
+    assert b"Curry" in client.get(f"/{SLUG}/picks").data
+
+
+def test_batched_picks_sync_rejects_bad_input(client, restaurant):
+    _seed(restaurant)
+    assert client.post(API, data="add=1").status_code == 400
+    assert client.post(API, json=[1, 2]).status_code == 400
+    assert client.post(API, json={"add": "1"}).status_code == 400
+    assert client.post(API, json={"add": [True]}).status_code == 400
+    resp = client.post(API, json={"add": list(range(MAX_PICK_OPS + 1))})
+    assert resp.status_code == 400
+    assert resp.get_json()["ok"] is False
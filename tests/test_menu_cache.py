@@ -0,0 +1,112 @@
+from menuvi.menu_cache import MenuCache, get_cache, get_menu
+from menuvi.models import Category, MenuItem, Restaurant, db
+from menuvi.tenants import mark_changed
+
+SLUG = "test-restaurant"
+
+
+def _seed(db_session, restaurant):
+    cat = Category(
+        restaurant_id=restaurant.id, name="Mains", menu_type="dining", sort_order=0,
+    )
+    db_session.add(cat)
+    db_session.flush()
+    item = MenuItem(
+        category_id=cat.id, name="Butter Chicken",
+        description="Creamy", price_cents=2290, sort_order=0,
+    )
+    db_session.add(item)
+    db_session.commit()
+    return cat, item
+
+
+def _login(client):
+    return client.post(
+        f"/{SLUG}/admin/login",
+        data={"email": "admin@test.com", "password": "testpass"},
+    )
+
+
+def test_public_pages_reuse_snapshot(client, app, restaurant):
+    with app.app_context():
+        cat, _ = _seed(db.session, restaurant)
+        cat_id = cat.id
+
+    client.get(f"/{SLUG}/menu/dining")
+    client.get(f"/{SLUG}/category/{cat_id}")
+    cache = app.extensions["menu_cache"]
+    assert cache.misses == 1
+    assert cache.hits == 1
+
+
+def test_admin_edit_invalidates_snapshot(client, app, restaurant, admin_user):
+    with app.app_context():
+        cat, item = _seed(db.session, restaurant)
+        cat_id, item_id = cat.id, item.id
+
+    resp = client.get(f"/{SLUG}/category/{cat_id}")
+    assert b"Butter Chicken" in resp.data
+
+    _login(client)
+    client.post(f"/{SLUG}/admin/item/{item_id}/toggle")
+
+    resp = client.get(f"/{SLUG}/category/{cat_id}")
+    assert b"Butter Chicken" not in resp.data
+    with app.app_context():
+        assert db.session.get(Restaurant, restaurant.id).menu_version == 2
+
+
+def test_snapshot_scoped_to_restaurant(client, app, restaurant):
+    with app.app_context():
+        other = Restaurant(name="Other", slug="other")
+        db.session.add(other)
+        db.session.commit()
+        cat, item = _seed(db.session, restaurant)
+        cat_id, item_id = cat.id, item.id
+
+    assert client.get(f"/other/category/{cat_id}").status_code == 404
+    assert client.get(f"/other/item/{item_id}").status_code == 404
+
+
+def test_lru_evicts_within_byte_cap(app, restaurant):
+    with app.app_context():
+        _seed(db.session, restaurant)
+        snapshot = get_menu(db.session.get(Restaurant, restaurant.id))
+
+    cache = MenuCache(max_bytes=snapshot.size * 2)
+    for restaurant_id in (101, 102, 103):
+        snapshot.restaurant_id = restaurant_id
+        cache.put(snapshot)
+    assert len(cache) == 2
+    assert cache.get(101, snapshot.version) is None
+    assert cache.get(103, snapshot.version) is not None
+    assert cache.current_bytes <= cache.max_bytes
+
+
+def test_new_version_replaces_old(app, restaurant):
+    with app.app_context():
+        _seed(db.session, restaurant)
+        r = db.session.get(Restaurant, restaurant.id)
+        get_menu(r)
+        r.menu_version += 1
+        db.session.commit()
+        get_menu(r)
+        cache = get_cache()
+        assert len(cache) == 1
+        assert cache.get(r.id, 1) is None
+
+
+def test_reused_slug_gets_its_own_snapshot(client, app, restaurant):
+    with app.app_context():
+        _seed(db.session, restaurant)
+    assert b"Mains" in client.get(f"/{SLUG}/menu/dining").data
+
+    # Same slug and menu_version, different restaurant
+    with app.app_context():
+        old = db.session.get(Restaurant, restaurant.id)
+        old.slug = "renamed"
+        db.session.add(Restaurant(name="Newcomer", slug=SLUG))
+        mark_changed()
+        db.session.commit()
+    html = client.get(f"/{SLUG}/menu/dining").get_data(as_text=True)
+    assert "Newcomer" in html and "Mains" not in html
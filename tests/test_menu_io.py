@@ -0,0 +1,189 @@
+import csv
+import io
+import json
+
+import pytest
+
+from menuvi import menu_io
+from menuvi.menu_io import MenuImportError, import_menu, iter_export, read_csv, read_json
+from menuvi.models import Category, MenuItem
+from menuvi.search import search_items
+from menuvi.menu_cache import get_menu
+from menuvi.tenants import load_restaurant
+
+SLUG = "test-restaurant"
+
+CSV = """category,menu_type,name,description,price,available
+Curries,dining,Butter Chicken,Creamy tomato curry,22.90,1
+Curries,dining,Lamb Rogan Josh,Slow cooked lamb,$24.50,
+Red Wine,beverages,Shiraz,Barossa Valley,12,0
+"""
+
+
+def _login(client):
+    client.post(
+        f"/{SLUG}/admin/login",
+        data={"email": "admin@test.com", "password": "testpass"},
+    )
+
+
+def test_import_csv(app, db, restaurant):
+    result = import_menu(restaurant.id, read_csv(io.StringIO(CSV)))
+    db.session.commit()
+    assert (result.created, result.updated, result.categories) == (3, 0, 2)
+
+    wine = Category.query.filter_by(name="Red Wine").one()
+    assert wine.menu_type == "beverages"
+    shiraz = MenuItem.query.filter_by(name="Shiraz").one()
+    assert shiraz.price_cents == 1200
+    assert shiraz.available is False
+    lamb = MenuItem.query.filter_by(name="Lamb Rogan Josh").one()
+    assert (lamb.price_cents, lamb.sort_order, lamb.available) == (2450, 1, True)
+
+
+def test_import_updates_existing_items(app, db, restaurant):
+    import_menu(restaurant.id, read_csv(io.StringIO(CSV)))
+    db.session.commit()
+    rows = [{"category": "Curries", "name": "Butter Chicken", "price": 25},
+            {"category": "Curries", "name": "Dal Makhani", "price": "18.00"}]
+    result = import_menu(restaurant.id, read_json(io.StringIO(json.dumps(rows))))
+    db.session.commit()
+    assert (result.created, result.updated, result.categories) == (1, 1, 0)
+    assert MenuItem.query.filter_by(name="Butter Chicken").one().price_cents == 2500
+    assert MenuItem.query.filter_by(name="Dal Makhani").one().sort_order == 2
+
+
+def test_import_replace(app, db, restaurant):
+    import_menu(restaurant.id, read_csv(io.StringIO(CSV)))
+    db.session.commit()
+    rows = [{"category": "Specials", "name": "Thali"}]
+    import_menu(restaurant.id, read_json(io.StringIO(json.dumps(rows))), replace=True)
+    db.session.commit()
+    assert [c.name for c in Category.query.all()] == ["Specials"]
+    assert [i.name for i in MenuItem.query.all()] == ["Thali"]
+
+
+def test_import_refreshes_search_and_cache(app, db, restaurant):
+    with app.test_request_context():
+        tenant = load_restaurant(SLUG)
+        assert get_menu(tenant).items_by_id == {}
+        import_menu(restaurant.id, read_csv(io.StringIO(CSV)))
+        db.session.commit()
+        tenant = load_restaurant(SLUG)
+        menu = get_menu(tenant)
+        assert len(menu.items_by_id) == 3
+        results = search_items(tenant, menu, "slow lamb")
+        assert [r.item.name for r in results] == ["Lamb Rogan Josh"]
+
+
+@pytest.mark.parametrize("row, message", [
+    ("Curries,dining,,desc,1,1", "name is required"),
+    ("Curries,lunch,Naan,,1,1", "menu_type"),
+    ("Curries,dining,Naan,,cheap,1", "invalid price"),
+    ("Curries,dining,Naan,,1,maybe", "invalid available"),
+])
+def test_import_rejects_bad_rows(app, db, restaurant, row, message):
+    data = CSV + row + "\n"
+    with pytest.raises(MenuImportError, match=message) as exc:
+        import_menu(restaurant.id, read_csv(io.StringIO(data)))
+    assert exc.value.line == 5
+
+
+class _Reads(io.StringIO):
+    """Records how much of the stream has been consumed."""
+
+    def read(self, size=-1):
+        assert size > 0, "the whole upload was requested"
+        return super().read(size)
+
+
+def test_read_json_streams(monkeypatch):
+    monkeypatch.setattr(menu_io, "JSON_CHUNK", 7)
+    rows = [{"category": "Curries", "name": f"Dish {n}", "price": 12345.5 + n} for n in range(50)]
+    stream = _Reads(json.dumps(rows, indent=1))
+    reader = read_json(stream)
+    assert next(reader) == (1, rows[0])
+    assert stream.tell() < 200  # only the first item has been read
+    assert list(reader) == list(enumerate(rows[1:], start=2))
+    assert list(read_json(io.StringIO(" [ ] "))) == []
+
+
+@pytest.mark.parametrize("data, line, message", [
+    ('{"name": "Naan"}', 1, "expected a JSON array"),
+    ('[{"name": "Naan"}, 3]', 2, "expected an object"),
+    ('[{"name": "Naan"}, {"name": }]', 2, "invalid JSON"),
+    ('[{"name": "Naan"} {"name": "Roti"}]', 1, "expected ','"),
+    ('[{"name": "Naan"}', 1, "expected ','"),
+    ('[{"name": "Naan"}] []', 1, "extra data"),
+])
+def test_read_json_errors(monkeypatch, data, line, message):
+    monkeypatch.setattr(menu_io, "JSON_CHUNK", 4)
+    with pytest.raises(MenuImportError, match=message) as exc:
+        list(read_json(io.StringIO(data)))
+    assert exc.value.line == line
+
+
+def test_read_json_item_size_capped(monkeypatch):
+    monkeypatch.setattr(menu_io, "JSON_CHUNK", 16)
+    monkeypatch.setattr(menu_io, "JSON_ITEM_MAX", 64)
+    data = '[{"name": "' + "x" * 1000 + '"}]'
+    with pytest.raises(MenuImportError, match="too large"):
+        list(read_json(io.StringIO(data)))
+
+
+def test_export_round_trip(app, db, restaurant):
+    import_menu(restaurant.id, read_csv(io.StringIO(CSV)))
+    db.session.commit()
+    exported = "".join(iter_export(restaurant.id, "csv"))
+    rows = list(csv.DictReader(io.StringIO(exported)))
+    assert [r["name"] for r in rows] == ["Butter Chicken", "Lamb Rogan Josh", "Shiraz"]
+    assert rows[1]["price"] == "24.50"
+    assert rows[2]["available"] == "0"
+
+    data = json.loads("".join(iter_export(restaurant.id, "json")))
+    assert data[0] == {
+        "category": "Curries", "menu_type": "dining", "name": "Butter Chicken",
+        "description": "Creamy tomato curry", "price": "22.90", "available": True,
+    }
+    result = import_menu(restaurant.id, read_json(io.StringIO(json.dumps(data))))
+    assert (result.created, result.updated) == (0, 3)
+
+
+def test_admin_import_and_export(client, app, db, restaurant, admin_user):
+    _login(client)
+    resp = client.post(
+        f"/{SLUG}/admin/menu/import",
+        data={"file": (io.BytesIO(CSV.encode()), "menu.csv")},
+        content_type="multipart/form-data",
+        follow_redirects=True,
+    )
+    assert b"Imported 3 new" in resp.data
+    assert MenuItem.query.count() == 3
+
+    resp = client.get(f"/{SLUG}/admin/menu/export?format=json")
+    assert resp.status_code == 200
+    assert "attachment" in resp.headers["Content-Disposition"]
+    assert len(json.loads(resp.data)) == 3
+
+
+def test_admin_import_error_rolls_back(client, app, db, restaurant, admin_user):
+    _login(client)
+    data = CSV + "Curries,dining,,,1,1\n"
+    resp = client.post(
+        f"/{SLUG}/admin/menu/import",
+        data={"file": (io.BytesIO(data.encode()), "menu.csv")},
+        content_type="multipart/form-data",
+        follow_redirects=True,
+    )
+    assert b"Row 5: name is required" in resp.data
+    assert MenuItem.query.count() == 0
+
+
+def test_seed_command(app, db):
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=["seed"])
+    assert result.exit_code == 0, result.output
+    count = MenuItem.query.count()
+    assert count > 0
+    assert runner.invoke(args=["seed"]).exit_code == 0
+    assert MenuItem.query.count() == count
@@ -0,0 +1,165 @@
+import re
+
+import pytest
+from sqlalchemy import event, inspect, text
+
+from menuvi import create_app
+from menuvi.migrations import current_version, head, upgrade
+from menuvi.models import db, Category, MenuItem, Restaurant
+
+from .conftest import TestConfig
+
+SLUG = "test-restaurant"
+
+# Schema as created by db.create_all() before migration 1
+LEGACY_SCHEMA = [
+    """CREATE TABLE restaurants (
+        id INTEGER NOT NULL PRIMARY KEY, name VARCHAR(200) NOT NULL,
+        slug VARCHAR(100) NOT NULL UNIQUE, tagline VARCHAR(300),
+        brand_color VARCHAR(20), brand_color_dim VARCHAR(20))""",
+    """CREATE TABLE users (
+        id INTEGER NOT NULL PRIMARY KEY, email VARCHAR(254) NOT NULL UNIQUE,
+        password_hash VARCHAR(256) NOT NULL, role VARCHAR(20),
+        restaurant_id INTEGER REFERENCES restaurants (id))""",
+    """CREATE TABLE categories (
+        id INTEGER NOT NULL PRIMARY KEY,
+        restaurant_id INTEGER NOT NULL REFERENCES restaurants (id),
+        name VARCHAR(120) NOT NULL, menu_type VARCHAR(20), sort_order INTEGER,
+        CONSTRAINT uq_category_restaurant_name UNIQUE (restaurant_id, name))""",
+    """CREATE TABLE menu_items (
+        id INTEGER NOT NULL PRIMARY KEY,
+        category_id INTEGER NOT NULL REFERENCES categories (id),
+        name VARCHAR(200) NOT NULL, description TEXT, price_cents INTEGER,
+        available BOOLEAN, sort_order INTEGER)""",
+    "INSERT INTO restaurants (id, name, slug) VALUES (1, 'Test Restaurant', 'test-restaurant')",
+    "INSERT INTO categories (id, restaurant_id, name, menu_type, sort_order) VALUES (1, 1, 'Mains', 'dining', 0)",
+    "INSERT INTO menu_items (id, category_id, name, available, sort_order) VALUES (1, 1, 'Dal', 1, 0)",
+]
+
+
+def _file_config(path):
+    class FileConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path / 'menuvi.db'}"
+        TENANT_STAMP_FILE = str(path / "tenants.stamp")
+    return FileConfig
+
+
+@pytest.fixture()
+def legacy_app(tmp_path):
+    import sqlite3
+
+    conn = sqlite3.connect(tmp_path / "menuvi.db")
+    for statement in LEGACY_SCHEMA:
+        conn.execute(statement)
+    conn.commit()
+    conn.close()
+    app = create_app(_file_config(tmp_path))
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+def _indexes(conn):
+    inspector = inspect(conn)
+    return {
+        table: sorted((ix["name"], tuple(ix["column_names"])) for ix in inspector.get_indexes(table))
+        for table in ("restaurants", "users", "categories", "menu_items")
+    }
+
+
+def test_new_database_is_stamped_at_head(app):
+    with db.engine.connect() as conn:
+        assert current_version(conn) == head()
+
+
+def test_upgrade_legacy_database(legacy_app):
+    with legacy_app.app_context(), db.engine.connect() as conn:
+        assert current_version(conn) == 0
+
+    result = legacy_app.test_cli_runner().invoke(args=["db-upgrade"])
+    assert result.exit_code == 0, result.output
+    assert f"Database schema is at version {head()}" in result.output
+
+    with legacy_app.app_context():
+        restaurant = Restaurant.query.one()
+        assert restaurant.menu_version == 1
+        assert restaurant.updated_at is not None
+        with db.engine.connect() as conn:
+            assert current_version(conn) == head()
+            assert upgrade(db.engine) == []
+    assert legacy_app.test_client().get(f"/{SLUG}/menu/dining").status_code == 200
+
+
+def test_upgrade_to_target(legacy_app):
+    with legacy_app.app_context():
+        assert [m.version for m in upgrade(db.engine, target=1)] == [1]
+        with db.engine.connect() as conn:
+            assert current_version(conn) == 1
+
+
+def test_migrated_indexes_match_models(legacy_app, tmp_path_factory):
+    with legacy_app.app_context():
+        upgrade(db.engine)
+        with db.engine.connect() as conn:
+            migrated = _indexes(conn)
+    fresh = create_app(_file_config(tmp_path_factory.mktemp("fresh")))
+    with fresh.app_context():
+        with db.engine.connect() as conn:
+            assert _indexes(conn) == migrated
+        db.engine.dispose()
+
+
+# ── query plans ─────────────────────────────────────────────────────────────
+# A bare "SCAN <table>" reads every row; scans in index order, FTS lookups
+# and PRIMARY KEY searches are fine.
+_FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+
+def _seed(n_restaurants=3):
+    for r in range(n_restaurants):
+        restaurant = Restaurant(name=f"R{r}", slug=SLUG if r == 0 else f"r{r}")
+        db.session.add(restaurant)
+        db.session.flush()
+        for c, menu_type in enumerate(("dining", "beverages")):
+            cat = Category(restaurant_id=restaurant.id, name=f"C{c}", menu_type=menu_type)
+            db.session.add(cat)
+            db.session.flush()
+            for i in range(3):
+                db.session.add(MenuItem(category_id=cat.id, name=f"Item {i}", sort_order=i))
+    db.session.commit()
+    db.session.execute(text("ANALYZE"))
+    db.session.commit()
+
+
+def test_public_queries_use_indexes(app, client):
+    _seed()
+    cat_id = Category.query.first().id
+    item_id = MenuItem.query.first().id
+
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    event.listen(db.engine, "before_cursor_execute", capture)
+    try:
+        for path in (
+            "/", f"/{SLUG}/", f"/{SLUG}/menu/dining", f"/{SLUG}/category/{cat_id}",
+            f"/{SLUG}/item/{item_id}", f"/{SLUG}/search?q=item",
+            f"/{SLUG}/search/suggest?q=it", f"/{SLUG}/picks", "/sitemap.xml",
+        ):
+            assert client.get(path).status_code == 200, path
+        client.post(f"/{SLUG}/picks/add/{item_id}")
+    finally:
+        event.remove(db.engine, "before_cursor_execute", capture)
+
+    assert captured
+    raw = db.session.connection().connection.dbapi_connection
+    failures = []
+    for statement, parameters in captured:
+        plan = raw.execute(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+        scans = [row[3] for row in plan if _FULL_SCAN.match(row[3])]
+        if scans:
+            failures.append(f"{', '.join(scans)}: {' '.join(statement.split())}")
+    assert not failures, "\n".join(failures)
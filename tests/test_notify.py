@@ -0,0 +1,203 @@
+import asyncio
+import json
+import resource
+import time
+
+import pytest
+
+from menuvi.models import Category, MenuItem, ReadySignal, Restaurant, db
+from menuvi.notify import NotifyServer, make_token, publish
+
+SLUG = "test-restaurant"
+
+
+@pytest.fixture()
+def notify_config(app, tmp_path):
+    app.config["NOTIFY_SOCKET"] = str(tmp_path / "notify.sock")
+    app.config["NOTIFY_PORT"] = 0
+    app.config["NOTIFY_HEARTBEAT"] = 0
+    return app.config
+
+
+async def _connect(port, path):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: test\r\n\r\n".encode())
+    status = (await reader.readline()).split(b" ")[1]
+    return int(status), reader, writer
+
+
+async def _subscribe(port, restaurant, slug=SLUG):
+    status, reader, writer = await _connect(port, f"/{slug}/admin/events?token={make_token(restaurant)}")
+    assert status == 200
+    await reader.readuntil(b"retry: 5000\n\n")
+    return reader, writer
+
+
+async def _next_event(reader):
+    block = await asyncio.wait_for(reader.readuntil(b"\n\n"), 5)
+    fields = dict(line.split(": ", 1) for line in block.decode().strip().split("\n"))
+    return fields["event"], json.loads(fields["data"])
+
+
+async def _settle(server, count):
+    for _ in range(500):
+        if len(server.hub) == count:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"{len(server.hub)} subscribers, expected {count}")
+
+
+def test_events_reach_own_restaurant_only(notify_config, restaurant):
+    other = Restaurant(name="Other", slug="other")
+    db.session.add(other)
+    db.session.commit()
+
+    async def main():
+        server = NotifyServer.from_config(notify_config)
+        await server.start()
+        try:
+            mine, _mine = await _subscribe(server.port, restaurant)
+            theirs, _theirs = await _subscribe(server.port, other, slug="other")
+            await _settle(server, 2)
+            assert publish(restaurant.id, "ready", {"id": 7, "table": "4"}, event_id=7)
+            assert await _next_event(mine) == ("ready", {"id": 7, "table": "4"})
+            assert publish(other.id, "ack", {"id": 8})
+            assert await _next_event(theirs) == ("ack", {"id": 8})
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(mine.readuntil(b"\n\n"), 0.2)
+        finally:
+            await server.close()
+
+    asyncio.run(main())
+    # Server gone: publishing is dropped, not raised
+    assert publish(restaurant.id, "ready", {}) is False
+
+
+def test_refuses_bad_requests(notify_config, restaurant):
+    other = Restaurant(name="Other", slug="other")
+    db.session.add(other)
+    db.session.commit()
+
+    async def main():
+        server = NotifyServer.from_config(notify_config)
+        await server.start()
+        try:
+            token = make_token(restaurant)
+            cases = [
+                (f"/{SLUG}/admin/events?token=forged", 403),
+                (f"/{SLUG}/admin/events", 403),
+                (f"/other/admin/events?token={token}", 403),
+                (f"/{SLUG}/admin/", 404),
+            ]
+            for path, expected in cases:
+                status, _, writer = await _connect(server.port, path)
+                assert status == expected, path
+                writer.close()
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            writer.write(f"POST /{SLUG}/admin/events?token={token} HTTP/1.1\r\n\r\n".encode())
+            assert b" 405 " in await reader.readline()
+            assert len(server.hub) == 0
+        finally:
+            await server.close()
+
+    asyncio.run(main())
+
+
+async def _fan_out(config, restaurant, connections):
+    server = NotifyServer.from_config(config)
+    await server.start()
+    try:
+        clients = []
+        for start in range(0, connections, 250):
+            clients += await asyncio.gather(*(
+                _subscribe(server.port, restaurant)
+                for _ in range(min(250, connections - start))
+            ))
+        await _settle(server, connections)
+
+        # Idle connections cost no CPU
+        cpu = time.process_time()
+        await asyncio.sleep(1)
+        idle_cpu = time.process_time() - cpu
+
+        publish(restaurant.id, "ready", {"id": 1}, event_id=1)
+        events = await asyncio.gather(*(_next_event(reader) for reader, _ in clients))
+        assert events == [("ready", {"id": 1})] * connections
+        return idle_cpu
+    finally:
+        await server.close()
+
+
+def test_idle_connections(notify_config, restaurant):
+    idle_cpu = asyncio.run(_fan_out(notify_config, restaurant, 500))
+    assert idle_cpu < 0.1
+
+
+@pytest.mark.benchmark
+def test_many_idle_connections(notify_config, restaurant):
+    connections = 5000
+    # Client and server side of each connection live in this process
+    if resource.getrlimit(resource.RLIMIT_NOFILE)[0] < 2 * connections + 100:
+        pytest.skip("open file limit too low")
+    idle_cpu = asyncio.run(_fan_out(notify_config, restaurant, connections))
+    assert idle_cpu < 0.1
+
+
+# ── ready to order ──────────────────────────────────────────────────────────
+def _seed(restaurant):
+    mains = Category(restaurant_id=restaurant.id, name="Mains", menu_type="dining", sort_order=0)
+    db.session.add(mains)
+    db.session.flush()
+    curry = MenuItem(category_id=mains.id, name="Curry", sort_order=0)
+    db.session.add(curry)
+    db.session.commit()
+    return curry.id
+
+
+def test_ready_to_order(client, restaurant, admin_user, query_budget):
+    curry = _seed(restaurant)
+    client.post(f"/{SLUG}/api/picks", json={"add": [curry]})
+    # No signal sent from this session: only the picks are read
+    with query_budget(1):
+        html = client.get(f"/{SLUG}/picks").get_data(as_text=True)
+    assert "Ready to Order" in html and "has been notified" not in html
+
+    resp = client.post(f"/{SLUG}/ready", data={"table": " 12 "})
+    assert resp.status_code == 302
+    html = client.get(f"/{SLUG}/picks").get_data(as_text=True)
+    assert "Your waiter has been notified (table 12)" in html
+
+    # Pressing again refreshes the same signal
+    resp = client.post(f"/{SLUG}/ready", data={"table": "14"},
+                       headers={"X-Requested-With": "XMLHttpRequest"})
+    signal_id = resp.get_json()["id"]
+    signal = db.session.get(ReadySignal, signal_id)
+    assert ReadySignal.query.count() == 1
+    assert signal.table_label == "14"
+
+    staff = client.application.test_client()
+    staff.post(f"/{SLUG}/admin/login", data={"email": "admin@test.com", "password": "testpass"})
+    html = staff.get(f"/{SLUG}/admin/").get_data(as_text=True)
+    assert "Table 14" in html and "Curry" in html
+    assert f"/{SLUG}/admin/events?token=" in html
+
+    resp = staff.post(f"/{SLUG}/admin/ready/{signal_id}/ack")
+    assert resp.status_code == 302
+    assert db.session.get(ReadySignal, signal_id).acknowledged_at is not None
+    assert "No tables waiting." in staff.get(f"/{SLUG}/admin/").get_data(as_text=True)
+    assert "has been notified" not in client.get(f"/{SLUG}/picks").get_data(as_text=True)
+    with query_budget(1):
+        client.get(f"/{SLUG}/picks")
+
+
+def test_ready_ack_other_restaurant(client, restaurant, admin_user):
+    other = Restaurant(name="Other", slug="other")
+    db.session.add(other)
+    db.session.flush()
+    signal = ReadySignal(restaurant_id=other.id, session_id="x")
+    db.session.add(signal)
+    db.session.commit()
+
+    client.post(f"/{SLUG}/admin/login", data={"email": "admin@test.com", "password": "testpass"})
+    assert client.post(f"/{SLUG}/admin/ready/{signal.id}/ack").status_code == 404
+    assert db.session.get(ReadySignal, signal.id).acknowledged_at is None
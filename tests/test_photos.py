@@ -0,0 +1,164 @@
+import io
+
+import pytest
+from PIL import Image
+
+from menuvi.models import Category, MenuItem, Photo, db
+from menuvi.photos import original_path, variant_path
+
+SLUG = "test-restaurant"
+
+
+@pytest.fixture()
+def photo_app(app, tmp_path):
+    app.config["UPLOAD_FOLDER"] = str(tmp_path)
+    return app
+
+
+@pytest.fixture()
+def staff(photo_app, restaurant, admin_user):
+    client = photo_app.test_client()
+    client.post(f"/{SLUG}/admin/login", data={"email": "admin@test.com", "password": "testpass"})
+    return client
+
+
+def _image(size=(800, 600), fmt="JPEG", orientation=None, mode="RGB"):
+    img = Image.new(mode, size, "orange")
+    buf = io.BytesIO()
+    if orientation:
+        exif = Image.Exif()
+        exif[0x0112] = orientation
+        img.save(buf, fmt, exif=exif)
+    else:
+        img.save(buf, fmt)
+    return buf.getvalue()
+
+
+def _category(restaurant):
+    cat = Category(restaurant_id=restaurant.id, name="Mains", menu_type="dining")
+    db.session.add(cat)
+    db.session.commit()
+    return cat
+
+
+def _create(staff, cat, data, name="Curry"):
+    return staff.post(
+        f"/{SLUG}/admin/category/{cat.id}/item/new",
+        data={"name": name, "sort_order": "0", "available": "on",
+              "photo": (io.BytesIO(data), "photo.jpg")},
+        content_type="multipart/form-data",
+    )
+
+
+def test_upload_stores_original_and_variants(photo_app, staff, restaurant):
+    cat = _category(restaurant)
+    data = _image()
+    assert _create(staff, cat, data).status_code == 302
+    item = MenuItem.query.one()
+    photo = db.session.get(Photo, item.photo)
+    assert (photo.width, photo.height) == (800, 600)
+    assert photo.placeholder.startswith("data:image/webp;base64,")
+    assert len(photo.placeholder) < 400
+
+    folder = photo_app.config["UPLOAD_FOLDER"]
+    assert original_path(folder, photo.digest).read_bytes() == data
+    for width in (160, 320, 640):
+        for ext in ("webp", "jpg"):
+            with Image.open(variant_path(folder, f"{photo.digest}-{width}.{ext}")) as img:
+                assert img.size == (width, width * 3 // 4)
+    assert not variant_path(folder, f"{photo.digest}-1280.jpg").exists()
+
+    # Same bytes for another item: stored once
+    _create(staff, cat, data, name="Korma")
+    assert Photo.query.count() == 1
+    assert {i.photo for i in MenuItem.query} == {photo.digest}
+
+
+def test_upload_applies_exif_rotation(staff, restaurant):
+    _create(staff, _category(restaurant), _image(orientation=6))
+    photo = Photo.query.one()
+    assert (photo.width, photo.height) == (600, 800)
+
+
+def test_upload_rejects_non_images(staff, restaurant):
+    cat = _category(restaurant)
+    resp = _create(staff, cat, b"not an image")
+    assert b"That file is not an image." in resp.data
+    resp = _create(staff, cat, _image(fmt="GIF", mode="P"))
+    assert b"Photos must be JPEG, PNG or WebP." in resp.data
+    assert MenuItem.query.count() == 0 and Photo.query.count() == 0
+
+
+def test_upload_too_large(photo_app, staff, restaurant):
+    cat = _category(restaurant)
+    photo_app.config["MAX_CONTENT_LENGTH"] = 1024
+    resp = _create(staff, cat, _image(size=(2000, 2000)))
+    assert resp.status_code == 302
+    assert b"Uploads are limited to" in staff.get(resp.headers["Location"]).data
+
+
+def test_edit_replaces_and_removes_photo(staff, restaurant):
+    cat = _category(restaurant)
+    _create(staff, cat, _image())
+    item = MenuItem.query.one()
+    first = item.photo
+    staff.post(
+        f"/{SLUG}/admin/item/{item.id}/edit",
+        data={"name": "Curry", "photo": (io.BytesIO(_image(fmt="PNG")), "new.png")},
+        content_type="multipart/form-data",
+    )
+    db.session.refresh(item)
+    assert item.photo not in (None, first)
+
+    staff.post(f"/{SLUG}/admin/item/{item.id}/edit", data={"name": "Curry", "remove_photo": "on"})
+    db.session.refresh(item)
+    assert item.photo is None
+
+
+def test_pages_use_responsive_images(client, staff, restaurant):
+    cat = _category(restaurant)
+    _create(staff, cat, _image())
+    item = MenuItem.query.one()
+    prefix = f"/media/photos/{item.photo}"
+
+    html = client.get(f"/{SLUG}/category/{cat.id}").get_data(as_text=True)
+    assert f'srcset="{prefix}-160.webp 160w, {prefix}-320.webp 320w, {prefix}-640.webp 640w"' in html
+    assert f'src="{prefix}-320.jpg"' in html
+    assert 'loading="lazy"' in html
+    assert 'width="800" height="600"' in html
+    assert "background-image:url(data:image/webp;base64," in html
+
+    html = client.get(f"/{SLUG}/item/{item.id}").get_data(as_text=True)
+    assert f"{prefix}-640.jpg 640w" in html
+    assert 'fetchpriority="high"' in html
+
+    data = client.get(f"/{SLUG}/api/menu.json").get_json()
+    photo = Photo.query.one()
+    assert data["categories"][0]["items"][0][4] == [photo.digest, 800, 600, photo.placeholder]
+
+
+def test_variant_serving(photo_app, client, staff, restaurant):
+    _create(staff, _category(restaurant), _image())
+    digest = Photo.query.one().digest
+
+    resp = client.get(f"/media/photos/{digest}-320.webp")
+    assert resp.status_code == 200
+    assert resp.mimetype == "image/webp"
+    assert resp.headers["Cache-Control"] == "public, max-age=31536000, immutable"
+    assert Image.open(io.BytesIO(resp.data)).size == (320, 240)
+
+    # Rendered on demand if the background job has not got there yet
+    path = variant_path(photo_app.config["UPLOAD_FOLDER"], f"{digest}-160.jpg")
+    path.unlink()
+    assert client.get(f"/media/photos/{digest}-160.jpg").status_code == 200
+    assert path.exists()
+
+    for name in (f"{digest}-1280.jpg", f"{digest}-300.jpg", f"{digest}.jpg",
+                 f"{'0' * 64}-320.jpg", f"{digest}-320.png"):
+        assert client.get(f"/media/photos/{name}").status_code == 404, name
+
+    photo_app.config["PHOTOS_ACCEL_PREFIX"] = "/_photos/"
+    resp = client.get(f"/media/photos/{digest}-640.jpg")
+    assert resp.headers["X-Accel-Redirect"] == f"/_photos/{digest[:2]}/{digest}-640.jpg"
+    assert resp.mimetype == "image/jpeg"
+    assert resp.data == b""
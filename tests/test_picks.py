@@ -1,4 +1,7 @@
-from menuvi.models import Category, MenuItem, db
+import pytest
+
+from menuvi.models import Category, MenuItem, PickSet, Restaurant, db
+from menuvi.picks import MemoryPickStore, PickStore, SQLitePickStore, decode, encode
 
 SLUG = "test-restaurant"
 
@@ -99,3 +102,98 @@ def test_duplicate_add(client, app, restaurant):
     )
     data = resp.get_json()
     assert data["count"] == 1  # should not duplicate
+
+
+# ── server-side store ───────────────────────────────────────────────────────
+def _session_cookie(client):
+    cookie = client.get_cookie("session")
+    return cookie.value if cookie else None
+
+
+def test_encoding_round_trip():
+    ids = [5, 3, 300, 70000, 3, 71000]
+    data = encode(ids)
+    assert decode(data) == [3, 5, 300, 70000, 71000]
+    assert encode([]) == b"" and decode(b"") == []
+    # Nearby ids cost one byte each
+    assert len(encode(range(1000, 1030))) == 2 + 29
+
+
+@pytest.mark.parametrize("store_class", [SQLitePickStore, MemoryPickStore])
+def test_store_operations(app, store_class):
+    store = store_class(ttl_seconds=3600)
+    assert store.add("s1", 1, 7) == [7]
+    assert store.add("s1", 1, 3) == [3, 7]
+    assert store.add("s1", 1, 3) == [3, 7]
+    assert store.add("s1", 2, 9) == [9]
+    assert store.remove("s1", 1, 7) == [3]
+    assert store.get("s1", 1) == [3]
+    assert store.get("s2", 1) == []
+    store.clear("s1", 1)
+    assert store.get("s1", 1) == []
+    assert store.get("s1", 2) == [9]
+    assert store.apply("s1", 2, add=[4, 5], remove=[9, 99]) == [4, 5]
+    ids, changed_at = store.read("s1", 2)
+    assert ids == [4, 5] and changed_at > 0
+    assert store.read("s3", 2) == ([], 0)
+
+
+def test_incomplete_store_rejected():
+    class ReadOnlyStore(PickStore):
+        def read(self, sid, restaurant_id):
+            return [], 0
+
+    with pytest.raises(TypeError, match="_update"):
+        ReadOnlyStore(ttl_seconds=3600)
+
+
+@pytest.mark.parametrize("store_class", [SQLitePickStore, MemoryPickStore])
+def test_store_expiry(app, store_class):
+    store = store_class(ttl_seconds=-1)
+    store.add("s1", 1, 7)
+    assert store.get("s1", 1) == []
+    assert store.purge_expired() == 1
+
+
+def test_picks_are_scoped_to_restaurant(client, app, restaurant):
+    with app.app_context():
+        _, item = _seed(db.session, restaurant)
+        item_id = item.id
+        other = Restaurant(name="Other", slug="other")
+        db.session.add(other)
+        db.session.commit()
+
+    client.post(f"/{SLUG}/picks/add/{item_id}")
+    assert b"Butter Chicken" in client.get(f"/{SLUG}/picks").data
+    resp = client.get("/other/picks")
+    assert b"Butter Chicken" not in resp.data
+    assert b"No picks yet" in resp.data
+    # An item from another restaurant cannot be picked there
+    assert client.post(f"/other/picks/add/{item_id}").status_code == 404
+
+
+def test_cookie_size_is_fixed(client, app, restaurant):
+    with app.app_context():
+        cat, _ = _seed(db.session, restaurant)
+        for n in range(30):
+            db.session.add(MenuItem(category_id=cat.id, name=f"Extra {n}"))
+        db.session.commit()
+        ids = [i.id for i in MenuItem.query.all()]
+
+    assert _session_cookie(client) is None
+    client.post(f"/{SLUG}/picks/add/{ids[0]}")
+    first = _session_cookie(client)
+    for item_id in ids[1:]:
+        client.post(f"/{SLUG}/picks/add/{item_id}")
+    assert _session_cookie(client) == first
+    with app.app_context():
+        row = PickSet.query.one()
+        assert decode(row.items) == sorted(ids)
+
+
+def test_legacy_cookie_picks_dropped(client, app, restaurant):
+    with client.session_transaction() as sess:
+        sess["picks"] = [1, 2, 3]
+    client.get(f"/{SLUG}/picks")
+    with client.session_transaction() as sess:
+        assert "picks" not in sess
@@ -72,3 +72,48 @@ def test_search_no_results(client, app, restaurant):
     resp = client.get(f"/{SLUG}/search?q=pizza")
     assert resp.status_code == 200
     assert b"No items found" in resp.data
+
+
+def test_search_matches_description(client, app, restaurant):
+    with app.app_context():
+        _seed(db.session, restaurant)
+    resp = client.get(f"/{SLUG}/search?q=tomato")
+    assert b"Butter Chicken" in resp.data
+    assert b"<mark>tomato</mark>" in resp.data
+
+
+def test_search_prefix_and_ranking(client, app, restaurant):
+    with app.app_context():
+        cat, _ = _seed(db.session, restaurant)
+        db.session.add(MenuItem(
+            category_id=cat.id, name="Garlic Naan",
+            description="Goes well with butter chicken", sort_order=1,
+        ))
+        db.session.commit()
+    resp = client.get(f"/{SLUG}/search?q=chick")
+    assert resp.data.index(b"Butter Chicken") < resp.data.index(b"Garlic Naan")
+    assert b"butter <mark>chicken</mark>" in resp.data
+
+
+def test_search_tracks_admin_changes(client, app, restaurant):
+    with app.app_context():
+        _, item = _seed(db.session, restaurant)
+        item_id = item.id
+        item.name = "Paneer Makhani"
+        db.session.commit()
+    assert b"No items found" in client.get(f"/{SLUG}/search?q=butter").data
+    assert b"Paneer" in client.get(f"/{SLUG}/search?q=paneer").data
+
+    with app.app_context():
+        db.session.delete(db.session.get(MenuItem, item_id))
+        db.session.commit()
+    assert b"No items found" in client.get(f"/{SLUG}/search?q=paneer").data
+
+
+def test_search_escapes_item_text(client, app, restaurant):
+    with app.app_context():
+        cat, _ = _seed(db.session, restaurant)
+        db.session.add(MenuItem(category_id=cat.id, name="<b>Bold</b> Lassi"))
+        db.session.commit()
+    resp = client.get(f"/{SLUG}/search?q=lassi")
+    assert b"&lt;b&gt;Bold&lt;/b&gt;" in resp.data
@@ -0,0 +1,87 @@
+import io
+import json
+
+from PIL import Image
+
+from menuvi.menu_cache import bump_menu_version
+from menuvi.models import Category, MenuItem, db
+
+SLUG = "test-restaurant"
+
+
+def _seed(restaurant):
+    mains = Category(restaurant_id=restaurant.id, name="Mains", menu_type="dining", sort_order=0)
+    empty = Category(restaurant_id=restaurant.id, name="Soon", menu_type="dining", sort_order=1)
+    db.session.add_all([mains, empty])
+    db.session.flush()
+    curry = MenuItem(category_id=mains.id, name="Curry", sort_order=0)
+    gone = MenuItem(category_id=mains.id, name="Gone", sort_order=1, available=False)
+    hidden = MenuItem(category_id=empty.id, name="Hidden", sort_order=0, available=False)
+    db.session.add_all([curry, gone, hidden])
+    db.session.commit()
+    return mains.id, empty.id, curry.id, gone.id
+
+
+def _precache(sw):
+    lines = {line.split(" = ", 1)[0]: line.split(" = ", 1)[1].rstrip(";")
+             for line in sw.splitlines() if line.startswith("const ")}
+    return json.loads(lines["const SHELL"]), json.loads(lines["const ITEMS"])
+
+
+def test_manifest(client, restaurant):
+    resp = client.get(f"/{SLUG}/manifest.webmanifest")
+    assert resp.status_code == 200
+    assert resp.mimetype == "application/manifest+json"
+    data = resp.get_json(force=True)
+    assert data["start_url"] == data["scope"] == f"/{SLUG}/"
+    assert data["theme_color"] == "#c9a84c"
+    assert [i["sizes"] for i in data["icons"]] == ["192x192", "512x512"]
+
+    icon = client.get(data["icons"][0]["src"])
+    assert icon.status_code == 200
+    assert "immutable" in icon.headers["Cache-Control"]
+    assert Image.open(io.BytesIO(icon.data)).size == (192, 192)
+    assert client.get(f"/{SLUG}/icon-64.png").status_code == 404
+
+
+def test_service_worker_precaches_menu(client, restaurant):
+    mains_id, empty_id, curry_id, gone_id = _seed(restaurant)
+    resp = client.get(f"/{SLUG}/sw.js")
+    assert resp.status_code == 200
+    assert resp.mimetype == "application/javascript"
+    assert "no-cache" in resp.headers["Cache-Control"]
+
+    shell, items = _precache(resp.get_data(as_text=True))
+    assert f"/{SLUG}/" in shell
+    assert f"/{SLUG}/menu/dining" in shell and f"/{SLUG}/picks" in shell
+    assert "/static/css/style.css" in shell and "/static/js/app.js" in shell
+    assert f"/{SLUG}/category/{mains_id}" in shell
+    assert f"/{SLUG}/category/{empty_id}" not in shell
+    assert items == [f"/{SLUG}/item/{curry_id}"]
+    for url in shell + items:
+        assert client.get(url).status_code == 200
+
+
+def test_service_worker_changes_with_menu_version(client, restaurant):
+    _seed(restaurant)
+    first = client.get(f"/{SLUG}/sw.js")
+    etag = first.headers["ETag"]
+    assert client.get(f"/{SLUG}/sw.js", headers={"If-None-Match": etag}).status_code == 304
+
+    bump_menu_version(restaurant.id)
+    db.session.commit()
+    second = client.get(f"/{SLUG}/sw.js", headers={"If-None-Match": etag})
+    assert second.status_code == 200
+    cache_line = next(l for l in second.get_data(as_text=True).splitlines() if "const CACHE" in l)
+    assert cache_line not in first.get_data(as_text=True)
+
+
+def test_public_pages_register_worker(client, restaurant, admin_user):
+    html = client.get(f"/{SLUG}/").get_data(as_text=True)
+    assert f'rel="manifest" href="/{SLUG}/manifest.webmanifest"' in html
+    assert f'data-service-worker="/{SLUG}/sw.js"' in html
+
+    client.post(f"/{SLUG}/admin/login", data={"email": "admin@test.com", "password": "testpass"})
+    html = client.get(f"/{SLUG}/admin/").get_data(as_text=True)
+    assert "data-service-worker" not in html
+    assert 'rel="manifest"' not in html
@@ -0,0 +1,77 @@
+import io
+import zipfile
+
+import pytest
+
+from menuvi.qr import cache_path, qr_png, qr_pngs
+
+SLUG = "test-restaurant"
+URL = "http://localhost/test-restaurant/"
+
+
+@pytest.fixture()
+def uploads(app, tmp_path):
+    app.config["UPLOAD_FOLDER"] = str(tmp_path)
+    return tmp_path
+
+
+def _login(client):
+    client.post(
+        f"/{SLUG}/admin/login",
+        data={"email": "admin@test.com", "password": "testpass"},
+    )
+
+
+def test_qr_png_is_cached(tmp_path, monkeypatch):
+    path = qr_png(tmp_path, URL)
+    assert path == cache_path(tmp_path, URL)
+    assert path.read_bytes().startswith(b"\x89PNG")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("rendered twice")
+    monkeypatch.setattr("menuvi.qr.render_png", fail)
+    assert qr_png(tmp_path, URL) == path
+
+
+def test_cache_key_includes_options(tmp_path):
+    assert cache_path(tmp_path, URL) != cache_path(tmp_path, URL, {"box_size": 10})
+    assert cache_path(tmp_path, URL) != cache_path(tmp_path, URL + "?table=1")
+
+
+def test_qr_pngs_renders_misses_in_pool(tmp_path):
+    urls = [f"{URL}?table={n}" for n in range(1, 11)]
+    paths = qr_pngs(tmp_path, urls, workers=2)
+    assert len(set(paths)) == 10
+    assert all(p.exists() for p in paths)
+
+
+def test_qr_download_uses_cache(client, uploads, restaurant, admin_user):
+    _login(client)
+    resp = client.get(f"/{SLUG}/admin/qr/download")
+    assert resp.status_code == 200
+    assert resp.mimetype == "image/png"
+    assert len(list((uploads / "qr").rglob("*.png"))) == 1
+
+
+def test_qr_tables_zip(client, uploads, restaurant, admin_user):
+    _login(client)
+    resp = client.get(f"/{SLUG}/admin/qr/tables?count=3&format=zip")
+    assert resp.status_code == 200
+    names = zipfile.ZipFile(io.BytesIO(resp.data)).namelist()
+    assert names == [f"{SLUG}-table-00{n}.png" for n in (1, 2, 3)]
+
+
+def test_qr_tables_pdf(client, uploads, restaurant, admin_user):
+    _login(client)
+    resp = client.get(f"/{SLUG}/admin/qr/tables?count=7&format=pdf")
+    assert resp.status_code == 200
+    assert resp.mimetype == "application/pdf"
+    assert resp.data.startswith(b"%PDF")
+    assert b"/Count 2" in resp.data  # 7 tables at six per page
+
+
+def test_qr_tables_rejects_bad_count(client, uploads, app, restaurant, admin_user):
+    _login(client)
+    app.config["QR_MAX_TABLES"] = 5
+    resp = client.get(f"/{SLUG}/admin/qr/tables?count=6&format=pdf")
+    assert resp.status_code == 302
@@ -0,0 +1,82 @@
+import pytest
+
+from menuvi.models import Category, MenuItem, Restaurant, User, db
+
+SLUG = "test-restaurant"
+
+
+def _seed(db_session, restaurant, n_categories):
+    for c in range(n_categories):
+        cat = Category(
+            restaurant_id=restaurant.id, name=f"Category {c}",
+            menu_type="dining", sort_order=c,
+        )
+        db_session.add(cat)
+        db_session.flush()
+        for i in range(3):
+            db_session.add(MenuItem(
+                category_id=cat.id, name=f"Item {c}-{i}", price_cents=1000,
+                sort_order=i, available=i != 2,
+            ))
+    db_session.commit()
+
+
+def _login(client, path, email, password):
+    client.post(path, data={"email": email, "password": password})
+
+
+@pytest.fixture(params=[2, 20])
+def seeded(request, app, restaurant):
+    with app.app_context():
+        _seed(db.session, restaurant, request.param)
+        cat_id = Category.query.first().id
+        item_id = MenuItem.query.first().id
+    return cat_id, item_id
+
+
+def test_public_routes_within_budget(client, seeded, query_budget):
+    cat_id, item_id = seeded
+    client.post(f"/{SLUG}/picks/add/{item_id}")
+    routes = [
+        ("/", 1),
+        (f"/{SLUG}/", 1),
+        (f"/{SLUG}/menu/dining", 3),
+        (f"/{SLUG}/category/{cat_id}", 3),
+        (f"/{SLUG}/item/{item_id}", 3),
+        (f"/{SLUG}/search?q=item", 2),
+        (f"/{SLUG}/picks", 3),
+    ]
+    for path, budget in routes:
+        with query_budget(budget):
+            assert client.get(path).status_code == 200
+
+
+def test_admin_dashboard_within_budget(client, seeded, admin_user, query_budget):
+    _login(client, f"/{SLUG}/admin/login", "admin@test.com", "testpass")
+    with query_budget(4):
+        assert client.get(f"/{SLUG}/admin/").status_code == 200
+
+
+def test_superadmin_dashboard_within_budget(client, app, seeded, superadmin_user, query_budget):
+    with app.app_context():
+        for n in range(5):
+            r = Restaurant(name=f"R{n}", slug=f"r{n}")
+            db.session.add(r)
+            db.session.flush()
+            db.session.add(Category(restaurant_id=r.id, name="Mains"))
+            db.session.add(User(email=f"owner{n}@test.com", password_hash="x", restaurant_id=r.id))
+        db.session.commit()
+    _login(client, "/superadmin/login", "super@test.com", "superpass")
+    with query_budget(4):
+        assert client.get("/superadmin/").status_code == 200
+
+
+def test_query_count_header_in_debug(client, app, restaurant):
+    app.debug = True
+    resp = client.get(f"/{SLUG}/")
+    assert resp.headers["X-Query-Count"] == "1"
+
+
+def test_query_count_header_hidden_by_default(client, restaurant):
+    resp = client.get(f"/{SLUG}/")
+    assert "X-Query-Count" not in resp.headers
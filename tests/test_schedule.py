@@ -0,0 +1,168 @@
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+from menuvi import jobs, schedule, tenants
+from menuvi.jobs import Worker
+from menuvi.models import Category, Job, MenuItem, Restaurant, db, utcnow
+from menuvi.schedule import Window, apply_schedule
+
+SLUG = "test-restaurant"
+MON, TUE, SAT = 1, 2, 32
+
+
+def _at(*args):
+    return datetime(*args)
+
+
+def test_open_at():
+    lunch = Window(days=MON | TUE, start=time(11, 30), end=time(14, 30))
+    assert lunch.open_at(_at(2026, 10, 19, 11, 30))  # a Monday
+    assert not lunch.open_at(_at(2026, 10, 19, 14, 30))
+    assert not lunch.open_at(_at(2026, 10, 21, 12, 0))  # Wednesday
+
+    late = Window(days=SAT, start=time(22, 0), end=time(2, 0))
+    assert late.open_at(_at(2026, 10, 24, 23, 0))
+    assert late.open_at(_at(2026, 10, 25, 1, 59))  # Sunday morning is Saturday night
+    assert not late.open_at(_at(2026, 10, 24, 1, 0))
+
+    season = Window(from_date=date(2026, 12, 1), until_date=date(2026, 12, 24))
+    assert not season.open_at(_at(2026, 11, 30, 23, 59))
+    assert season.open_at(_at(2026, 12, 24, 23, 59))
+    assert not season.open_at(_at(2026, 12, 25, 0, 0))
+
+
+def test_next_change():
+    lunch = Window(days=MON | TUE, start=time(11, 30), end=time(14, 30))
+    assert lunch.next_change(_at(2026, 10, 19, 9, 0)) == _at(2026, 10, 19, 11, 30)
+    assert lunch.next_change(_at(2026, 10, 19, 12, 0)) == _at(2026, 10, 19, 14, 30)
+    assert lunch.next_change(_at(2026, 10, 20, 15, 0)) == _at(2026, 10, 26, 11, 30)
+
+    # Far-off dates: look again when the window's first day comes
+    season = Window(from_date=date(2027, 6, 1), start=time(17, 0))
+    assert season.next_change(_at(2026, 10, 19, 9, 0)) == _at(2027, 6, 1, 0, 0)
+    assert season.next_change(_at(2027, 6, 1, 0, 0)) == _at(2027, 6, 1, 17, 0)
+
+    assert Window(until_date=date(2026, 1, 1)).next_change(_at(2026, 10, 19)) is None
+    assert Window(from_date=date(2026, 1, 1)).next_change(_at(2026, 10, 19)) is None
+
+
+def test_transitions_follow_restaurant_timezone(app, restaurant):
+    restaurant.timezone = "Australia/Sydney"
+    cat = Category(restaurant_id=restaurant.id, name="Mains", menu_type="dining")
+    db.session.add(cat)
+    db.session.flush()
+    db.session.add(MenuItem(category_id=cat.id, name="Lunch", available_start=time(12, 0),
+                            available_end=time(15, 0)))
+    db.session.commit()
+    # 3 Oct 2026 is the day before Sydney moves from UTC+10 to UTC+11
+    apply_schedule(restaurant.id, now=_at(2026, 10, 3, 0, 0))
+    assert restaurant.next_transition == _at(2026, 10, 3, 2, 0)
+    apply_schedule(restaurant.id, now=_at(2026, 10, 3, 6, 0))
+    assert restaurant.next_transition == _at(2026, 10, 4, 1, 0)
+
+
+# ── admin and public ────────────────────────────────────────────────────────
+@pytest.fixture()
+def staff(client, restaurant, admin_user):
+    client.post(f"/{SLUG}/admin/login", data={"email": "admin@test.com", "password": "testpass"})
+    cat = Category(restaurant_id=restaurant.id, name="Mains", menu_type="dining")
+    db.session.add(cat)
+    db.session.commit()
+    return cat
+
+
+def _clock(monkeypatch, moment):
+    for module in (jobs, schedule, tenants):
+        monkeypatch.setattr(module, "utcnow", lambda: moment)
+
+
+def test_special_appears_at_window_start(client, staff, restaurant, monkeypatch):
+    tomorrow = utcnow().date() + timedelta(days=1)
+    resp = client.post(f"/{SLUG}/admin/category/{staff.id}/item/new", data={
+        "name": "Pumpkin Soup", "sort_order": "0", "available": "on",
+        "available_from": tomorrow.isoformat(),
+    })
+    assert resp.status_code == 302
+    item = MenuItem.query.one()
+    assert item.available is False and item.scheduled
+    assert restaurant.next_transition == datetime.combine(tomorrow, time(0))
+    job = Job.query.one()
+    assert job.name == "schedule.apply"
+    assert abs(job.run_at - restaurant.next_transition) < timedelta(seconds=1)
+
+    page = f"/{SLUG}/category/{staff.id}"
+    assert b"Pumpkin Soup" not in client.get(page).data
+    version = restaurant.menu_version
+
+    # First request past the boundary applies it, worker or not
+    _clock(monkeypatch, restaurant.next_transition + timedelta(seconds=1))
+    assert b"Pumpkin Soup" in client.get(page).data
+    db.session.refresh(restaurant)
+    assert restaurant.menu_version == version + 1
+    assert restaurant.next_transition is None
+    html = client.get(f"/{SLUG}/admin/category/{staff.id}/items").get_data(as_text=True)
+    assert "Scheduled:" in html
+
+
+def test_worker_applies_transition(app, staff, restaurant, monkeypatch):
+    now = utcnow().replace(second=0, microsecond=0)
+    hour = [(now + timedelta(hours=h)).time() for h in range(-1, 4)]
+    lunch = MenuItem(category_id=staff.id, name="Lunch",
+                     available_start=hour[2], available_end=hour[3])
+    dinner = MenuItem(category_id=staff.id, name="Dinner",
+                      available_start=hour[0], available_end=hour[4])
+    db.session.add_all([lunch, dinner])
+    db.session.commit()
+    apply_schedule(restaurant.id)
+    assert (lunch.available, dinner.available) == (False, True)
+
+    # Switched off by hand: only its own boundary turns it back on
+    dinner.available = False
+    db.session.commit()
+    app.config["JOBS_INLINE"] = False
+    _clock(monkeypatch, restaurant.next_transition + timedelta(seconds=1))
+    assert Worker(app, concurrency=1).run(once=True) == 1
+    db.session.refresh(lunch)
+    db.session.refresh(dinner)
+    assert (lunch.available, dinner.available) == (True, False)
+    assert restaurant.next_transition > restaurant.schedule_checked_at
+
+
+def test_item_form_schedule(client, staff, restaurant):
+    resp = client.post(f"/{SLUG}/admin/category/{staff.id}/item/new", data={
+        "name": "Brunch", "sort_order": "0", "available": "on",
+        "available_days": ["5", "6"], "available_start": "09:00", "available_end": "11:30",
+    })
+    assert resp.status_code == 302
+    item = MenuItem.query.one()
+    assert (item.available_days, item.available_start, item.available_end) == (
+        96, time(9, 0), time(11, 30),
+    )
+    html = client.get(f"/{SLUG}/admin/item/{item.id}/edit").get_data(as_text=True)
+    assert 'value="09:00"' in html and 'value="5"\n               checked' in html
+
+    resp = client.post(f"/{SLUG}/admin/item/{item.id}/edit", data={
+        "name": "Brunch", "available_from": "2026-05-02", "available_until": "2026-05-01",
+    })
+    assert b"The last day is before the first day." in client.get(resp.headers["Location"]).data
+
+    # Every day ticked is the same as none; clearing the window unschedules it
+    client.post(f"/{SLUG}/admin/item/{item.id}/edit", data={
+        "name": "Brunch", "available": "on", "available_days": [str(d) for d in range(7)],
+    })
+    db.session.refresh(item)
+    assert not item.scheduled and item.available
+    assert db.session.get(Restaurant, restaurant.id).next_transition is None
+
+
+def test_restaurant_timezone(client, restaurant, superadmin_user):
+    client.post("/superadmin/login", data={"email": "super@test.com", "password": "superpass"})
+    form = {"name": "Test Restaurant", "slug": SLUG}
+    resp = client.post(f"/superadmin/restaurant/{restaurant.id}/edit",
+                       data={**form, "timezone": "Mars/Olympus"})
+    assert b"Unknown time zone" in resp.data
+    client.post(f"/superadmin/restaurant/{restaurant.id}/edit",
+                data={**form, "timezone": "Asia/Kolkata"})
+    db.session.refresh(restaurant)
+    assert restaurant.timezone == "Asia/Kolkata"
@@ -0,0 +1,71 @@
+import gzip
+
+from menuvi.models import Category, Restaurant, db
+
+SLUG = "test-restaurant"
+
+
+def _seed(db_session, restaurant, n=2):
+    for i in range(n):
+        db_session.add(Category(restaurant_id=restaurant.id, name=f"Cat {i}", sort_order=i))
+    db_session.commit()
+
+
+def test_sitemap_lists_public_pages(client, app, restaurant):
+    with app.app_context():
+        _seed(db.session, restaurant)
+        cat_id = Category.query.first().id
+    resp = client.get("/sitemap.xml")
+    assert resp.mimetype == "application/xml"
+    body = resp.get_data(as_text=True)
+    assert body.startswith('<?xml version="1.0" encoding="UTF-8"?>\n<urlset')
+    assert body.count("<url>") == 1 + 3 + 2
+    assert f"http://localhost/{SLUG}/category/{cat_id}</loc>" in body
+    assert f"http://localhost/{SLUG}/menu/beverages</loc>" in body
+
+
+def test_sitemap_query_count_is_constant(client, app, restaurant, query_budget):
+    with app.app_context():
+        for n in range(10):
+            r = Restaurant(name=f"R{n}", slug=f"r{n}")
+            db.session.add(r)
+            db.session.flush()
+            _seed(db.session, r, n=3)
+    with query_budget(2):
+        body = client.get("/sitemap.xml").data
+    # Served from cache until content changes
+    with query_budget(0):
+        assert client.get("/sitemap.xml").data == body
+
+
+def test_sitemap_gzip_variant(client, app, restaurant):
+    plain = client.get("/sitemap.xml").data
+    resp = client.get("/sitemap.xml.gz")
+    assert resp.mimetype == "application/gzip"
+    assert gzip.decompress(resp.data) == plain
+
+
+def test_sitemap_splits_into_index(client, app, restaurant):
+    app.config["SITEMAP_MAX_URLS"] = 3
+    with app.app_context():
+        _seed(db.session, restaurant, n=4)
+    index = client.get("/sitemap.xml").get_data(as_text=True)
+    assert "<sitemapindex" in index
+    # 1 directory + 3 restaurant pages + 4 categories = 8 URLs -> 3 children
+    assert index.count("<sitemap>") == 3
+    assert "http://localhost/sitemap-3.xml" in index
+
+    urls = []
+    for n in (1, 2, 3):
+        child = client.get(f"/sitemap-{n}.xml").get_data(as_text=True)
+        urls += [line for line in child.splitlines() if "<url>" in line]
+    assert len(urls) == len(set(urls)) == 8
+    assert gzip.decompress(client.get("/sitemap-2.xml.gz").data).count(b"<url>") == 3
+    assert client.get("/sitemap-4.xml").status_code == 404
+
+
+def test_sitemap_refreshes_after_change(client, app, restaurant, superadmin_user):
+    assert "new-place" not in client.get("/sitemap.xml").get_data(as_text=True)
+    client.post("/superadmin/login", data={"email": "super@test.com", "password": "superpass"})
+    client.post("/superadmin/restaurant/new", data={"name": "New Place"})
+    assert "/new-place/" in client.get("/sitemap.xml").get_data(as_text=True)
@@ -0,0 +1,116 @@
+import multiprocessing
+import sqlite3
+
+import pytest
+from sqlalchemy import text
+
+from menuvi import create_app
+from menuvi.models import db, Category, MenuItem, Restaurant
+from menuvi.sqlite_profile import Maintenance, pragmas
+
+from .conftest import TestConfig
+
+WRITES = 25
+READS = 100
+
+
+def _config(path):
+    class FileConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path / 'menuvi.db'}"
+        TENANT_STAMP_FILE = str(path / "tenants.stamp")
+        UPLOAD_FOLDER = str(path / "uploads")
+    return FileConfig
+
+
+def test_pragmas_applied(tmp_path):
+    app = create_app(_config(tmp_path))
+    with app.app_context():
+        def pragma(name):
+            return db.session.execute(text(f"PRAGMA {name}")).scalar()
+        assert pragma("journal_mode") == "wal"
+        assert pragma("synchronous") == 1  # NORMAL
+        assert pragma("busy_timeout") == 5000
+        assert pragma("temp_store") == 2  # MEMORY
+        assert pragma("cache_size") == -20000
+        assert pragma("mmap_size") == 256 * 1024 * 1024
+        db.engine.dispose()
+
+
+def test_invalid_setting_rejected():
+    config = {
+        "SQLITE_JOURNAL_MODE": "wal", "SQLITE_SYNCHRONOUS": "sometimes",
+        "SQLITE_TEMP_STORE": "memory", "SQLITE_BUSY_TIMEOUT_MS": 1,
+        "SQLITE_MMAP_SIZE_MB": 0, "SQLITE_CACHE_SIZE_KB": 1,
+    }
+    with pytest.raises(ValueError, match="SQLITE_SYNCHRONOUS"):
+        pragmas(config)
+
+
+def test_maintenance_is_rate_limited(tmp_path):
+    conn = sqlite3.connect(tmp_path / "m.db")
+    conn.execute("PRAGMA journal_mode = WAL")
+    maintenance = Maintenance(interval=3600)
+    assert not maintenance.run_if_due(conn)
+    maintenance._due = 0
+    assert maintenance.run_if_due(conn)
+    assert not maintenance.run_if_due(conn)
+    assert not Maintenance(interval=0).run_if_due(conn)
+    conn.close()
+
+
+# ── concurrency ─────────────────────────────────────────────────────────────
+def _writer(path, worker, errors):
+    from menuvi.menu_cache import bump_menu_version
+
+    app = create_app(_config(path))
+    try:
+        with app.app_context():
+            category_id = Category.query.one().id
+            for n in range(WRITES):
+                db.session.add(MenuItem(category_id=category_id, name=f"w{worker}-{n}"))
+                bump_menu_version(Restaurant.query.one().id)
+                db.session.commit()
+    except Exception as exc:  # reported to the parent process
+        errors.put(f"writer {worker}: {exc!r}")
+
+
+def _reader(path, worker, errors):
+    app = create_app(_config(path))
+    client = app.test_client()
+    try:
+        for _ in range(READS):
+            resp = client.get("/test-restaurant/menu/dining")
+            if resp.status_code != 200:
+                errors.put(f"reader {worker}: HTTP {resp.status_code}")
+                return
+    except Exception as exc:
+        errors.put(f"reader {worker}: {exc!r}")
+
+
+def test_concurrent_readers_and_writers(tmp_path):
+    app = create_app(_config(tmp_path))
+    with app.app_context():
+        r = Restaurant(name="Test Restaurant", slug="test-restaurant")
+        db.session.add(r)
+        db.session.flush()
+        db.session.add(Category(restaurant_id=r.id, name="Mains"))
+        db.session.commit()
+        db.engine.dispose()
+
+    ctx = multiprocessing.get_context("spawn")
+    errors = ctx.Queue()
+    procs = [ctx.Process(target=_writer, args=(tmp_path, n, errors)) for n in range(2)]
+    procs += [ctx.Process(target=_reader, args=(tmp_path, n, errors)) for n in range(2)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(timeout=120)
+        assert p.exitcode == 0
+
+    messages = []
+    while not errors.empty():
+        messages.append(errors.get())
+    assert messages == []
+    with app.app_context():
+        assert MenuItem.query.count() == 2 * WRITES
+        assert Restaurant.query.one().menu_version == 1 + 2 * WRITES
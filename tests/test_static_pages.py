@@ -0,0 +1,87 @@
+import gzip
+
+import pytest
+
+from menuvi.models import Category, MenuItem, db
+from menuvi.static_pages import page_file, render_all
+
+SLUG = "test-restaurant"
+
+
+@pytest.fixture()
+def baked(app, tmp_path):
+    app.config["STATIC_PAGES_FOLDER"] = str(tmp_path)
+    app.config["SITE_URL"] = "https://menus.example/"
+    return tmp_path
+
+
+def _seed(db_session, restaurant):
+    cat = Category(
+        restaurant_id=restaurant.id, name="Mains", menu_type="dining", sort_order=0,
+    )
+    db_session.add(cat)
+    db_session.flush()
+    item = MenuItem(
+        category_id=cat.id, name="Butter Chicken", price_cents=2290, sort_order=0,
+    )
+    db_session.add(item)
+    db_session.commit()
+    return cat.id, item.id
+
+
+def test_page_file_mapping(tmp_path):
+    assert page_file(tmp_path, "/") == tmp_path / "index.html"
+    assert page_file(tmp_path, "/a/") == tmp_path / "a" / "index.html"
+    assert page_file(tmp_path, "/a/menu/dining") == tmp_path / "a" / "menu" / "dining.html"
+
+
+def test_render_all(app, baked, restaurant):
+    with app.app_context():
+        cat_id, item_id = _seed(db.session, restaurant)
+        render_all(app)
+
+    assert (baked / "index.html").exists()
+    assert (baked / SLUG / "index.html").exists()
+    assert (baked / SLUG / "menu" / "beverages.html").exists()
+    category_html = (baked / SLUG / "category" / f"{cat_id}.html").read_text()
+    assert "Butter Chicken" in category_html
+    assert 'href="https://menus.example/' in category_html
+    assert (baked / SLUG / "item" / f"{item_id}.html").exists()
+    gz = baked / SLUG / "category" / f"{cat_id}.html.gz"
+    assert gzip.decompress(gz.read_bytes()).decode() == category_html
+
+
+def test_admin_edit_rerenders_affected_pages(client, app, baked, restaurant, admin_user):
+    app.config["STATIC_PAGES_ENABLED"] = True
+    with app.app_context():
+        cat_id, item_id = _seed(db.session, restaurant)
+        render_all(app)
+    item_file = baked / SLUG / "item" / f"{item_id}.html"
+    landing_mtime = (baked / SLUG / "index.html").stat().st_mtime_ns
+
+    client.post(
+        f"/{SLUG}/admin/login",
+        data={"email": "admin@test.com", "password": "testpass"},
+    )
+    client.post(f"/{SLUG}/admin/item/{item_id}/toggle")
+    category_html = (baked / SLUG / "category" / f"{cat_id}.html").read_text()
+    assert "Butter Chicken" not in category_html
+    assert "0 items" in (baked / SLUG / "menu" / "dining.html").read_text()
+
+    client.post(f"/{SLUG}/admin/item/{item_id}/delete")
+    assert not item_file.exists()
+    assert not item_file.with_name(item_file.name + ".gz").exists()
+    assert (baked / SLUG / "index.html").stat().st_mtime_ns >= landing_mtime
+
+
+def test_slug_rename_moves_baked_pages(client, app, baked, restaurant, superadmin_user):
+    app.config["STATIC_PAGES_ENABLED"] = True
+    with app.app_context():
+        render_all(app)
+        restaurant_id = restaurant.id
+    client.post("/superadmin/login", data={"email": "super@test.com", "password": "superpass"})
+    client.post(f"/superadmin/restaurant/{restaurant_id}/edit", data={
+        "name": "Test Restaurant", "slug": "renamed",
+    })
+    assert not (baked / SLUG).exists()
+    assert (baked / "renamed" / "index.html").exists()
@@ -0,0 +1,70 @@
+from menuvi.models import Category, MenuItem, db
+from menuvi.suggest import PrefixIndex, Suggestion
+
+SLUG = "test-restaurant"
+
+
+def _seed(db_session, restaurant):
+    cat = Category(
+        restaurant_id=restaurant.id, name="Chicken Dishes", menu_type="dining", sort_order=0,
+    )
+    db_session.add(cat)
+    db_session.flush()
+    db_session.add_all([
+        MenuItem(category_id=cat.id, name="Butter Chicken", sort_order=0),
+        MenuItem(category_id=cat.id, name="Chilli Chicken", sort_order=1),
+        MenuItem(category_id=cat.id, name="Crème Brûlée", sort_order=2),
+        MenuItem(category_id=cat.id, name="Chicken 65", sort_order=3, available=False),
+    ])
+    db_session.commit()
+    return cat
+
+
+def test_prefix_lookup_matches_word_starts():
+    index = PrefixIndex([
+        Suggestion("item", 1, "Butter Chicken", ""),
+        Suggestion("item", 2, "Chilli Chicken", ""),
+        Suggestion("item", 3, "Naan", ""),
+    ])
+    names = [s.name for s in index.lookup("chi")]
+    # Whole-name prefix match ranks above a later-word match
+    assert names == ["Chilli Chicken", "Butter Chicken"]
+    assert index.lookup("chicken n") == []
+    assert index.lookup("") == []
+
+
+def test_suggest_endpoint(client, app, restaurant):
+    with app.app_context():
+        _seed(db.session, restaurant)
+    resp = client.get(f"/{SLUG}/search/suggest?q=chi")
+    assert resp.status_code == 200
+    results = resp.get_json()["results"]
+    assert [r["type"] for r in results] == ["category", "item", "item"]
+    assert results[0]["name"] == "Chicken Dishes"
+    assert "Chicken 65" not in [r["name"] for r in results]
+    assert results[1]["url"].startswith(f"/{SLUG}/item/")
+
+
+def test_suggest_ignores_accents(client, app, restaurant):
+    with app.app_context():
+        _seed(db.session, restaurant)
+    results = client.get(f"/{SLUG}/search/suggest?q=creme").get_json()["results"]
+    assert [r["name"] for r in results] == ["Crème Brûlée"]
+
+
+def test_suggest_index_rebuilt_after_admin_edit(client, app, restaurant, admin_user):
+    with app.app_context():
+        cat = _seed(db.session, restaurant)
+        cat_id = cat.id
+    assert client.get(f"/{SLUG}/search/suggest?q=tikka").get_json()["results"] == []
+
+    client.post(
+        f"/{SLUG}/admin/login",
+        data={"email": "admin@test.com", "password": "testpass"},
+    )
+    client.post(
+        f"/{SLUG}/admin/category/{cat_id}/item/new",
+        data={"name": "Chicken Tikka", "sort_order": "4", "available": "on"},
+    )
+    results = client.get(f"/{SLUG}/search/suggest?q=tikka").get_json()["results"]
+    assert [r["name"] for r in results] == ["Chicken Tikka"]
@@ -0,0 +1,141 @@
+import pytest
+
+from menuvi.models import Category, MenuItem, Tag, db
+from menuvi.tags import MAX_TAGS, TagError, add_tag
+
+SLUG = "test-restaurant"
+
+
+@pytest.fixture()
+def menu(restaurant):
+    """Vegan (bit 0), Gluten-free (bit 1) and Nut-free (bit 2) tags on a small menu."""
+    tags = {name: add_tag(restaurant.id, name) for name in ("Vegan", "Gluten-free", "Nut-free")}
+    db.session.flush()
+    vegan, gf, nf = (tags[n].mask for n in ("Vegan", "Gluten-free", "Nut-free"))
+    mains = Category(restaurant_id=restaurant.id, name="Mains", menu_type="dining", sort_order=0)
+    desserts = Category(restaurant_id=restaurant.id, name="Desserts", menu_type="dining", sort_order=1)
+    db.session.add_all([mains, desserts])
+    db.session.flush()
+    db.session.add_all([
+        MenuItem(category_id=mains.id, name="Dal Curry", tags=vegan | gf | nf, sort_order=0),
+        MenuItem(category_id=mains.id, name="Satay Tofu", tags=vegan | gf, sort_order=1),
+        MenuItem(category_id=mains.id, name="Butter Chicken", tags=gf | nf, sort_order=2),
+        MenuItem(category_id=mains.id, name="Sorbet Special", tags=vegan | gf | nf, available=False),
+        MenuItem(category_id=desserts.id, name="Pecan Pie", sort_order=0),
+        MenuItem(category_id=desserts.id, name="Coconut Sorbet", tags=vegan | gf, sort_order=1),
+    ])
+    db.session.commit()
+    return mains, desserts
+
+
+def test_category_masks_follow_items(menu):
+    mains, desserts = menu
+    assert (mains.tag_mask, desserts.tag_mask) == (0b111, 0b011)
+
+    sorbet = MenuItem.query.filter_by(name="Coconut Sorbet").one()
+    sorbet.tags |= 0b100
+    db.session.commit()
+    db.session.refresh(desserts)
+    assert desserts.tag_mask == 0b111
+
+    sorbet.category_id = mains.id
+    db.session.commit()
+    db.session.refresh(desserts)
+    assert desserts.tag_mask == 0
+
+    db.session.delete(MenuItem.query.filter_by(name="Butter Chicken").one())
+    db.session.commit()
+    db.session.refresh(mains)
+    assert mains.tag_mask == 0b111
+
+
+def test_menu_prunes_categories(client, menu):
+    html = client.get(f"/{SLUG}/menu/dining").get_data(as_text=True)
+    assert "Mains" in html and "Desserts" in html
+    assert 'href="/test-restaurant/menu/dining?tag=vegan"' in html
+
+    html = client.get(f"/{SLUG}/menu/dining?tag=vegan&tag=nut-free").get_data(as_text=True)
+    assert "Mains" in html and "Desserts" not in html
+    assert "1 items" in html  # only the dal: the sorbet special is off
+    assert f"/category/{menu[0].id}?tag=nut-free&amp;tag=vegan" in html
+    assert 'class="tag-chip active"' in html
+
+    html = client.get(f"/{SLUG}/menu/dining?tag=vegan&tag=gone").get_data(as_text=True)
+    assert "Desserts" in html  # unknown tags are ignored
+
+
+def test_category_filters_items(client, menu):
+    mains, _ = menu
+    html = client.get(f"/{SLUG}/category/{mains.id}?tag=gluten-free").get_data(as_text=True)
+    assert "Dal Curry" in html and "Satay Tofu" in html and "Butter Chicken" in html
+    html = client.get(f"/{SLUG}/category/{mains.id}?tag=vegan&tag=gluten-free").get_data(as_text=True)
+    assert "Satay Tofu" in html and "Butter Chicken" not in html
+    assert '<span>Vegan</span>' in html
+    assert "/menu/dining?tag=gluten-free&amp;tag=vegan" in html
+
+
+def test_search_with_tags(client, menu):
+    html = client.get(f"/{SLUG}/search?q=sorbet").get_data(as_text=True)
+    assert "Coconut Sorbet" in html
+    html = client.get(f"/{SLUG}/search?q=sorbet&tag=nut-free").get_data(as_text=True)
+    assert "Coconut Sorbet" not in html and "No items found" in html
+
+    # A filter without a query lists the whole menu's matches
+    html = client.get(f"/{SLUG}/search?tag=vegan").get_data(as_text=True)
+    assert [n for n in ("Dal Curry", "Satay Tofu", "Coconut Sorbet", "Butter Chicken", "Pecan Pie")
+            if n in html] == ["Dal Curry", "Satay Tofu", "Coconut Sorbet"]
+    assert '<input type="hidden" name="tag" value="vegan">' in html
+
+
+def test_menu_payload_carries_tags(client, menu):
+    data = client.get(f"/{SLUG}/api/menu.json").get_json()
+    assert [t["slug"] for t in data["tags"]] == ["gluten-free", "nut-free", "vegan"]
+    tags = data["item_fields"].index("tags")
+    assert {row[1]: row[tags] for row in data["categories"][1]["items"]} == {
+        "Pecan Pie": 0, "Coconut Sorbet": 0b011,
+    }
+
+
+def test_registry_limits(restaurant):
+    add_tag(restaurant.id, "Vegan")
+    db.session.flush()
+    with pytest.raises(TagError, match="already a tag"):
+        add_tag(restaurant.id, " vegan ")
+    for n in range(1, MAX_TAGS):
+        add_tag(restaurant.id, f"Tag {n}")
+    db.session.flush()
+    with pytest.raises(TagError, match=f"at most {MAX_TAGS}"):
+        add_tag(restaurant.id, "One more")
+
+
+def test_admin_tags(client, menu, restaurant, admin_user):
+    mains, desserts = menu
+    client.post(f"/{SLUG}/admin/login", data={"email": "admin@test.com", "password": "testpass"})
+    html = client.get(f"/{SLUG}/admin/tags").get_data(as_text=True)
+    assert 'value="Nut-free"' in html
+
+    client.post(f"/{SLUG}/admin/tags", data={"name": "Halal"})
+    halal = Tag.query.filter_by(slug="halal").one()
+    assert halal.bit == 3
+
+    client.post(f"/{SLUG}/admin/category/{desserts.id}/item/new", data={
+        "name": "Fruit Plate", "sort_order": "0", "available": "on", "tags": ["0", "3", "9"],
+    })
+    item = MenuItem.query.filter_by(name="Fruit Plate").one()
+    assert item.tags == 0b1001
+    html = client.get(f"/{SLUG}/admin/item/{item.id}/edit").get_data(as_text=True)
+    assert 'value="3"\n               checked' in html
+
+    # Deleting a tag clears its bit from items and category masks
+    version = restaurant.menu_version
+    vegan = Tag.query.filter_by(slug="vegan").one()
+    client.post(f"/{SLUG}/admin/tag/{vegan.id}/delete")
+    assert Tag.query.filter_by(slug="vegan").first() is None
+    db.session.refresh(item)
+    db.session.refresh(mains)
+    db.session.refresh(restaurant)
+    assert item.tags == 0b1000 and mains.tag_mask == 0b110
+    assert MenuItem.query.filter(MenuItem.tags.op("&")(1) != 0).count() == 0
+    assert restaurant.menu_version > version
+    client.post(f"/{SLUG}/admin/tags", data={"name": "Spicy"})
+    assert Tag.query.filter_by(slug="spicy").one().bit == 0
@@ -0,0 +1,79 @@
+from menuvi.models import Restaurant, db
+from menuvi.tenants import TenantCache, Tenant, mark_changed
+
+SLUG = "test-restaurant"
+
+
+def _superadmin_login(client):
+    client.post("/superadmin/login", data={"email": "super@test.com", "password": "superpass"})
+
+
+def test_warm_routing_needs_no_queries(client, restaurant, query_budget):
+    etag = client.get(f"/{SLUG}/").headers["ETag"]
+    with query_budget(0):
+        resp = client.get(f"/{SLUG}/", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+
+
+def test_unknown_slug_is_negatively_cached(client, restaurant, query_budget):
+    assert client.get("/wp-admin/").status_code == 404
+    with query_budget(0):
+        assert client.get("/wp-admin/").status_code == 404
+
+
+def test_created_restaurant_clears_negative_cache(client, restaurant, superadmin_user):
+    assert client.get("/new-place/").status_code == 404
+    _superadmin_login(client)
+    client.post("/superadmin/restaurant/new", data={"name": "New Place", "slug": "new-place"})
+    assert client.get("/new-place/").status_code == 200
+
+
+def test_slug_rename_and_delete(client, app, restaurant, superadmin_user):
+    restaurant_id = restaurant.id
+    assert client.get(f"/{SLUG}/").status_code == 200
+    _superadmin_login(client)
+    client.post(f"/superadmin/restaurant/{restaurant_id}/edit", data={
+        "name": "Test Restaurant", "slug": "moved", "tagline": "Fresh tagline",
+    })
+    assert client.get(f"/{SLUG}/").status_code == 404
+    resp = client.get("/moved/")
+    assert b"Fresh tagline" in resp.data
+
+    client.post(f"/superadmin/restaurant/{restaurant_id}/delete")
+    assert client.get("/moved/").status_code == 404
+
+
+def test_stamp_invalidates_other_workers(tmp_path):
+    stamp = tmp_path / "tenants.stamp"
+    worker_a = TenantCache(stamp, max_entries=10)
+    worker_b = TenantCache(stamp, max_entries=10)
+    tenant = Tenant(1, "A", "a", "", "#000", "#111", 1, None)
+    worker_b.get("a")  # adopt the current generation
+    worker_b.put("a", tenant)
+    assert worker_b.get("a") is tenant
+
+    worker_a.touch()
+    assert worker_b.get("a") is None
+
+    worker_b.put("a", tenant)
+    worker_a.touch()
+    assert worker_b.get("a") is None
+
+
+def test_cache_is_bounded(tmp_path):
+    cache = TenantCache(tmp_path / "stamp", max_entries=2)
+    for slug in ("a", "b", "c"):
+        cache.put(slug, object())
+    assert len(cache) == 2
+    assert cache.get("a") is None
+
+
+def test_rolled_back_change_does_not_touch_stamp(app, restaurant):
+    cache = app.extensions["tenant_cache"]
+    with app.app_context():
+        before = cache.generation()
+        db.session.get(Restaurant, restaurant.id).name = "Nope"
+        mark_changed()
+        db.session.rollback()
+        db.session.commit()
+        assert cache.generation() == before